@@ -16,12 +16,20 @@
 from email import header
 from email.mime import multipart
 from email.mime import text
+from http import cookiejar
+import os
 import smtplib
+import tempfile
+import threading
 import time
 from urllib import parse
 
+import cachetools
+from oslo_config import cfg
 from oslo_log import log as logging
+from oslo_serialization import jsonutils
 import requests
+from requests import adapters
 
 from mistral import exceptions as exc
 from mistral import utils
@@ -31,6 +39,126 @@ from mistral_lib import actions
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
+# Max number of response body bytes written to the log.
+_MAX_LOGGED_CONTENT = 1024
+
+_CONTENT_CHUNK_SIZE = 64 * 1024
+
+_CONTENT_FILE_PREFIX = 'mistral-http-'
+
+# The minimal interval (in seconds) between cleanups of expired
+# response content files.
+_CONTENT_FILES_CLEANUP_INTERVAL = 60
+
+_content_files_cleanup_time = 0
+_content_files_cleanup_lock = threading.Lock()
+
+
+class _HTTPSessionCache(cachetools.LRUCache):
+    def popitem(self):
+        key, session = super(_HTTPSessionCache, self).popitem()
+
+        # Close idle connections of the evicted session. Connections
+        # of requests that are still in progress are discarded once
+        # the requests are over.
+        session.close()
+
+        return key, session
+
+
+# {(scheme, host and port, verify) => requests.Session}.
+_HTTP_SESSIONS = _HTTPSessionCache(maxsize=100)
+_HTTP_SESSIONS_LOCK = threading.Lock()
+
+
+def _get_http_session(url, verify):
+    """Returns a pooled HTTP session for the given URL and TLS settings.
+
+    :param url: Request URL.
+    :param verify: TLS verification settings of the request.
+    :return: requests.Session instance.
+    """
+    url_data = parse.urlsplit(url)
+
+    key = (url_data.scheme, url_data.netloc, str(verify))
+
+    with _HTTP_SESSIONS_LOCK:
+        session = _HTTP_SESSIONS.get(key)
+
+        if session is None:
+            session = requests.Session()
+
+            # Sessions are shared by all actions so they must never
+            # keep cookies received by one action and send them with
+            # requests of another one.
+            session.cookies.set_policy(
+                cookiejar.DefaultCookiePolicy(allowed_domains=[])
+            )
+
+            adapter = adapters.HTTPAdapter(
+                pool_connections=1,
+                pool_maxsize=CONF.executor.http_action_pool_size
+            )
+
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+
+            _HTTP_SESSIONS[key] = session
+
+    return session
+
+
+def _get_content_dir():
+    content_dir = (
+        CONF.executor.http_action_content_dir or tempfile.gettempdir()
+    )
+
+    os.makedirs(content_dir, exist_ok=True)
+
+    return content_dir
+
+
+def _cleanup_content_files(content_dir):
+    """Deletes response content files older than the configured TTL.
+
+    :param content_dir: Directory with the content files.
+    """
+    global _content_files_cleanup_time
+
+    ttl = CONF.executor.http_action_content_file_ttl
+
+    if not ttl:
+        return
+
+    now = time.time()
+
+    with _content_files_cleanup_lock:
+        if (now - _content_files_cleanup_time <
+                min(ttl, _CONTENT_FILES_CLEANUP_INTERVAL)):
+            return
+
+        _content_files_cleanup_time = now
+
+    for file_name in os.listdir(content_dir):
+        if not file_name.startswith(_CONTENT_FILE_PREFIX):
+            continue
+
+        path = os.path.join(content_dir, file_name)
+
+        try:
+            if now - os.path.getmtime(path) > ttl:
+                os.remove(path)
+        except OSError as e:
+            # The file may have been deleted by another executor
+            # sharing the same directory.
+            LOG.debug(
+                "Failed to delete HTTP response content file %s: %s",
+                path,
+                e
+            )
+
 
 class EchoAction(actions.Action):
     """Echo action.
@@ -160,6 +288,18 @@ class HTTPAction(actions.Action):
         the proxy.
     :param verify: (optional) if ``True``, the SSL cert will be verified.
         A CA_BUNDLE path can also be provided.
+    :param max_content_size: (optional) Max number of bytes of the response
+        body to put into the result. Longer bodies are truncated and the
+        result gets "content_truncated" set to True.
+    :param content_to_file: (optional) If True, the response body is
+        streamed into a file on the executor instead of being put into
+        the result. The result has "content" set to None and gets
+        "content_file" and "content_size" keys. The file is created in
+        the directory configured with "[executor]/http_action_content_dir"
+        so it's only accessible to other components if the directory is
+        shared with them. Files older than
+        "[executor]/http_action_content_file_ttl" seconds are deleted by
+        the executor.
     """
 
     def __init__(self,
@@ -174,7 +314,9 @@ class HTTPAction(actions.Action):
                  timeout=None,
                  allow_redirects=None,
                  proxies=None,
-                 verify=None):
+                 verify=None,
+                 max_content_size=None,
+                 content_to_file=False):
         super(HTTPAction, self).__init__()
 
         if auth and len(auth.split(':')) == 2:
@@ -203,15 +345,20 @@ class HTTPAction(actions.Action):
         self.allow_redirects = allow_redirects
         self.proxies = proxies
         self.verify = verify
+        self.max_content_size = max_content_size
+        self.content_to_file = content_to_file
 
     def run(self, context):
         LOG.info(
-            "Running HTTP action "
-            "[url=%s, method=%s, params=%s, body=%s, json=%s,"
+            "Running HTTP action [url=%s, method=%s]",
+            self.url,
+            self.method
+        )
+        LOG.debug(
+            "HTTP action parameters "
+            "[params=%s, body=%s, json=%s,"
             " headers=%s, cookies=%s, auth=%s, timeout=%s,"
             " allow_redirects=%s, proxies=%s, verify=%s]",
-            self.url,
-            self.method,
             self.params,
             self.body,
             self.json,
@@ -224,6 +371,13 @@ class HTTPAction(actions.Action):
             self.verify
         )
 
+        max_content_size = self.max_content_size
+
+        if max_content_size is None:
+            max_content_size = CONF.executor.http_action_max_content_size
+
+        stream = bool(max_content_size or self.content_to_file)
+
         try:
             url_data = parse.urlsplit(self.url)
             if 'https' == url_data.scheme:
@@ -231,7 +385,19 @@ class HTTPAction(actions.Action):
             else:
                 action_verify = None
 
-            resp = requests.request(
+            if CONF.executor.http_action_pool_size:
+                request = _get_http_session(self.url, action_verify).request
+            else:
+                request = requests.request
+
+            kwargs = {}
+
+            # Only ask for streaming if the body needs to be read
+            # gradually, otherwise it's read all at once as usual.
+            if stream:
+                kwargs['stream'] = True
+
+            resp = request(
                 self.method,
                 self.url,
                 params=self.params,
@@ -243,7 +409,8 @@ class HTTPAction(actions.Action):
                 timeout=self.timeout,
                 allow_redirects=self.allow_redirects,
                 proxies=self.proxies,
-                verify=action_verify
+                verify=action_verify,
+                **kwargs
             )
         except Exception as e:
             LOG.exception(
@@ -252,20 +419,52 @@ class HTTPAction(actions.Action):
             )
             raise exc.ActionException("Failed to send HTTP request: %s" % e)
 
+        extra = {}
+
+        if stream:
+            try:
+                content = self._read_content(resp, max_content_size, extra)
+            except Exception as e:
+                LOG.exception(
+                    "Failed to read HTTP response for action execution: %s",
+                    context.execution.action_execution_id
+                )
+                raise exc.ActionException(
+                    "Failed to read HTTP response: %s" % e
+                )
+            finally:
+                resp.close()
+        else:
+            content = resp.content
+
         LOG.info(
-            "HTTP action response:\n%s\n%s",
+            "HTTP action response [url=%s, status=%s, elapsed=%s]",
+            self.url,
             resp.status_code,
-            resp.content
+            resp.elapsed
+        )
+        LOG.debug(
+            "HTTP action response content:\n%s",
+            content[:_MAX_LOGGED_CONTENT] if content else content
         )
 
         # Represent important resp data as a dictionary.
-        try:
-            content = resp.json()
-        except Exception:
-            LOG.debug("HTTP action response is not json.")
-            content = resp.content
-            if content and resp.encoding not in (None, 'utf-8'):
-                content = content.decode(resp.encoding).encode('utf-8')
+        if self.content_to_file:
+            content = None
+        elif stream:
+            content = self._parse_content(
+                content,
+                resp.encoding,
+                extra.get('content_truncated')
+            )
+        else:
+            try:
+                content = resp.json()
+            except Exception:
+                LOG.debug("HTTP action response is not json.")
+                content = resp.content
+                if content and resp.encoding not in (None, 'utf-8'):
+                    content = content.decode(resp.encoding).encode('utf-8')
 
         _result = {
             'content': content,
@@ -279,11 +478,86 @@ class HTTPAction(actions.Action):
             'elapsed': resp.elapsed.total_seconds()
         }
 
+        _result.update(extra)
+
         if resp.status_code not in range(200, 307):
             return actions.Result(error=_result)
 
         return _result
 
+    def _read_content(self, resp, max_size, extra):
+        """Reads the response body by chunks.
+
+        :param resp: Response opened in the streaming mode.
+        :param max_size: Max number of bytes to read, 0 for no limit.
+        :param extra: Dictionary to put additional result keys into.
+        :return: The body (possibly truncated) or the part of it written
+            to the file if the content goes into a file.
+        """
+        size = 0
+        truncated = False
+        first_chunk = None
+        chunks = []
+
+        out = None
+
+        if self.content_to_file:
+            content_dir = _get_content_dir()
+
+            _cleanup_content_files(content_dir)
+
+            out = tempfile.NamedTemporaryFile(
+                prefix=_CONTENT_FILE_PREFIX,
+                dir=content_dir,
+                delete=False
+            )
+
+        try:
+            for chunk in resp.iter_content(chunk_size=_CONTENT_CHUNK_SIZE):
+                if max_size and size + len(chunk) > max_size:
+                    chunk = chunk[:max_size - size]
+                    truncated = True
+
+                size += len(chunk)
+
+                if out:
+                    out.write(chunk)
+
+                    if first_chunk is None:
+                        first_chunk = chunk
+                else:
+                    chunks.append(chunk)
+
+                if truncated:
+                    break
+        finally:
+            if out:
+                out.close()
+
+        if truncated:
+            extra['content_truncated'] = True
+
+        if out:
+            extra['content_file'] = out.name
+            extra['content_size'] = size
+
+            return first_chunk or b''
+
+        return b''.join(chunks)
+
+    @staticmethod
+    def _parse_content(content, encoding, truncated):
+        if not truncated:
+            try:
+                return jsonutils.loads(content, encoding=encoding or 'utf-8')
+            except Exception:
+                LOG.debug("HTTP action response is not json.")
+
+        if content and encoding not in (None, 'utf-8'):
+            content = content.decode(encoding).encode('utf-8')
+
+        return content
+
     def test(self, context):
         # TODO(rakhmerov): Implement.
         return None
@@ -12,6 +12,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 from datetime import datetime
 from oslo_log import log as logging
 from pecan import rest
@@ -29,6 +30,27 @@ LOG = logging.getLogger(__name__)
 
 ESTIMATED_TIME_QUERY_LIMIT = 20
 
+_WF_EX_FIELDS = (
+    'id',
+    'name',
+    'created_at',
+    'updated_at',
+    'state',
+    'state_info'
+)
+
+_TASK_EX_FIELDS = _WF_EX_FIELDS + ('runtime_context',)
+
+_ACTION_EX_FIELDS = _WF_EX_FIELDS + ('accepted', 'last_heartbeat')
+
+_STATISTICS_COUNTERS = {
+    states.RUNNING: 'running_tasks_count',
+    states.SUCCESS: 'success_tasks_count',
+    states.ERROR: 'error_tasks_count',
+    states.IDLE: 'idle_tasks_count',
+    states.PAUSED: 'paused_tasks_count'
+}
+
 
 def create_workflow_execution_entry(wf_ex):
     return resources.WorkflowExecutionReportEntry.from_db_model(wf_ex)
@@ -55,111 +77,161 @@ def update_statistics_with_task(stat, task_ex):
         stat.increment_paused()
 
 
-def analyse_task_execution(task_ex_id, stat, filters, cur_depth):
-    with db_api.transaction():
-        task_ex = db_api.get_task_execution(task_ex_id)
+def update_statistics_with_counts(stat, counts):
+    for state, cnt in counts.items():
+        counter = _STATISTICS_COUNTERS.get(state)
 
-        if filters['errors_only'] and task_ex.state != states.ERROR:
-            return None
+        if counter:
+            setattr(stat, counter, getattr(stat, counter) + cnt)
 
-        update_statistics_with_task(stat, task_ex)
+            stat.total_tasks_count += cnt
 
-        entry = create_task_execution_entry(task_ex)
 
-        child_executions = task_ex.executions
+def _get_retry_count(runtime_context):
+    retry_ctx = (runtime_context or {}).get('retry_task_policy')
 
-    if 'retry_task_policy' in task_ex.runtime_context:
-        retry_ctx = task_ex.runtime_context['retry_task_policy']
+    return retry_ctx['retry_no'] if retry_ctx else None
 
-        entry.retry_count = retry_ctx['retry_no']
 
-    entry.action_executions = []
-    entry.workflow_executions = []
+class ExecutionTree(object):
+    """Workflow execution tree loaded with a few bulk queries.
 
-    for c_ex in child_executions:
-        if isinstance(c_ex, db_models.ActionExecution):
-            entry.action_executions.append(
-                create_action_execution_entry(c_ex)
-            )
-        else:
-            entry.workflow_executions.append(
-                analyse_workflow_execution(c_ex.id, stat, filters, cur_depth)
+    The whole tree of workflow executions is fetched with one query and
+    then task and action executions of all the workflow executions needed
+    for the report are fetched with one query per chunk of IDs. Only the
+    columns shown in the report are selected. The report is assembled
+    in memory.
+    """
+
+    def __init__(self, wf_ex_id, filters):
+        self.wf_ex_id = wf_ex_id
+        self.errors_only = filters['errors_only']
+        self.max_depth = filters['max_depth']
+
+        # Workflow executions in the order of traversal.
+        self.wf_exs = []
+
+        # IDs of the workflow executions whose tasks are analysed.
+        self.analysed_wf_ex_ids = []
+
+        # {task execution ID: [sub-workflow execution rows]}.
+        self.sub_wf_exs = collections.defaultdict(list)
+
+    def load(self, fields=()):
+        wf_ex = db_api.get_workflow_execution(
+            self.wf_ex_id,
+            fields=(
+                db_models.WorkflowExecution.id,
+                db_models.WorkflowExecution.root_execution_id
             )
+        )
 
-    return entry
+        rows = db_api.get_workflow_execution_tree(
+            wf_ex.root_execution_id or wf_ex.id,
+            fields=fields
+        )
 
+        # {parent workflow execution ID: [sub-workflow execution rows]}.
+        children = collections.defaultdict(list)
+        root = None
 
-def analyse_workflow_execution(wf_ex_id, stat, filters, cur_depth):
-    with db_api.transaction():
-        wf_ex = db_api.get_workflow_execution(wf_ex_id)
+        for row in rows:
+            if row.id == self.wf_ex_id:
+                root = row
+            elif row.parent_wf_ex_id:
+                children[row.parent_wf_ex_id].append(row)
 
-        entry = create_workflow_execution_entry(wf_ex)
+        # The same traversal as the one of analyse_workflow_execution().
+        # A sub-workflow gets the depth of its parent task.
+        to_visit = collections.deque([(root, 0)])
 
-        max_depth = filters['max_depth']
+        while to_visit:
+            row, depth = to_visit.popleft()
 
-        # Don't get deeper into the workflow task executions if
-        # maximum depth is defined and the current depth exceeds it.
-        if 0 <= max_depth < cur_depth:
-            return entry
+            self.wf_exs.append(row)
 
-        task_execs = wf_ex.task_executions
+            if 0 <= self.max_depth < depth:
+                continue
 
-    entry.task_executions = []
+            self.analysed_wf_ex_ids.append(row.id)
 
-    for t_ex in task_execs:
-        task_exec_entry = analyse_task_execution(
-            t_ex.id,
-            stat,
-            filters,
-            cur_depth + 1
-        )
+            for sub_row in children[row.id]:
+                if (self.errors_only and
+                        sub_row.parent_task_state != states.ERROR):
+                    continue
 
-        if task_exec_entry:
-            entry.task_executions.append(task_exec_entry)
+                self.sub_wf_exs[sub_row.task_execution_id].append(sub_row)
 
-    return entry
+                to_visit.append((sub_row, depth + 1))
 
+    def _get_task_state_filter(self):
+        return states.ERROR if self.errors_only else None
 
-def analyse_task_statistics_only(task_ex_id, stat, filters, cur_depth):
-    with db_api.transaction():
-        task_ex = db_api.get_task_execution(task_ex_id)
+    def build_statistics(self, stat):
+        with db_api.transaction():
+            self.load()
 
-        if filters['errors_only'] and task_ex.state != states.ERROR:
-            return
+            counts = db_api.get_task_execution_state_counts(
+                self.analysed_wf_ex_ids,
+                state=self._get_task_state_filter()
+            )
 
-        update_statistics_with_task(stat, task_ex)
+        update_statistics_with_counts(stat, counts)
 
-        child_executions = task_ex.executions
+    def build_report(self, stat):
+        with db_api.transaction():
+            self.load(fields=_WF_EX_FIELDS)
 
-    for c_ex in child_executions:
-        if not isinstance(c_ex, db_models.ActionExecution):
-            analyse_execution_statistics_only(
-                c_ex.id,
-                stat,
-                filters,
-                cur_depth
+            task_exs = db_api.get_task_executions_by_workflow_ids(
+                self.analysed_wf_ex_ids,
+                fields=_TASK_EX_FIELDS,
+                state=self._get_task_state_filter()
             )
 
+            action_exs = db_api.get_action_executions_by_task_ids(
+                [t_ex.id for t_ex in task_exs],
+                fields=_ACTION_EX_FIELDS
+            )
 
-def analyse_execution_statistics_only(wf_ex_id, stat, filters, cur_depth):
+        wf_entries = {
+            row.id: resources.WorkflowExecutionReportEntry.from_dict(
+                row._asdict()
+            )
+            for row in self.wf_exs
+        }
 
-    max_depth = filters['max_depth']
+        for wf_ex_id in self.analysed_wf_ex_ids:
+            wf_entries[wf_ex_id].task_executions = []
 
-    if 0 <= max_depth < cur_depth:
-        return
+        action_entries = collections.defaultdict(list)
 
-    with db_api.transaction():
-        wf_ex = db_api.get_workflow_execution(wf_ex_id)
+        for row in action_exs:
+            action_entries[row.task_execution_id].append(
+                resources.ActionExecutionReportEntry.from_dict(row._asdict())
+            )
 
-        task_execs = wf_ex.task_executions
+        for row in task_exs:
+            update_statistics_with_task(stat, row)
 
-    for t_ex in task_execs:
-        analyse_task_statistics_only(
-            t_ex.id,
-            stat,
-            filters,
-            cur_depth + 1
-        )
+            entry = resources.TaskExecutionReportEntry.from_dict(
+                row._asdict()
+            )
+
+            retry_count = _get_retry_count(row.runtime_context)
+
+            if retry_count is not None:
+                entry.retry_count = retry_count
+
+            entry.action_executions = action_entries[row.id]
+            entry.workflow_executions = [
+                wf_entries[sub_row.id] for sub_row in self.sub_wf_exs[row.id]
+            ]
+
+            wf_entries[row.workflow_execution_id].task_executions.append(
+                entry
+            )
+
+        return wf_entries[self.wf_ex_id]
 
 
 def calculate_estimated_left_time_for_exec(wf_ex, prev_wf_exs):
@@ -200,20 +272,12 @@ def build_report(wf_ex_id, filters):
 
     report.statistics = stat
 
+    tree = ExecutionTree(wf_ex_id, filters)
+
     if not filters['statistics_only']:
-        report.root_workflow_execution = analyse_workflow_execution(
-            wf_ex_id,
-            stat,
-            filters,
-            0
-        )
+        report.root_workflow_execution = tree.build_report(stat)
     else:
-        analyse_execution_statistics_only(
-            wf_ex_id,
-            stat,
-            filters,
-            0
-        )
+        tree.build_statistics(stat)
 
     return report
 
@@ -29,7 +29,6 @@ from mistral.api.controllers.v2 import types
 from mistral import context
 from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
-from mistral import expressions as expr
 from mistral.lang import parser as spec_parser
 from mistral.rpc import clients as rpc
 from mistral.utils import filter_utils
@@ -86,10 +85,10 @@ def get_published_global(task_ex, wf_ex=None):
 
     expr_ctx = data_flow.ContextView(
         data_flow.get_current_task_dict(task_ex),
-        task_ex.in_context,
+        data_flow.evaluate_task_inbound_context(task_ex),
         data_flow.get_workflow_environment_dict(wf_ex),
         wf_ex.context,
-        wf_ex.input
+        data_flow.get_workflow_input_dict(wf_ex)
     )
 
     task_spec = spec_parser.get_task_spec(task_ex.spec)
@@ -98,9 +97,7 @@ def get_published_global(task_ex, wf_ex=None):
     if not publish_spec:
         return
 
-    global_vars = publish_spec.get_global()
-
-    return expr.evaluate_recursively(global_vars, expr_ctx)
+    return publish_spec.get_global_plan().evaluate(expr_ctx)
 
 
 def _task_with_published_global(task, task_ex):
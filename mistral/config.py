@@ -234,12 +234,164 @@ engine_opts = [
                ' execution integrity checker can process in a single'
                ' iteration.')
     ),
+    cfg.IntOpt(
+        'execution_integrity_sweep_interval',
+        default=0,
+        min=0,
+        help=_('A number of seconds between runs of the execution '
+               'integrity sweeper. If set to a positive value then, '
+               'instead of scheduling a periodic integrity check for '
+               'every running workflow execution, every engine '
+               'periodically looks for task executions stuck in RUNNING '
+               'state across all workflow executions with one query and '
+               'fixes them. The work is split between engines by '
+               'workflow execution using the members of the engine '
+               'coordination group, so a coordination backend should be '
+               'configured if there are several engines, otherwise every '
+               'engine checks all the executions. If set to 0 then the '
+               'per-execution checks are used.')
+    ),
+    cfg.IntOpt(
+        'execution_integrity_sweep_batch_size',
+        default=1000,
+        min=1,
+        help=_('A number of task executions in RUNNING state that the '
+               'execution integrity sweeper selects from the database at '
+               'once.')
+    ),
+    cfg.FloatOpt(
+        'refresh_task_state_delay',
+        default=0.0,
+        min=0,
+        help=_('A number of seconds to wait before refreshing the state of '
+               'a task (e.g. a join) after one of its inbound tasks has '
+               'completed. Refreshes requested for the same task during '
+               'this window are coalesced into one so a bigger value '
+               'reduces the load caused by joins with many inbound tasks '
+               'at the cost of a longer reaction time.')
+    ),
     cfg.IntOpt(
         'action_definition_cache_time',
         default=60,
         help=_('A number of seconds that indicates how long action '
                'definitions should be stored in the local cache.')
     ),
+    cfg.IntOpt(
+        'expression_cache_size',
+        default=1000,
+        min=0,
+        help=_('The maximum number of parsed YAQL expressions and '
+               'compiled Jinja templates kept in the local LRU cache so '
+               'that the same expression is not parsed again on every '
+               'evaluation. If set to 0 the cache is disabled.')
+    ),
+    cfg.IntOpt(
+        'workflow_spec_cache_size',
+        default=100,
+        min=0,
+        help=_('The maximum number of parsed workflow specifications kept '
+               'in each of the local LRU caches of specifications by '
+               'workflow execution and by workflow definition. If set to '
+               '0 the caches are disabled.')
+    ),
+    cfg.IntOpt(
+        'workflow_spec_cache_max_memory',
+        default=0,
+        min=0,
+        help=_('The maximum total size (in KiB) of workflow specifications '
+               'kept in each of the local caches of specifications. The '
+               'size of a specification is estimated as the length of its '
+               'serialized form. If set to 0 the caches are only limited '
+               'by the number of specifications.')
+    ),
+    cfg.IntOpt(
+        'task_execution_batch_size',
+        default=20,
+        min=1,
+        help=_('The number of task executions that the engine loads from '
+               'the database at once when it needs to iterate through '
+               'a potentially big number of task executions, for example, '
+               'when evaluating the final workflow context.')
+    ),
+    cfg.BoolOpt(
+        'with_items_compact_state',
+        default=False,
+        help=_('If enabled, "with-items" tasks keep the indexes of the '
+               'iterations to run and the numbers of completed iterations '
+               'in the task runtime context instead of loading all action '
+               'executions of the task every time an iteration completes. '
+               'It is recommended for "with-items" tasks with a big number '
+               'of items. The option only affects tasks started after it '
+               'was changed.')
+    ),
+    cfg.IntOpt(
+        'with_items_dispatch_batch_size',
+        default=1000,
+        min=1,
+        help=_('The max number of iterations of a "with-items" task '
+               'without concurrency configured that run at the same time '
+               'if "with_items_compact_state" is enabled. The next batch '
+               'of iterations is dispatched when a half of them has '
+               'completed.')
+    ),
+    cfg.IntOpt(
+        'with_items_result_batch_size',
+        default=100,
+        min=1,
+        help=_('The number of action execution outputs that the engine '
+               'loads from the database at once when it builds the result '
+               'of a "with-items" task, for example, to publish variables.')
+    ),
+    cfg.IntOpt(
+        'max_task_context_layers',
+        default=20,
+        min=0,
+        help=_('The maximum number of layers that task inbound context '
+               'can consist of. Task inbound context is stored as a set '
+               'of references to upstream task executions and gets '
+               'materialized on demand. Once the number of layers that '
+               'need to be walked through in order to materialize the '
+               'context reaches this value the context is stored in full. '
+               'If set to 0 task inbound context is always stored in '
+               'full.')
+    ),
+    cfg.StrOpt(
+        'named_lock_backend',
+        choices=['db', 'advisory', 'local'],
+        default='db',
+        help=_('The backend used for named locks that the engine takes '
+               'to serialize concurrent operations on the same object, '
+               'for example, refreshing the state of the same task. '
+               'Use "db" to insert a row into the named locks table. '
+               'Use "advisory" to use native advisory locks of the '
+               'database (pg_advisory_xact_lock on PostgreSQL, GET_LOCK '
+               'on MySQL) which do not write anything to the database. '
+               'On other databases it works as "db". Use "local" to use '
+               'in-process striped locks which is the fastest option but '
+               'it is only safe if just one engine instance is running.')
+    ),
+    cfg.IntOpt(
+        'named_lock_stripes',
+        default=1024,
+        min=1,
+        help=_('The number of stripes that named locks are distributed '
+               'among when the "local" named lock backend is used. '
+               'Different names hashed into the same stripe share a lock.')
+    ),
+    cfg.BoolOpt(
+        'track_incomplete_tasks',
+        default=False,
+        help=_('Enables maintaining a counter of incomplete (not in a '
+               'terminal state) task executions for every new workflow '
+               'execution. The counter is updated as tasks are created '
+               'and completed and allows to check if a workflow has '
+               'completed without counting its task executions in the '
+               'database each time a task completes, which is expensive '
+               'for workflows with a large number of tasks. Tasks are '
+               'still counted in the database once the counter drops to '
+               'zero. Note that updating the counter makes task state '
+               'changes of the same workflow execution update its row.')
+    ),
     cfg.BoolOpt(
         'start_subworkflows_via_rpc',
         default=False,
@@ -283,6 +435,65 @@ executor_opts = [
         'version',
         default='1.0',
         help=_('The version of the executor.')
+    ),
+    cfg.FloatOpt(
+        'result_batch_interval',
+        min=0,
+        default=0,
+        help=_('How often (in seconds) the executor sends accumulated '
+               'action results to the engine. If set to a positive value '
+               'then results of completed actions are not sent one by one '
+               'but coalesced and sent in one RPC call, and the engine '
+               'processes them grouped by workflow execution. If set to 0 '
+               'then batching is disabled.')
+    ),
+    cfg.IntOpt(
+        'result_batch_size',
+        min=1,
+        default=100,
+        help=_('The maximum number of action results sent to the engine '
+               'in one RPC call if result_batch_interval is set. Once this '
+               'number of results is accumulated they are sent right away '
+               'without waiting for the end of the interval.')
+    ),
+    cfg.IntOpt(
+        'http_action_pool_size',
+        min=0,
+        default=0,
+        help=_('The maximum number of keep-alive connections that the '
+               'executor keeps per host for "std.http" actions. If set to a '
+               'positive value then HTTP actions sent to the same host with '
+               'the same TLS settings reuse connections, which saves TCP '
+               'and TLS handshakes. Cookies are never shared between '
+               'actions. If set to 0 then every action opens new '
+               'connections.')
+    ),
+    cfg.IntOpt(
+        'http_action_max_content_size',
+        min=0,
+        default=0,
+        help=_('The maximum size (in bytes) of a response body stored '
+               'in the result of a "std.http" action. Longer bodies are '
+               'truncated. The action parameter "max_content_size" '
+               'overrides it. If set to 0 then there is no limit.')
+    ),
+    cfg.StrOpt(
+        'http_action_content_dir',
+        help=_('The directory that "std.http" actions with the parameter '
+               '"content_to_file" stream response bodies into. The paths '
+               'of the files are put into the action results so the '
+               'directory needs to be shared with the components that '
+               'read the files. Defaults to the system temporary '
+               'directory.')
+    ),
+    cfg.IntOpt(
+        'http_action_content_file_ttl',
+        min=0,
+        default=3600,
+        help=_('The number of seconds after which the response body files '
+               'created by "std.http" actions are deleted. The executor '
+               'deletes expired files when an action writes a new one. If '
+               'set to 0 then the files are never deleted.')
     )
 ]
 
@@ -327,6 +538,17 @@ scheduler_opts = [
             'restriction on selection.'
         )
     ),
+    cfg.IntOpt(
+        'pool_size',
+        default=10,
+        min=1,
+        help=(
+            'The max number of scheduled jobs picked up from the job store '
+            'that a scheduler runs concurrently. If all workers are busy '
+            'the scheduler doesn\'t pick up new jobs until one of them '
+            'becomes available.'
+        )
+    ),
     cfg.FloatOpt(
         'captured_job_timeout',
         default=30,
@@ -438,6 +660,68 @@ notifier_opts = [
         item_type=json.loads,
         bounds=True,
         help=_('List of publishers to publish notification.')
+    ),
+    cfg.IntOpt(
+        'async_queue_size',
+        min=0,
+        default=0,
+        help=_('The maximum number of notifications waiting to be '
+               'delivered. If set to a positive value then notifications '
+               'are put into a queue and delivered asynchronously by a pool '
+               'of workers, with retries. Notifications that don\'t fit '
+               'into the queue go to the dead letter store. If set to 0 '
+               'then notifications are delivered synchronously.')
+    ),
+    cfg.IntOpt(
+        'async_workers',
+        min=1,
+        default=10,
+        help=_('The number of workers delivering notifications if '
+               'async_queue_size is set.')
+    ),
+    cfg.IntOpt(
+        'max_retries',
+        min=0,
+        default=3,
+        help=_('How many times delivery of a notification is retried if '
+               'async_queue_size is set. Notifications that could not be '
+               'delivered go to the dead letter store.')
+    ),
+    cfg.FloatOpt(
+        'retry_delay',
+        min=0,
+        default=1.0,
+        help=_('Delay (in seconds) before the first retry of a notification '
+               'delivery. The delay is doubled for every next retry.')
+    ),
+    cfg.IntOpt(
+        'dead_letter_size',
+        min=0,
+        default=1000,
+        help=_('The maximum number of undelivered notifications kept in '
+               'the dead letter store. The oldest ones are discarded.')
+    ),
+    cfg.FloatOpt(
+        'batch_interval',
+        min=0,
+        default=1.0,
+        help=_('The maximum time (in seconds) a notification waits for its '
+               'batch to be filled if the publisher is configured with '
+               '"batch_size" greater than 1 and async_queue_size is set.')
+    ),
+    cfg.FloatOpt(
+        'webhook_timeout',
+        min=0,
+        default=10.0,
+        help=_('Timeout (in seconds) of HTTP requests sent by the webhook '
+               'notification publisher.')
+    ),
+    cfg.IntOpt(
+        'webhook_pool_size',
+        min=1,
+        default=10,
+        help=_('The maximum number of keep-alive HTTP connections that '
+               'the webhook notification publisher keeps per endpoint.')
     )
 ]
 
@@ -523,6 +807,15 @@ action_heartbeat_opts = [
                'first_heartbeat_timeout = 3600, wait 3600 seconds before '
                'closing the action executions that never received a heartbeat.'
                )
+    ),
+    cfg.BoolOpt(
+        'pack_action_ids',
+        default=False,
+        help=_('Enables sending IDs of running action executions in '
+               'heartbeats packed into one compact string instead of a list '
+               'of strings. Enable it only once all engines are upgraded to '
+               'a version that accepts packed IDs, otherwise heartbeats '
+               'sent to older engines are lost.')
     )
 ]
 
@@ -18,6 +18,7 @@ import cachetools
 from oslo_config import cfg
 from oslo_db import options
 from oslo_db.sqlalchemy import enginefacade
+from oslo_log import log as logging
 import osprofiler.sqlalchemy
 import sqlalchemy as sa
 
@@ -26,11 +27,14 @@ from mistral import exceptions as exc
 from mistral_lib import utils
 
 
+LOG = logging.getLogger(__name__)
+
 # Note(dzimine): sqlite only works for basic testing.
 options.set_defaults(cfg.CONF, connection="sqlite:///mistral.sqlite")
 
 _DB_SESSION_THREAD_LOCAL_NAME = "__db_sql_alchemy_session__"
 _TX_SCOPED_CACHE_THREAD_LOCAL_NAME = "__tx_scoped_cache__"
+_END_TX_CALLBACKS_KEY = "mistral_end_tx_callbacks"
 
 _facade = None
 _sqlalchemy_create_engine_orig = sa.create_engine
@@ -167,6 +171,39 @@ def start_tx():
     _set_thread_local_session(_get_session())
 
 
+def is_tx_started():
+    """Checks whether a transaction is started in the current thread."""
+    return _get_thread_local_session() is not None
+
+
+def add_end_tx_callback(session, key, func):
+    """Registers a function to call when the session transaction ends.
+
+    The function is called once from end_tx() regardless of whether the
+    transaction was committed or rolled back. Registering a function with
+    the same key several times has no additional effect.
+
+    :param session: DB session.
+    :param key: Callback key.
+    :param func: Function without arguments.
+    """
+    session.info.setdefault(_END_TX_CALLBACKS_KEY, {}).setdefault(key, func)
+
+
+def _run_end_tx_callbacks(session):
+    callbacks = session.info.pop(_END_TX_CALLBACKS_KEY, {})
+
+    for key, func in callbacks.items():
+        try:
+            func()
+        except Exception as e:
+            LOG.warning(
+                "Failed to run end of transaction callback [key=%s]: %s",
+                key,
+                e
+            )
+
+
 def release_locks_if_sqlite(session):
     if get_driver_name() == 'sqlite':
         sqlite_lock.release_locks(session)
@@ -213,6 +250,8 @@ def end_tx():
     if ses.dirty:
         rollback_tx()
 
+    _run_end_tx_callbacks(ses)
+
     release_locks_if_sqlite(ses)
 
     ses.close()
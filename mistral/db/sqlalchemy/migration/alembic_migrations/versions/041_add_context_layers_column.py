@@ -0,0 +1,36 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add 'context_layers' column to 'task_executions_v2'.
+
+Revision ID: 041
+Revises: 040
+Create Date: 2026-10-17 10:00:00
+
+"""
+
+# revision identifiers, used by Alembic.
+
+from alembic import op
+from mistral.db.sqlalchemy import types as st
+import sqlalchemy as sa
+
+revision = '041'
+down_revision = '040'
+
+
+def upgrade():
+    op.add_column(
+        'task_executions_v2',
+        sa.Column('context_layers', st.JsonMediumDictType(), nullable=True)
+    )
@@ -0,0 +1,35 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add 'incomplete_tasks_count' column to 'workflow_executions_v2'.
+
+Revision ID: 043
+Revises: 042
+Create Date: 2026-10-17 14:00:00
+
+"""
+
+# revision identifiers, used by Alembic.
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = '043'
+down_revision = '042'
+
+
+def upgrade():
+    op.add_column(
+        'workflow_executions_v2',
+        sa.Column('incomplete_tasks_count', sa.Integer(), nullable=True)
+    )
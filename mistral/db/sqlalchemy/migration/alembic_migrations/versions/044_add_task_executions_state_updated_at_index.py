@@ -0,0 +1,35 @@
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+# http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or
+# implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Add index on 'state' and 'updated_at' to 'task_executions_v2'.
+
+Revision ID: 044
+Revises: 043
+Create Date: 2026-10-17 16:00:00
+
+"""
+
+# revision identifiers, used by Alembic.
+
+from alembic import op
+
+revision = '044'
+down_revision = '043'
+
+
+def upgrade():
+    op.create_index(
+        'task_executions_v2_state_updated_at',
+        'task_executions_v2',
+        ['state', 'updated_at']
+    )
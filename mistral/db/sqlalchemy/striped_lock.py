@@ -0,0 +1,94 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import zlib
+
+from eventlet import semaphore
+from oslo_db import exception as db_exc
+
+
+_mutex = semaphore.Semaphore()
+_stripes = {}
+_owners = {}
+
+
+def get_stripe(name, stripe_count):
+    # Python hash() of a string is randomized per process so a stable
+    # digest is used instead.
+    return zlib.crc32(name.encode('utf-8')) % stripe_count
+
+
+def acquire_lock(name, owner, stripe_count):
+    """Acquires the stripe lock that the given name is hashed into.
+
+    The lock is reentrant for the same owner so that one owner (normally
+    a DB session) can take several names that fall into the same stripe.
+
+    Unrelated names may share a stripe so an owner taking several stripes
+    could deadlock with another owner taking the same stripes in
+    the opposite order, even though their names are different. To prevent
+    that, an owner waits only for stripes with an index greater than the
+    indexes of all stripes it already holds. If a stripe with a lower
+    index is busy, DBDeadlock is raised so that the transaction is rolled
+    back, which releases its stripes, and retried.
+
+    :param name: Lock name.
+    :param owner: Lock owner.
+    :param stripe_count: Total number of stripes.
+    :return: True if the lock was held by another owner at the moment
+        of the call and so the caller had to wait for it.
+    """
+    idx = get_stripe(name, stripe_count)
+
+    with _mutex:
+        if _owners.get(idx) is owner:
+            return False
+
+        if idx not in _stripes:
+            _stripes[idx] = semaphore.BoundedSemaphore(1)
+
+        sem = _stripes[idx]
+
+        out_of_order = any(
+            i > idx for i, o in _owners.items() if o is owner
+        )
+
+    contended = not sem.acquire(blocking=False)
+
+    if contended:
+        if out_of_order:
+            raise db_exc.DBDeadlock()
+
+        sem.acquire()
+
+    with _mutex:
+        _owners[idx] = owner
+
+    return contended
+
+
+def release_locks(owner):
+    with _mutex:
+        for idx in [i for i, o in _owners.items() if o is owner]:
+            del _owners[idx]
+
+            _stripes[idx].release()
+
+
+def get_locks():
+    return _owners
+
+
+def cleanup():
+    with _mutex:
+        _owners.clear()
+        _stripes.clear()
@@ -318,6 +318,14 @@ def get_action_executions(**kwargs):
     return IMPL.get_action_executions(**kwargs)
 
 
+def get_action_execution_outputs(ids):
+    return IMPL.get_action_execution_outputs(ids)
+
+
+def get_action_executions_by_task_ids(task_ex_ids, fields=()):
+    return IMPL.get_action_executions_by_task_ids(task_ex_ids, fields)
+
+
 def create_action_execution(values):
     return IMPL.create_action_execution(values)
 
@@ -334,6 +342,10 @@ def update_action_execution_heartbeat(id):
     return IMPL.update_action_execution_heartbeat(id)
 
 
+def update_action_executions_heartbeat(ids):
+    return IMPL.update_action_executions_heartbeat(ids)
+
+
 def delete_action_execution(id):
     return IMPL.delete_action_execution(id)
 
@@ -380,6 +392,10 @@ def delete_workflow_execution(id):
     return IMPL.delete_workflow_execution(id)
 
 
+def get_workflow_execution_tree(root_execution_id, fields=()):
+    return IMPL.get_workflow_execution_tree(root_execution_id, fields)
+
+
 def delete_workflow_executions(**kwargs):
     IMPL.delete_workflow_executions(**kwargs)
 
@@ -388,6 +404,18 @@ def update_workflow_execution_state(**kwargs):
     return IMPL.update_workflow_execution_state(**kwargs)
 
 
+def change_incomplete_tasks_count(wf_ex_id, delta):
+    IMPL.change_incomplete_tasks_count(wf_ex_id, delta)
+
+
+def get_incomplete_tasks_count(wf_ex_id):
+    return IMPL.get_incomplete_tasks_count(wf_ex_id)
+
+
+def set_incomplete_tasks_count(wf_ex_id, count):
+    IMPL.set_incomplete_tasks_count(wf_ex_id, count)
+
+
 # Tasks executions.
 
 def get_task_execution(id, fields=()):
@@ -418,8 +446,11 @@ def get_completed_task_executions(**kwargs):
     return IMPL.get_completed_task_executions(**kwargs)
 
 
-def get_completed_task_executions_as_batches(**kwargs):
-    return IMPL.get_completed_task_executions_as_batches(**kwargs)
+def get_completed_task_executions_as_batches(batch_size=None, **kwargs):
+    return IMPL.get_completed_task_executions_as_batches(
+        batch_size=batch_size,
+        **kwargs
+    )
 
 
 def get_incomplete_task_executions(**kwargs):
@@ -430,6 +461,22 @@ def get_incomplete_task_executions_count(**kwargs):
     return IMPL.get_incomplete_task_executions_count(**kwargs)
 
 
+def get_stale_running_task_execution_ids(updated_before, limit, marker=None):
+    return IMPL.get_stale_running_task_execution_ids(
+        updated_before,
+        limit,
+        marker
+    )
+
+
+def get_task_executions_by_workflow_ids(wf_ex_ids, fields=(), state=None):
+    return IMPL.get_task_executions_by_workflow_ids(wf_ex_ids, fields, state)
+
+
+def get_task_execution_state_counts(wf_ex_ids, state=None):
+    return IMPL.get_task_execution_state_counts(wf_ex_ids, state)
+
+
 def create_task_execution(values):
     return IMPL.create_task_execution(values)
 
@@ -553,6 +600,13 @@ def get_expired_executions(expiration_time, limit=None, columns=()):
     )
 
 
+def get_running_expired_sync_action_execution_ids(expiration_time, limit):
+    return IMPL.get_running_expired_sync_action_execution_ids(
+        expiration_time,
+        limit
+    )
+
+
 def get_running_expired_sync_action_executions(expiration_time,
                                                limit, session=None):
     return IMPL.get_running_expired_sync_action_executions(
@@ -722,3 +776,11 @@ def delete_named_lock(lock_id):
 def named_lock(name):
     with IMPL.named_lock(name):
         yield
+
+
+def get_named_lock_stats(name=None):
+    return IMPL.get_named_lock_stats(name=name)
+
+
+def reset_named_lock_stats():
+    IMPL.reset_named_lock_stats()
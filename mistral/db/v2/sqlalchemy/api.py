@@ -15,12 +15,16 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import contextlib
 import datetime
+import hashlib
 import re
 import sys
 import threading
+import time
 
+import cachetools
 from oslo_config import cfg
 from oslo_db import exception as db_exc
 from oslo_db import sqlalchemy as oslo_sqlalchemy
@@ -33,6 +37,7 @@ from mistral import context
 from mistral.db.sqlalchemy import base as b
 from mistral.db.sqlalchemy import model_base as mb
 from mistral.db.sqlalchemy import sqlite_lock
+from mistral.db.sqlalchemy import striped_lock
 from mistral.db import utils as m_dbutils
 from mistral.db.v2.sqlalchemy import filters as db_filters
 from mistral.db.v2.sqlalchemy import models
@@ -47,6 +52,22 @@ LOG = logging.getLogger(__name__)
 _SCHEMA_LOCK = threading.RLock()
 _initialized = False
 
+_NAMED_LOCK_STATS_LOCK = threading.Lock()
+
+# Max number of IDs in one statement updating action execution heartbeats.
+_HEARTBEAT_CHUNK_SIZE = 1000
+
+# Max number of IDs in one "IN" clause of execution tree queries.
+_TREE_QUERY_CHUNK_SIZE = 1000
+
+_named_lock_stats = cachetools.LRUCache(maxsize=1000)
+_named_lock_totals = {
+    'acquired': 0,
+    'contended': 0,
+    'wait_time': 0.0,
+    'max_wait_time': 0.0
+}
+
 
 def get_backend():
     """Consumed by openstack common code.
@@ -303,7 +324,9 @@ def _get_count(model, insecure=False, **filters):
 def _get_db_object_by_name(model, name, columns=()):
     query = _secure_query(model, *columns)
 
-    return query.filter_by(name=name).first()
+    # NOTE: filter_by() can't be used if the first entity of the query
+    # is a column rather than a model.
+    return query.filter(model.name == name).first()
 
 
 def _get_db_object_by_id(model, id, insecure=False, columns=()):
@@ -313,7 +336,7 @@ def _get_db_object_by_id(model, id, insecure=False, columns=()):
         else _secure_query(model, *columns)
     )
 
-    return query.filter_by(id=id).first()
+    return query.filter(model.id == id).first()
 
 
 def _get_db_object_by_name_and_namespace_or_id(model, identifier,
@@ -986,6 +1009,35 @@ def update_action_execution_heartbeat(id, session=None):
         update({'last_heartbeat': now})
 
 
+@b.session_aware()
+def update_action_executions_heartbeat(ids, session=None):
+    """Updates heartbeat time of the given action executions.
+
+    Unlike update_action_execution_heartbeat, it takes one UPDATE statement
+    per chunk of IDs and IDs of nonexistent action executions are ignored.
+
+    :param ids: Action execution IDs.
+    :return: Number of updated action executions.
+    """
+    ids = list(ids)
+
+    now = utils.utc_now_sec()
+
+    count = 0
+
+    for i in range(0, len(ids), _HEARTBEAT_CHUNK_SIZE):
+        query = session.query(models.ActionExecution).filter(
+            models.ActionExecution.id.in_(ids[i:i + _HEARTBEAT_CHUNK_SIZE])
+        )
+
+        count += query.update(
+            {'last_heartbeat': now},
+            synchronize_session=False
+        )
+
+    return count
+
+
 @b.session_aware()
 def delete_action_execution(id, session=None):
     count = _secure_query(models.ActionExecution).filter(
@@ -1006,6 +1058,53 @@ def _get_action_executions(**kwargs):
     return _get_collection(models.ActionExecution, **kwargs)
 
 
+@b.session_aware()
+def get_action_execution_outputs(ids, session=None):
+    """Returns outputs of the action executions with the given IDs.
+
+    Only IDs and outputs are selected so that, unlike accessing the
+    deferred "output" attribute, it takes one query and the outputs
+    don't stay in the session along with action execution objects.
+
+    :param ids: Action execution IDs.
+    :return: Dictionary {action execution ID: output}.
+    """
+    if not ids:
+        return {}
+
+    query = _secure_query(
+        models.ActionExecution,
+        models.ActionExecution.id,
+        models.ActionExecution.output
+    )
+
+    query = query.filter(models.ActionExecution.id.in_(ids))
+
+    return {a_ex_id: output for a_ex_id, output in query.all()}
+
+
+@b.session_aware()
+def get_action_executions_by_task_ids(task_ex_ids, fields=(), session=None):
+    """Returns action executions of the given task executions.
+
+    One query is issued per chunk of task execution IDs.
+
+    :param task_ex_ids: Task execution IDs.
+    :param fields: Names of the fields to select. "task_execution_id"
+        is always selected.
+    :return: List of rows with the selected fields.
+    """
+    model = models.ActionExecution
+
+    columns = _get_tree_query_columns(model, fields, 'task_execution_id')
+
+    return _query_by_id_chunks(
+        b.model_query(model, columns).order_by(model.created_at),
+        model.task_execution_id,
+        task_ex_ids
+    )
+
+
 # Workflow executions.
 
 @b.session_aware()
@@ -1135,6 +1234,76 @@ def _get_all_direct_subworkflows(wf_ex_id):
     return [i[0] for i in query.all()]
 
 
+def _get_tree_query_columns(model, fields, *required_fields):
+    names = list(fields)
+
+    names.extend(f for f in required_fields if f not in names)
+
+    return [getattr(model, name) for name in names]
+
+
+def _query_by_id_chunks(query, id_column, ids):
+    ids = list(ids)
+
+    rows = []
+
+    for i in range(0, len(ids), _TREE_QUERY_CHUNK_SIZE):
+        rows.extend(
+            query.filter(
+                id_column.in_(ids[i:i + _TREE_QUERY_CHUNK_SIZE])
+            ).all()
+        )
+
+    return rows
+
+
+@b.session_aware()
+def get_workflow_execution_tree(root_execution_id, fields=(), session=None):
+    """Returns all workflow executions of one execution tree.
+
+    The tree consists of the root workflow execution and all its
+    sub-workflow executions at any depth. They are fetched with one
+    query, regardless of the depth of the tree.
+
+    :param root_execution_id: ID of the root workflow execution.
+    :param fields: Names of the workflow execution fields to select.
+        "id" and "task_execution_id" are always selected.
+    :return: List of rows with the selected fields and also
+        "parent_wf_ex_id" and "parent_task_state" which are
+        the workflow execution ID and the state of the task execution
+        that started a sub-workflow (None for the root execution).
+    """
+    wf_model = models.WorkflowExecution
+    task_model = models.TaskExecution
+
+    columns = _get_tree_query_columns(
+        wf_model,
+        fields,
+        'id',
+        'task_execution_id'
+    )
+
+    columns.append(task_model.workflow_execution_id.label('parent_wf_ex_id'))
+    columns.append(task_model.state.label('parent_task_state'))
+
+    if context.ctx().is_admin:
+        query = b.model_query(wf_model, columns)
+    else:
+        query = _secure_query(wf_model, *columns)
+
+    query = query.outerjoin(
+        task_model,
+        wf_model.task_execution_id == task_model.id
+    ).filter(
+        sa.or_(
+            wf_model.id == root_execution_id,
+            wf_model.root_execution_id == root_execution_id
+        )
+    ).order_by(wf_model.created_at)
+
+    return query.all()
+
+
 @b.session_aware()
 def delete_workflow_executions(session=None, **kwargs):
     return _delete_all(models.WorkflowExecution, **kwargs)
@@ -1146,6 +1315,56 @@ def update_workflow_execution_state(id, cur_state, state):
     return update_on_match(id, specimen, values={'state': state}, attempts=1)
 
 
+@b.session_aware()
+def change_incomplete_tasks_count(wf_ex_id, delta, session=None):
+    """Atomically changes the counter of incomplete tasks.
+
+    The change is made with one UPDATE statement so that concurrent
+    changes made by different transactions don't get lost. Workflow
+    executions that don't maintain the counter are not affected.
+
+    :param wf_ex_id: Workflow execution ID.
+    :param delta: Number to add to the counter.
+    """
+    model = models.WorkflowExecution
+
+    session.query(model).filter(
+        model.id == wf_ex_id,
+        model.incomplete_tasks_count.isnot(None)
+    ).update(
+        {model.incomplete_tasks_count: model.incomplete_tasks_count + delta},
+        synchronize_session=False
+    )
+
+
+@b.session_aware()
+def get_incomplete_tasks_count(wf_ex_id, session=None):
+    """Returns the counter of incomplete tasks stored in the database.
+
+    Unlike the attribute of a workflow execution object loaded into the
+    session, the value always reflects the changes made with
+    change_incomplete_tasks_count().
+
+    :param wf_ex_id: Workflow execution ID.
+    :return: The counter value or None if it's not maintained.
+    """
+    model = models.WorkflowExecution
+
+    return session.query(model.incomplete_tasks_count).filter(
+        model.id == wf_ex_id
+    ).scalar()
+
+
+@b.session_aware()
+def set_incomplete_tasks_count(wf_ex_id, count, session=None):
+    model = models.WorkflowExecution
+
+    session.query(model).filter(model.id == wf_ex_id).update(
+        {model.incomplete_tasks_count: count},
+        synchronize_session=False
+    )
+
+
 # Tasks executions.
 
 @b.session_aware()
@@ -1202,8 +1421,61 @@ def get_completed_task_executions(session=None, **kwargs):
     return query.all()
 
 
+def _get_batches_by_keyset(query, key_columns, batch_size):
+    """Iterates through the query results in batches.
+
+    The results are ordered by the given columns and every next batch is
+    selected with a condition on the last seen key (keyset pagination).
+    Unlike OFFSET based pagination, the cost of fetching a batch doesn't
+    depend on the number of the rows already fetched and rows inserted
+    concurrently don't shift the results.
+
+    :param query: Query to iterate through.
+    :param key_columns: Columns to order the results by. Their values
+        must be unique together, e.g. (created_at, id).
+    :param batch_size: Maximum number of rows in a batch.
+    """
+    last_key = None
+
+    while True:
+        batch_query = query
+
+        if last_key is not None:
+            batch_query = batch_query.filter(
+                _get_keyset_condition(key_columns, last_key)
+            )
+
+        batch = batch_query.order_by(*key_columns).limit(batch_size).all()
+
+        if batch:
+            yield batch
+
+        if len(batch) < batch_size:
+            return
+
+        last_key = [getattr(batch[-1], col.key) for col in key_columns]
+
+
+def _get_keyset_condition(key_columns, key):
+    # Row value comparison "(c1, c2) > (v1, v2)" isn't supported by all
+    # databases so it's expanded into "c1 > v1 OR (c1 = v1 AND c2 > v2)".
+    col, val = key_columns[0], key[0]
+
+    if len(key_columns) == 1:
+        return col > val
+
+    return sa.or_(
+        col > val,
+        sa.and_(
+            col == val,
+            _get_keyset_condition(key_columns[1:], key[1:])
+        )
+    )
+
+
 @b.session_aware()
-def get_completed_task_executions_as_batches(session=None, **kwargs):
+def get_completed_task_executions_as_batches(session=None, batch_size=None,
+                                             **kwargs):
     # NOTE: Using batch querying seriously allows to optimize memory
     # consumption on operations when we need to iterate through
     # a list of task executions and do some processing like merging
@@ -1213,17 +1485,14 @@ def get_completed_task_executions_as_batches(session=None, **kwargs):
     # batch of task executions that has already been processed.
     query = _get_completed_task_executions_query(kwargs)
 
-    # Batch size 20 may be arguable but still seems reasonable: it's big
-    # enough to keep the total number of DB hops small (say for 100 tasks
-    # we'll need only 5) and small enough not to drastically increase
-    # memory footprint if the number of tasks is big like several hundreds.
-    batch_size = 20
-    idx = 0
-
-    while idx < query.count():
-        yield query.slice(idx, idx + batch_size).all()
+    batches = _get_batches_by_keyset(
+        query,
+        (models.TaskExecution.created_at, models.TaskExecution.id),
+        batch_size or CONF.engine.task_execution_batch_size
+    )
 
-        idx += batch_size
+    for batch in batches:
+        yield batch
 
 
 def _get_incomplete_task_executions_query(kwargs):
@@ -1258,6 +1527,100 @@ def get_incomplete_task_executions_count(session=None, **kwargs):
     return query.count()
 
 
+@b.session_aware()
+def get_stale_running_task_execution_ids(updated_before, limit, marker=None,
+                                         session=None):
+    """Returns IDs of task executions not updated for a while in RUNNING.
+
+    Task executions of all workflow executions are checked with one
+    query. Results are ordered by ID so that they can be iterated through
+    with keyset pagination.
+
+    :param updated_before: Only task executions updated (or created if
+        they have never been updated) before this time are returned.
+    :param limit: Maximum number of task executions to return.
+    :param marker: If specified, only task executions with greater IDs
+        are returned.
+    :return: List of tuples (task execution ID, workflow execution ID).
+    """
+    model = models.TaskExecution
+
+    query = b.model_query(
+        model,
+        (model.id, model.workflow_execution_id)
+    ).filter(
+        model.state == states.RUNNING,
+        sa.or_(
+            model.updated_at < updated_before,
+            sa.and_(
+                model.updated_at.is_(None),
+                model.created_at < updated_before
+            )
+        )
+    )
+
+    if marker is not None:
+        query = query.filter(model.id > marker)
+
+    return [tuple(row) for row in query.order_by(model.id).limit(limit)]
+
+
+@b.session_aware()
+def get_task_executions_by_workflow_ids(wf_ex_ids, fields=(), state=None,
+                                        session=None):
+    """Returns task executions of the given workflow executions.
+
+    One query is issued per chunk of workflow execution IDs.
+
+    :param wf_ex_ids: Workflow execution IDs.
+    :param fields: Names of the fields to select. "workflow_execution_id"
+        is always selected.
+    :param state: Optional. If specified, only task executions in this
+        state are returned.
+    :return: List of rows with the selected fields.
+    """
+    model = models.TaskExecution
+
+    columns = _get_tree_query_columns(model, fields, 'workflow_execution_id')
+
+    query = b.model_query(model, columns).order_by(model.created_at)
+
+    if state:
+        query = query.filter(model.state == state)
+
+    return _query_by_id_chunks(query, model.workflow_execution_id, wf_ex_ids)
+
+
+@b.session_aware()
+def get_task_execution_state_counts(wf_ex_ids, state=None, session=None):
+    """Counts task executions of the given workflow executions by state.
+
+    :param wf_ex_ids: Workflow execution IDs.
+    :param state: Optional. If specified, only task executions in this
+        state are counted.
+    :return: Dictionary {state: number of task executions}.
+    """
+    model = models.TaskExecution
+
+    query = b.model_query(
+        model,
+        (model.state, sa.func.count(model.id))
+    ).group_by(model.state)
+
+    if state:
+        query = query.filter(model.state == state)
+
+    counts = collections.defaultdict(int)
+
+    # Chunks may give the same state more than once so the numbers
+    # are summed up.
+    for t_state, cnt in _query_by_id_chunks(
+            query, model.workflow_execution_id, wf_ex_ids):
+        counts[t_state] += cnt
+
+    return dict(counts)
+
+
 @b.session_aware()
 def create_task_execution(values, session=None):
     task_ex = models.TaskExecution()
@@ -1545,19 +1908,54 @@ def get_expired_executions(expiration_time, limit=None, columns=(),
     return query.all()
 
 
-@b.session_aware()
-def get_running_expired_sync_action_executions(expiration_time,
-                                               limit, session=None):
-    query = b.model_query(models.ActionExecution)
+def _get_running_expired_sync_action_executions_query(expiration_time,
+                                                      *columns):
+    query = b.model_query(models.ActionExecution, columns)
 
+    query = query.filter(models.ActionExecution.state == states.RUNNING)
     query = query.filter(
         models.ActionExecution.last_heartbeat < expiration_time
     )
-    query = query.filter_by(is_sync=True)
-    query = query.filter(models.ActionExecution.state == states.RUNNING)
+
+    return query.filter_by(is_sync=True)
+
+
+@b.session_aware()
+def get_running_expired_sync_action_execution_ids(expiration_time, limit,
+                                                  session=None):
+    """Returns IDs of running sync action executions without heartbeats.
+
+    Only IDs are selected so that finding expired action executions
+    doesn't require loading full rows. Action executions with the oldest
+    heartbeats go first.
+
+    :param expiration_time: Action executions with the last heartbeat
+        older than this time are considered expired.
+    :param limit: Max number of IDs to return.
+    :return: List of action execution IDs.
+    """
+    query = _get_running_expired_sync_action_executions_query(
+        expiration_time,
+        models.ActionExecution.id
+    )
+
+    query = query.order_by(models.ActionExecution.last_heartbeat)
 
     if limit:
-        query.limit(limit)
+        query = query.limit(limit)
+
+    return [a_ex_id for a_ex_id, in query.all()]
+
+
+@b.session_aware()
+def get_running_expired_sync_action_executions(expiration_time,
+                                               limit, session=None):
+    query = _get_running_expired_sync_action_executions_query(
+        expiration_time
+    )
+
+    if limit:
+        query = query.limit(limit)
 
     return query.all()
 
@@ -2100,16 +2498,206 @@ def delete_named_lock(lock_id, session=None):
     session.flush()
 
 
+# Session info key of a tuple (connection, {lock name => number of
+# acquisitions}) of MySQL advisory locks taken within the session
+# transaction.
+_ADVISORY_LOCKS_KEY = 'advisory-named-locks'
+
+
+def _get_advisory_lock_key(name):
+    # Advisory lock keys are limited (a 64 bit integer for PostgreSQL,
+    # 64 characters for MySQL) so the name is hashed.
+    digest = hashlib.sha1(name.encode('utf-8')).digest()
+
+    return int.from_bytes(digest[:8], 'big', signed=True)
+
+
+@b.session_aware()
+def _acquire_advisory_named_lock(name, session=None):
+    key = _get_advisory_lock_key(name)
+
+    if b.get_dialect_name() == 'postgresql':
+        # The lock gets released automatically when the transaction ends.
+        stmt = 'SELECT pg_%sadvisory_xact_lock(:key)'
+
+        if session.execute(sa.text(stmt % 'try_'), {'key': key}).scalar():
+            return False
+
+        session.execute(sa.text(stmt % ''), {'key': key})
+
+        return True
+
+    # MySQL locks are bound to the connection rather than the transaction
+    # so they need to be released explicitly when the transaction ends.
+    lock_name = 'mistral-%x' % (key & 0xffffffffffffffff)
+
+    contended = not session.execute(
+        sa.text('SELECT GET_LOCK(:name, 0)'),
+        {'name': lock_name}
+    ).scalar()
+
+    if contended:
+        session.execute(
+            sa.text('SELECT GET_LOCK(:name, -1)'),
+            {'name': lock_name}
+        )
+
+    # MySQL counts acquisitions of the same lock by the same connection
+    # so it has to be released as many times as it was acquired.
+    _get_advisory_lock_counts(session)[lock_name] += 1
+
+    return contended
+
+
+def _get_advisory_lock_counts(session):
+    conn = session.connection()
+
+    locks = session.info.get(_ADVISORY_LOCKS_KEY)
+
+    if locks is None or locks[0] is not conn:
+        counts = collections.Counter()
+
+        session.info[_ADVISORY_LOCKS_KEY] = (conn, counts)
+
+        # MySQL locks are bound to the connection so they have to be
+        # released by the same connection right before the transaction
+        # ends. Once it ends the connection goes back to the pool and
+        # the session may use another one.
+        def _release(conn):
+            _release_advisory_named_locks(conn, counts)
+
+        sa.event.listen(conn, 'commit', _release)
+        sa.event.listen(conn, 'rollback', _release)
+
+        return counts
+
+    return locks[1]
+
+
+def _release_advisory_named_locks(conn, counts):
+    try:
+        for lock_name, cnt in counts.items():
+            for _ in range(cnt):
+                conn.execute(
+                    sa.text('SELECT RELEASE_LOCK(:name)'),
+                    {'name': lock_name}
+                )
+    except Exception as e:
+        # Otherwise, the locks are only released when the connection
+        # is closed.
+        LOG.warning("Failed to release advisory named locks: %s", e)
+    finally:
+        counts.clear()
+
+
+@b.session_aware()
+def _acquire_local_named_lock(name, session=None):
+    contended = striped_lock.acquire_lock(
+        name,
+        session,
+        CONF.engine.named_lock_stripes
+    )
+
+    b.add_end_tx_callback(
+        session,
+        'local-named-locks',
+        lambda: striped_lock.release_locks(session)
+    )
+
+    return contended
+
+
+def _get_named_lock_backend():
+    backend = CONF.engine.named_lock_backend
+
+    if (backend == 'advisory' and
+            b.get_dialect_name() not in ('postgresql', 'mysql')):
+        return 'db'
+
+    return backend
+
+
+def _new_named_lock_stats():
+    return {
+        'acquired': 0,
+        'contended': 0,
+        'wait_time': 0.0,
+        'max_wait_time': 0.0
+    }
+
+
+def _record_named_lock_wait(name, wait_time, contended):
+    with _NAMED_LOCK_STATS_LOCK:
+        if name not in _named_lock_stats:
+            _named_lock_stats[name] = _new_named_lock_stats()
+
+        for stats in (_named_lock_stats[name], _named_lock_totals):
+            stats['acquired'] += 1
+            stats['wait_time'] += wait_time
+            stats['max_wait_time'] = max(stats['max_wait_time'], wait_time)
+
+            if contended:
+                stats['contended'] += 1
+
+
+def get_named_lock_stats(name=None):
+    """Returns wait time and contention statistics of named locks.
+
+    :param name: Lock name. If not specified, the statistics aggregated
+        over all named locks is returned. Statistics of individual locks
+        is only kept for a limited number of recently used names.
+    :return: Dictionary with the number of acquisitions, the number of
+        acquisitions that had to wait for another holder (detected only
+        by the "advisory" and "local" backends), and the total and
+        the maximum time in seconds spent waiting for the lock.
+    """
+    with _NAMED_LOCK_STATS_LOCK:
+        if name is None:
+            return dict(_named_lock_totals)
+
+        return dict(_named_lock_stats.get(name) or _new_named_lock_stats())
+
+
+def reset_named_lock_stats():
+    with _NAMED_LOCK_STATS_LOCK:
+        _named_lock_stats.clear()
+        _named_lock_totals.update(_new_named_lock_stats())
+
+
 @contextlib.contextmanager
 def named_lock(name):
+    backend = _get_named_lock_backend()
+
+    if backend != 'db' and not b.is_tx_started():
+        # Advisory and local locks are held until the end of
+        # the transaction so we need to have one.
+        with transaction():
+            with named_lock(name):
+                yield
+
+        return
+
     # NOTE(rakhmerov): We can't use the well-known try-finally pattern here
     # because if lock creation failed then it means that the SQLAlchemy
     # session is no longer valid and we can't use to try to delete the lock.
     # All we can do here is to let the exception bubble up so that the
     # transaction management code could rollback the transaction.
 
-    lock_id = create_named_lock(name)
+    started = time.time()
+
+    lock_id = None
+    contended = False
+
+    if backend == 'local':
+        contended = _acquire_local_named_lock(name)
+    elif backend == 'advisory':
+        contended = _acquire_advisory_named_lock(name)
+    else:
+        lock_id = create_named_lock(name)
+
+    _record_named_lock_wait(name, time.time() - started, contended)
 
     yield
 
-    delete_named_lock(lock_id)
+    if lock_id:
+        delete_named_lock(lock_id)
@@ -283,7 +283,12 @@ class ActionExecution(Execution):
         sa.Index('%s_project_id' % __tablename__, 'project_id'),
         sa.Index('%s_scope' % __tablename__, 'scope'),
         sa.Index('%s_state' % __tablename__, 'state'),
-        sa.Index('%s_updated_at' % __tablename__, 'updated_at')
+        sa.Index('%s_updated_at' % __tablename__, 'updated_at'),
+        sa.Index(
+            '%s_state_last_heartbeat' % __tablename__,
+            'state',
+            'last_heartbeat'
+        )
     )
 
     # Main properties.
@@ -327,6 +332,11 @@ class WorkflowExecution(Execution):
     #   * This structure does not contain workflow input.
     context = sa.orm.deferred(sa.Column(st.JsonLongDictType()))
 
+    # The number of task executions of this workflow execution that are
+    # not in a terminal state. It's only maintained if it was initialized
+    # when the workflow execution was created, None otherwise.
+    incomplete_tasks_count = sa.Column(sa.Integer(), nullable=True)
+
 
 class TaskExecution(Execution):
     """Contains task runtime information."""
@@ -338,6 +348,11 @@ class TaskExecution(Execution):
         sa.Index('%s_scope' % __tablename__, 'scope'),
         sa.Index('%s_state' % __tablename__, 'state'),
         sa.Index('%s_updated_at' % __tablename__, 'updated_at'),
+        sa.Index(
+            '%s_state_updated_at' % __tablename__,
+            'state',
+            'updated_at'
+        ),
         sa.UniqueConstraint('unique_key')
     )
 
@@ -375,6 +390,12 @@ class TaskExecution(Execution):
     in_context = sa.Column(st.JsonLongDictType())
     published = sa.Column(st.JsonLongDictType())
 
+    # References to the layers that the inbound context consists of.
+    # {'refs': [upstream task execution IDs], 'depth': layer depth,
+    #  'versions': {key: [version, origin]}}. If the field is empty
+    # then 'in_context' contains the full inbound context.
+    context_layers = sa.Column(st.JsonMediumDictType())
+
     @property
     def executions(self):
         return (
@@ -396,6 +396,10 @@ class WorkflowAction(Action):
         if 'notify' in parent_wf_ex.params:
             wf_params['notify'] = parent_wf_ex.params['notify']
 
+        # NOTE: The input may share its values with the task specification
+        # so we have to make a copy before removing the keys.
+        input_dict = dict(input_dict)
+
         for k, v in list(input_dict.items()):
             if k not in wf_spec.get_input():
                 wf_params[k] = v
@@ -81,6 +81,18 @@ class Engine(object, metaclass=abc.ABCMeta):
         """
         raise NotImplementedError
 
+    @abc.abstractmethod
+    def on_actions_complete(self, results):
+        """Accepts results of multiple actions and continues the workflows.
+
+        Unlike on_action_complete, results are applied grouped by workflow
+        execution, one transaction per group.
+
+        :param results: List of pairs (action execution id, result) where
+            result is an instance of mistral.workflow.base.Result
+        """
+        raise NotImplementedError
+
     @abc.abstractmethod
     def pause_workflow(self, wf_ex_id):
         """Pauses workflow.
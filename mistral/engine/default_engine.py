@@ -16,6 +16,8 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from osprofiler import profiler
@@ -171,6 +173,84 @@ class DefaultEngine(base.Engine):
 
             return action_ex.get_clone()
 
+    @profiler.trace('engine-on-actions-complete', hide_args=True)
+    def on_actions_complete(self, results):
+        results = collections.OrderedDict(results)
+
+        groups = self._group_action_results(list(results.keys()))
+
+        # Every group of action results is applied in a separate
+        # transaction so that a failure in one workflow execution
+        # doesn't affect the others. Sorting makes the order in which
+        # different engines process the same workflow executions stable.
+        for wf_ex_id in sorted(groups, key=lambda x: x or ''):
+            action_ex_ids = groups[wf_ex_id]
+
+            try:
+                self._on_actions_complete(
+                    [(a_ex_id, results[a_ex_id]) for a_ex_id in action_ex_ids]
+                )
+            except Exception:
+                LOG.exception(
+                    "Failed to process a batch of action results, processing"
+                    " them one by one [wf_ex_id=%s, action_ex_ids=%s]",
+                    wf_ex_id,
+                    action_ex_ids
+                )
+
+                for a_ex_id in action_ex_ids:
+                    try:
+                        self.on_action_complete(a_ex_id, results[a_ex_id])
+                    except Exception:
+                        LOG.exception(
+                            "Failed to process action result "
+                            "[action_ex_id=%s]",
+                            a_ex_id
+                        )
+
+    @db_utils.retry_on_db_error
+    def _group_action_results(self, action_ex_ids):
+        groups = collections.defaultdict(list)
+
+        with db_api.transaction():
+            action_exs = db_api.get_action_executions(
+                id={'in': action_ex_ids}
+            )
+
+            for a_ex in action_exs:
+                task_ex = a_ex.task_execution
+
+                wf_ex_id = task_ex.workflow_execution_id if task_ex else None
+
+                groups[wf_ex_id].append(a_ex.id)
+
+        missing_ids = set(action_ex_ids) - set(
+            a_ex_id for ids in groups.values() for a_ex_id in ids
+        )
+
+        if missing_ids:
+            LOG.warning(
+                "Results of unknown action executions are ignored "
+                "[action_ex_ids=%s]",
+                missing_ids
+            )
+
+        return groups
+
+    @db_utils.retry_on_db_error
+    @post_tx_queue.run
+    def _on_actions_complete(self, results):
+        with db_api.transaction():
+            action_exs = {
+                a_ex.id: a_ex
+                for a_ex in db_api.get_action_executions(
+                    id={'in': [a_ex_id for a_ex_id, _ in results]}
+                )
+            }
+
+            for a_ex_id, result in results:
+                action_handler.on_action_complete(action_exs[a_ex_id], result)
+
     @db_utils.retry_on_db_error
     @post_tx_queue.run
     @profiler.trace('engine-on-action-update', hide_args=True)
@@ -234,16 +314,19 @@ class DefaultEngine(base.Engine):
     @db_utils.retry_on_db_error
     @post_tx_queue.run
     def process_action_heartbeats(self, action_ex_ids):
+        action_ex_ids = [a_ex_id for a_ex_id in action_ex_ids if a_ex_id]
+
+        if not action_ex_ids:
+            return
+
         with db_api.transaction():
-            for exec_id in action_ex_ids:
-                try:
-                    db_api.update_action_execution_heartbeat(exec_id)
-                except exceptions.DBEntityNotFoundError:
-                    LOG.debug(
-                        "Action execution heartbeat update failed. {}"
-                        .format(exec_id),
-                        exc_info=True
-                    )
-                    # Ignore this error and continue with the
-                    # remaining ids.
-                    pass
+            cnt = db_api.update_action_executions_heartbeat(action_ex_ids)
+
+        if cnt < len(action_ex_ids):
+            # Some of the action executions may have been already deleted.
+            LOG.debug(
+                "Heartbeats of %s action executions out of %s were not "
+                "updated.",
+                len(action_ex_ids) - cnt,
+                len(action_ex_ids)
+            )
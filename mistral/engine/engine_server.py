@@ -23,8 +23,11 @@ from mistral.scheduler import base as sched_base
 from mistral.service import base as service_base
 from mistral.services import action_heartbeat_checker
 from mistral.services import action_heartbeat_sender
+from mistral.services import action_result_batcher
+from mistral.services import execution_integrity_sweeper
 from mistral.services import expiration_policy
 from mistral.utils import profiler as profiler_utils
+from mistral_lib import serialization
 from mistral_lib import utils
 
 LOG = logging.getLogger(__name__)
@@ -70,6 +73,8 @@ class EngineServer(service_base.MistralService):
 
         action_heartbeat_checker.start()
 
+        execution_integrity_sweeper.start(self.cluster_member.group_type)
+
         # If the current engine instance uses a local action executor
         # then we also need to initialize a heartbeat reporter for it.
         # Heartbeats will be sent to the engine tier in the same way as
@@ -79,6 +84,7 @@ class EngineServer(service_base.MistralService):
         # of time.
         if CONF.executor.type == 'local':
             action_heartbeat_sender.start()
+            action_result_batcher.start()
 
         if self._setup_profiler:
             profiler_utils.setup('mistral-engine', CONF.engine.host)
@@ -120,8 +126,11 @@ class EngineServer(service_base.MistralService):
 
         action_heartbeat_checker.stop(graceful)
 
+        execution_integrity_sweeper.stop(graceful)
+
         if CONF.executor.type == 'local':
             action_heartbeat_sender.stop(graceful)
+            action_result_batcher.stop(graceful)
 
         if self._scheduler:
             self._scheduler.stop(graceful)
@@ -214,6 +223,27 @@ class EngineServer(service_base.MistralService):
         )
         return self.engine.on_action_complete(action_ex_id, result, wf_action)
 
+    def on_actions_complete(self, rpc_ctx, results):
+        """Receives RPC calls to communicate multiple action results.
+
+        :param rpc_ctx: RPC request context.
+        :param results: List of pairs (action execution id, serialized
+            action result).
+        """
+        LOG.info(
+            "Received RPC request 'on_actions_complete'[action_ex_ids=%s]",
+            [action_ex_id for action_ex_id, _ in results]
+        )
+
+        serializer = serialization.get_polymorphic_serializer()
+
+        return self.engine.on_actions_complete(
+            [
+                (action_ex_id, serializer.deserialize(result))
+                for action_ex_id, result in results
+            ]
+        )
+
     def on_action_update(self, rpc_ctx, action_ex_id, state, wf_action):
         """Receives RPC calls to communicate action execution state to engine.
 
@@ -320,8 +350,12 @@ class EngineServer(service_base.MistralService):
         """Receives calls over RPC to receive action execution heartbeats.
 
         :param rpc_ctx: RPC request context.
-        :param action_ex_ids: Action execution ids.
+        :param action_ex_ids: Action execution ids, either a list or
+            a string with ids packed with rpc.pack_uuids().
         """
+        if isinstance(action_ex_ids, str):
+            action_ex_ids = rpc.unpack_uuids(action_ex_ids)
+
         LOG.info(
             "Received RPC request 'report_running_actions'[action_ex_ids=%s]",
             action_ex_ids
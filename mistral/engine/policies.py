@@ -18,7 +18,6 @@ from mistral.db.v2 import api as db_api
 from mistral.engine import base
 from mistral.engine import post_tx_queue
 from mistral.engine import workflow_handler as wf_handler
-from mistral import expressions
 from mistral.scheduler import base as sched_base
 from mistral.utils import wf_trace
 from mistral.workflow import data_flow
@@ -105,8 +104,8 @@ def build_retry_policy(policies_spec):
     return RetryPolicy(
         retry.get_count(),
         retry.get_delay(),
-        retry.get_break_on(),
-        retry.get_continue_on()
+        retry.get_break_on_plan(),
+        retry.get_continue_on_plan()
     )
 
 
@@ -281,6 +280,13 @@ class RetryPolicy(base.TaskPolicy):
     }
 
     def __init__(self, count, delay, break_on, continue_on):
+        """Constructs the policy.
+
+        :param count: Number of retries.
+        :param delay: Delay between retries.
+        :param break_on: Evaluation plan of the "break-on" condition.
+        :param continue_on: Evaluation plan of the "continue-on" condition.
+        """
         self.count = count
         self.delay = delay
         self._break_on_clause = break_on
@@ -321,14 +327,14 @@ class RetryPolicy(base.TaskPolicy):
             ctx=data_flow.evaluate_task_outbound_context(task.task_ex)
         )
 
-        continue_on_evaluation = expressions.evaluate(
-            self._continue_on_clause,
-            expr_ctx
+        continue_on_evaluation = self._continue_on_clause.evaluate(
+            expr_ctx,
+            copy_on_write=True
         )
 
-        break_on_evaluation = expressions.evaluate(
-            self._break_on_clause,
-            expr_ctx
+        break_on_evaluation = self._break_on_clause.evaluate(
+            expr_ctx,
+            copy_on_write=True
         )
 
         state = task.get_state()
@@ -349,12 +355,13 @@ class RetryPolicy(base.TaskPolicy):
 
         stop_continue_flag = (
             task.get_state() == states.SUCCESS and
-            not self._continue_on_clause
+            not self._continue_on_clause.get_data()
         )
 
         stop_continue_flag = (
             stop_continue_flag or
-            (self._continue_on_clause and not continue_on_evaluation)
+            (self._continue_on_clause.get_data() and
+             not continue_on_evaluation)
         )
 
         break_triggered = (
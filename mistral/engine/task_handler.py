@@ -15,6 +15,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from oslo_config import cfg
 from oslo_log import log as logging
 from osprofiler import profiler
 import traceback as tb
@@ -30,6 +31,7 @@ from mistral.lang import parser as spec_parser
 from mistral.scheduler import base as sched_base
 from mistral.workflow import base as wf_base
 from mistral.workflow import commands as wf_cmds
+from mistral.workflow import data_flow
 from mistral.workflow import states
 
 # TODO(rakhmerov): At some point we need to completely switch to
@@ -42,6 +44,8 @@ from mistral_lib import exceptions as mistral_lib_exc
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 _REFRESH_TASK_STATE_PATH = (
     'mistral.engine.task_handler._refresh_task_state'
 )
@@ -113,7 +117,7 @@ def _on_action_complete(action_ex):
         wf_ex,
         spec_parser.get_workflow_spec_by_execution_id(wf_ex.id),
         task_spec,
-        task_ex.in_context,
+        data_flow.evaluate_task_inbound_context(task_ex),
         task_ex
     )
 
@@ -153,7 +157,7 @@ def _on_action_update(action_ex):
         wf_ex,
         spec_parser.get_workflow_spec_by_execution_id(wf_ex.id),
         task_spec,
-        task_ex.in_context,
+        data_flow.evaluate_task_inbound_context(task_ex),
         task_ex
     )
 
@@ -298,27 +302,9 @@ def _check_affected_tasks(task):
         task_ex.name
     )
 
-    def _schedule_if_needed(t_ex_id):
-        # NOTE(rakhmerov): we need to minimize the number of scheduled jobs
-        # that refresh state of "join" tasks. We'll check if corresponding
-        # jobs are already scheduled. Note that we must ignore scheduled jobs
-        # that are currently being processed because of a possible race with
-        # the transaction that deletes scheduled jobs, i.e. the job may still
-        # exist in DB (the deleting transaction didn't commit yet) but it has
-        # already been processed and the task state hasn't changed.
-        sched = sched_base.get_system_scheduler()
-
-        jobs_exist = sched.has_scheduled_jobs(
-            key=_get_refresh_state_job_key(t_ex_id),
-            processing=False
-        )
-
-        if not jobs_exist:
-            _schedule_refresh_task_state(t_ex_id)
-
     for t_ex in affected_task_execs:
         post_tx_queue.register_operation(
-            _schedule_if_needed,
+            _schedule_refresh_task_state,
             args=[t_ex.id],
             in_tx=True
         )
@@ -329,7 +315,7 @@ def build_task_from_execution(wf_spec, task_ex):
         task_ex.workflow_execution,
         wf_spec,
         wf_spec.get_task(task_ex.name),
-        task_ex.in_context,
+        data_flow.evaluate_task_inbound_context(task_ex),
         task_ex
     )
 
@@ -455,7 +441,7 @@ def _refresh_task_state(task_ex_id):
                 )
 
 
-def _schedule_refresh_task_state(task_ex_id, delay=0):
+def _schedule_refresh_task_state(task_ex_id, delay=None):
     """Schedules task preconditions check.
 
     This method provides transactional decoupling of task preconditions
@@ -468,17 +454,30 @@ def _schedule_refresh_task_state(task_ex_id, delay=0):
     we'll have in this case (time between transactions) whereas scheduler
     is a special component that is designed to be resistant to failures.
 
+    The job is unique, i.e. it's not scheduled if there's already a job
+    refreshing the same task that hasn't started yet. It minimizes the
+    number of refreshes of "join" tasks whose inbound tasks complete at
+    nearly the same time. Note that jobs that are currently being processed
+    must be ignored because of a possible race with the transaction that
+    deletes scheduled jobs, i.e. the job may still exist in DB (the deleting
+    transaction didn't commit yet) but it has already been processed and
+    the task state hasn't changed.
+
     :param task_ex_id: Task execution ID.
-    :param delay: Delay.
+    :param delay: Delay. If None, the configured coalescing delay is used.
     """
 
+    if delay is None:
+        delay = CONF.engine.refresh_task_state_delay
+
     sched = sched_base.get_system_scheduler()
 
     job = sched_base.SchedulerJob(
         run_after=delay,
         func_name=_REFRESH_TASK_STATE_PATH,
         func_args={'task_ex_id': task_ex_id},
-        key=_get_refresh_state_job_key(task_ex_id)
+        key=_get_refresh_state_job_key(task_ex_id),
+        unique=True
     )
 
     sched.schedule(job)
@@ -150,9 +150,9 @@ class Task(object, metaclass=abc.ABCMeta):
             data_flow.get_current_task_dict(self.task_ex),
             data_flow.get_workflow_environment_dict(self.wf_ex),
             ctx or {},
-            self.task_ex.in_context,
+            data_flow.evaluate_task_inbound_context(self.task_ex),
             self.wf_ex.context,
-            self.wf_ex.input,
+            data_flow.get_workflow_input_dict(self.wf_ex),
         )
 
     def evaluate(self, data, ctx=None):
@@ -174,6 +174,23 @@ class Task(object, metaclass=abc.ABCMeta):
             self.get_expression_context(ctx)
         )
 
+    def evaluate_plan(self, plan, ctx=None):
+        """Evaluates a specification evaluation plan against the task context.
+
+        The plan is evaluated in the copy-on-write mode so the result shares
+        all static parts with the task specification and must not be
+        modified in place.
+
+        :param plan: Evaluation plan taken from the task specification.
+        :param ctx: Additional context.
+        :return: Evaluated data.
+        """
+
+        return plan.evaluate(
+            self.get_expression_context(ctx),
+            copy_on_write=True
+        )
+
     def set_runtime_context_value(self, key, value):
         assert self.task_ex
 
@@ -336,6 +353,8 @@ class Task(object, metaclass=abc.ABCMeta):
             if processed is not None:
                 self.task_ex.processed = processed
 
+            self._update_incomplete_tasks_count(cur_state, state)
+
             self._notify(cur_state, state)
 
             wf_trace.info(
@@ -495,20 +514,37 @@ class Task(object, metaclass=abc.ABCMeta):
             'state_info': state_info,
             'spec': self.task_spec.to_dict(),
             'unique_key': self.unique_key,
-            'in_context': self.ctx,
             'published': {},
             'runtime_context': {},
             'project_id': self.wf_ex.project_id,
             'type': self.task_spec.get_type(),
         }
 
+        values.update(data_flow.get_inbound_context_values(self.ctx))
+
         if self.triggered_by:
             values['runtime_context']['triggered_by'] = self.triggered_by
 
         self.task_ex = db_api.create_task_execution(values)
 
+        self._update_incomplete_tasks_count(None, state)
+
         self.created = True
 
+    def _update_incomplete_tasks_count(self, from_state, to_state):
+        # The counter is only maintained for workflow executions that
+        # were created with it.
+        if self.wf_ex.incomplete_tasks_count is None:
+            return
+
+        delta = (
+            int(states.is_incomplete(to_state)) -
+            int(states.is_incomplete(from_state))
+        )
+
+        if delta:
+            db_api.change_incomplete_tasks_count(self.wf_ex.id, delta)
+
     def _get_safe_rerun(self):
         safe_rerun = self.task_spec.get_safe_rerun()
 
@@ -614,6 +650,10 @@ class RegularTask(Task):
         self.set_state(states.RUNNING, None, processed=False)
 
         if self.rerun:
+            # Contexts of the tasks that have already run after this one
+            # must not change once it publishes new values.
+            data_flow.materialize_downstream_contexts(self.task_ex)
+
             self._before_task_start()
 
             # Policies could possibly change task state.
@@ -632,7 +672,7 @@ class RegularTask(Task):
 
         self.ctx = wf_ctrl.get_task_inbound_context(self.task_spec)
 
-        utils.update_dict(self.task_ex.in_context, self.ctx)
+        data_flow.update_task_inbound_context(self.task_ex, self.ctx)
 
     def _update_triggered_by(self):
         assert self.task_ex
@@ -684,20 +724,21 @@ class RegularTask(Task):
             self.ctx,
             data_flow.get_workflow_environment_dict(self.wf_ex),
             self.wf_ex.context,
-            self.wf_ex.input
+            data_flow.get_workflow_input_dict(self.wf_ex)
         )
 
-        return expr.evaluate_recursively(
-            self.task_spec.get_target(),
-            ctx_view
+        return self.task_spec.get_target_plan().evaluate(
+            ctx_view,
+            copy_on_write=True
         )
 
     @profiler.trace('regular-task-get-action-input', hide_args=True)
     def _get_action_input(self, ctx=None):
-        input_spec = self.task_spec.get_input()
+        input_plan = self.task_spec.get_input_plan()
 
         input_dict = (
-            self.evaluate(input_spec, ctx) if input_spec else {}
+            self.evaluate_plan(input_plan, ctx)
+            if input_plan.get_data() else {}
         )
 
         if not isinstance(input_dict, dict):
@@ -707,9 +748,16 @@ class RegularTask(Task):
                 (self.task_spec.get_name(), type(input_dict), str(input_dict))
             )
 
+        action_defaults = self._get_action_defaults()
+
+        if not action_defaults:
+            return input_dict
+
+        # NOTE: merge_dicts() modifies its first argument whereas the
+        # evaluated input shares all static values with the task spec.
         return utils.merge_dicts(
-            input_dict,
-            self._get_action_defaults(),
+            copy.deepcopy(input_dict),
+            action_defaults,
             overwrite=False
         )
 
@@ -775,18 +823,20 @@ class RegularTask(Task):
         return res
 
     def _get_timeout(self):
-        timeout = self.task_spec.get_policies().get_timeout()
+        timeout_plan = self.task_spec.get_policies().get_timeout_plan()
+
+        timeout = timeout_plan.get_data()
 
         if not isinstance(timeout, (int, float)):
             wf_ex = self.task_ex.workflow_execution
 
             ctx_view = data_flow.ContextView(
-                self.task_ex.in_context,
+                data_flow.evaluate_task_inbound_context(self.task_ex),
                 wf_ex.context,
-                wf_ex.input
+                data_flow.get_workflow_input_dict(wf_ex)
             )
 
-            timeout = expr.evaluate_recursively(data=timeout, context=ctx_view)
+            timeout = timeout_plan.evaluate(ctx_view, copy_on_write=True)
 
         return timeout if timeout > 0 else None
 
@@ -802,6 +852,20 @@ class WithItemsTask(RegularTask):
     _COUNT = 'count'
     _WITH_ITEMS = 'with_items'
 
+    # Keys of the compact iteration state. They are only present in
+    # the with-items runtime context if the task was started with
+    # the compact state enabled, see "with_items_compact_state" option.
+    _MAX_CAPACITY = 'max_capacity'
+    _NEXT_INDEX = 'next_index'
+    _RETRY_INDEXES = 'retry_indexes'
+    _COMPLETED = 'completed'
+    _ERRORS = 'errors'
+    _CANCELLED = 'cancelled'
+
+    # Key of the action execution runtime context marking an iteration
+    # already taken into account by the compact iteration state.
+    _ITERATION_COMPLETED = 'with_items_iteration_completed'
+
     _DEFAULT_WITH_ITEMS = {
         _COUNT: 0,
         _CONCURRENCY: 0,
@@ -824,7 +888,10 @@ class WithItemsTask(RegularTask):
             if self.is_completed():
                 return
 
-            self._increase_capacity()
+            if self._is_compact():
+                self._on_iteration_complete(action_ex)
+            else:
+                self._increase_capacity()
 
             if self.is_with_items_completed():
                 state = self._get_final_state()
@@ -845,7 +912,7 @@ class WithItemsTask(RegularTask):
 
                 return
 
-            if self._has_more_iterations() and self._get_concurrency():
+            if self._has_more_iterations() and self._is_dispatch_needed():
                 self._schedule_actions()
 
     def _schedule_actions(self):
@@ -878,6 +945,24 @@ class WithItemsTask(RegularTask):
 
             self._decrease_capacity(1)
 
+        if self._is_compact():
+            self._on_iterations_dispatched([i for i, _ in input_dicts])
+
+    def _is_dispatch_needed(self):
+        if self._get_concurrency():
+            return True
+
+        if not self._is_compact():
+            return False
+
+        # Without concurrency the compact mode dispatches iterations in
+        # batches. A new batch is dispatched only when at least a half of
+        # the previous one has completed so that with-items values are not
+        # evaluated again on every completion.
+        ctx = self._get_with_items_context()
+
+        return ctx[self._CAPACITY] * 2 >= ctx[self._MAX_CAPACITY]
+
     def _get_with_items_values(self):
         """Returns all values evaluated from 'with-items' expression.
 
@@ -898,7 +983,7 @@ class WithItemsTask(RegularTask):
         :return: Evaluated 'with-items' expression values.
         """
 
-        exp_res = self.evaluate(self.task_spec.get_with_items())
+        exp_res = self.evaluate_plan(self.task_spec.get_with_items_plan())
 
         # Expression result may contain iterables instead of lists in the
         # dictionary values. So we need to convert them into lists and
@@ -964,7 +1049,21 @@ class WithItemsTask(RegularTask):
     def _get_concurrency(self):
         return self.task_ex.runtime_context.get(self._CONCURRENCY)
 
+    def _is_compact(self):
+        return self._NEXT_INDEX in self._get_with_items_context()
+
     def is_with_items_completed(self):
+        if self._is_compact():
+            ctx = self._get_with_items_context()
+
+            if ctx[self._CANCELLED]:
+                return True
+
+            return (
+                ctx[self._COMPLETED] >= ctx[self._COUNT] and
+                ctx[self._CAPACITY] == ctx[self._MAX_CAPACITY]
+            )
+
         find_cancelled = lambda x: x.accepted and x.state == states.CANCELLED
 
         if list(filter(find_cancelled, self.task_ex.executions)):
@@ -988,6 +1087,16 @@ class WithItemsTask(RegularTask):
         return count == len(execs) and full_capacity
 
     def _get_final_state(self):
+        if self._is_compact():
+            ctx = self._get_with_items_context()
+
+            if ctx[self._CANCELLED]:
+                return states.CANCELLED
+            elif ctx[self._ERRORS]:
+                return states.ERROR
+            else:
+                return states.SUCCESS
+
         find_cancelled = lambda x: x.accepted and x.state == states.CANCELLED
         find_error = lambda x: x.accepted and x.state == states.ERROR
 
@@ -1027,6 +1136,22 @@ class WithItemsTask(RegularTask):
         capacity = self._get_with_items_capacity()
         count = self._get_with_items_count()
 
+        if self._is_compact():
+            ctx = self._get_with_items_context()
+
+            indices = ctx[self._RETRY_INDEXES][:capacity]
+
+            next_index = ctx[self._NEXT_INDEX]
+
+            indices += list(
+                range(
+                    next_index,
+                    min(count, next_index + capacity - len(indices))
+                )
+            )
+
+            return indices
+
         def _get_indexes(exs):
             return sorted(set([ex.runtime_context['index'] for ex in exs]))
 
@@ -1072,6 +1197,97 @@ class WithItemsTask(RegularTask):
 
         self.task_ex.runtime_context.update({self._WITH_ITEMS: ctx})
 
+    def _get_max_capacity(self):
+        return (
+            self._get_concurrency() or
+            cfg.CONF.engine.with_items_dispatch_batch_size
+        )
+
+    def _on_iteration_complete(self, action_ex):
+        # The completion of the same action execution may be processed
+        # more than once, e.g. if the scheduled job processing it runs
+        # again after a failure. The counters must not change then.
+        if action_ex.runtime_context.get(self._ITERATION_COMPLETED):
+            return
+
+        action_ex.runtime_context[self._ITERATION_COMPLETED] = True
+
+        ctx = self._get_with_items_context()
+
+        if action_ex.accepted:
+            ctx[self._COMPLETED] += 1
+
+            if action_ex.state == states.ERROR:
+                ctx[self._ERRORS] += 1
+            elif action_ex.state == states.CANCELLED:
+                ctx[self._CANCELLED] += 1
+
+        if ctx[self._CAPACITY] < ctx[self._MAX_CAPACITY]:
+            ctx[self._CAPACITY] += 1
+
+        self.task_ex.runtime_context.update({self._WITH_ITEMS: ctx})
+
+    def _on_iterations_dispatched(self, indexes):
+        if not indexes:
+            return
+
+        ctx = self._get_with_items_context()
+
+        dispatched = set(indexes)
+
+        ctx[self._RETRY_INDEXES] = [
+            i for i in ctx[self._RETRY_INDEXES] if i not in dispatched
+        ]
+        ctx[self._NEXT_INDEX] = max(ctx[self._NEXT_INDEX], max(indexes) + 1)
+
+        self.task_ex.runtime_context.update({self._WITH_ITEMS: ctx})
+
+    def _reset_actions(self):
+        super(WithItemsTask, self)._reset_actions()
+
+        if self._is_compact():
+            self._rebuild_compact_state()
+
+    def _rebuild_compact_state(self):
+        """Rebuilds the compact iteration state from action executions.
+
+        It's only needed when the task is rerun or retried because some
+        of the iterations are not accepted anymore and need to run again.
+        """
+        ctx = self._get_with_items_context()
+
+        accepted = set()
+        running = set()
+
+        errors = 0
+        cancelled = 0
+
+        for ex in self.task_ex.executions:
+            idx = ex.runtime_context['index']
+
+            if not states.is_completed(ex.state):
+                running.add(idx)
+            elif ex.accepted:
+                accepted.add(idx)
+
+                if ex.state == states.ERROR:
+                    errors += 1
+                elif ex.state == states.CANCELLED:
+                    cancelled += 1
+
+        max_capacity = self._get_max_capacity()
+
+        ctx[self._MAX_CAPACITY] = max_capacity
+        ctx[self._CAPACITY] = max(max_capacity - len(running), 0)
+        ctx[self._RETRY_INDEXES] = sorted(
+            set(range(ctx[self._NEXT_INDEX])) - accepted - running
+        )
+        ctx[self._COMPLETED] = len(accepted)
+        ctx[self._ERRORS] = errors
+        ctx[self._CANCELLED] = cancelled
+
+        self.task_ex.runtime_context.update({self._WITH_ITEMS: ctx})
+
     def _is_new(self):
         return not self.task_ex.runtime_context.get(self._WITH_ITEMS)
 
@@ -1080,12 +1296,39 @@ class WithItemsTask(RegularTask):
 
         if not runtime_ctx.get(self._WITH_ITEMS):
             # Prepare current indexes and parallel limitation.
-            runtime_ctx[self._WITH_ITEMS] = {
+            with_items_ctx = {
                 self._CAPACITY: self._get_concurrency(),
                 self._COUNT: action_count
             }
 
+            if cfg.CONF.engine.with_items_compact_state:
+                # Instead of scanning all action executions of the task
+                # every time an iteration completes we keep the indexes
+                # of the iterations to run and the numbers of completed
+                # iterations in the runtime context.
+                max_capacity = self._get_max_capacity()
+
+                with_items_ctx.update({
+                    self._CAPACITY: max_capacity,
+                    self._MAX_CAPACITY: max_capacity,
+                    self._NEXT_INDEX: 0,
+                    self._RETRY_INDEXES: [],
+                    self._COMPLETED: 0,
+                    self._ERRORS: 0,
+                    self._CANCELLED: 0
+                })
+
+            runtime_ctx[self._WITH_ITEMS] = with_items_ctx
+
     def _has_more_iterations(self):
+        if self._is_compact():
+            ctx = self._get_with_items_context()
+
+            return bool(
+                ctx[self._RETRY_INDEXES] or
+                ctx[self._NEXT_INDEX] < ctx[self._COUNT]
+            )
+
         # See action executions which have been already
         # accepted or are still running.
         action_exs = list(filter(
@@ -118,8 +118,10 @@ def _check_and_fix_integrity(wf_ex_id):
         # Never check integrity if it's a negative value.
         return
 
-    # To break cyclic dependency.
-    from mistral.engine import task_handler
+    if CONF.engine.execution_integrity_sweep_interval:
+        # The integrity sweeper checks all executions, there's
+        # no need to check them one by one.
+        return
 
     with db_api.transaction():
         wf_ex = db_api.load_workflow_execution(wf_ex_id)
@@ -139,52 +141,87 @@ def _check_and_fix_integrity(wf_ex_id):
         )
 
         for t_ex in running_task_execs:
-            # The idea is that we take the latest known timestamp of the task
-            # execution and consider it eligible for checking and fixing only
-            # if some minimum period of time elapsed since the last update.
-            timestamp = t_ex.updated_at or t_ex.created_at
+            _check_and_fix_task_integrity(t_ex, check_after_seconds)
 
-            delta = timeutils.delta_seconds(timestamp, timeutils.utcnow())
 
-            if delta < check_after_seconds:
-                continue
+@post_tx_queue.run
+@profiler.trace('workflow-handler-check-and-fix-tasks-integrity')
+def check_and_fix_tasks_integrity(task_ex_ids):
+    """Checks and fixes integrity of the given task executions.
 
-            child_executions = t_ex.executions
+    Unlike the per-execution integrity check, it's used by the integrity
+    sweeper for task executions of any workflow executions.
 
-            if not child_executions:
-                continue
+    :param task_ex_ids: IDs of task executions in RUNNING state.
+    """
+    check_after_seconds = CONF.engine.execution_integrity_check_delay
 
-            all_finished = all(
-                [states.is_completed(c_ex.state) for c_ex in child_executions]
+    if check_after_seconds < 0:
+        # Never check integrity if it's a negative value.
+        return
+
+    with db_api.transaction():
+        task_execs = db_api.get_task_executions(
+            id={'in': task_ex_ids},
+            insecure=True
+        )
+
+        for t_ex in task_execs:
+            # The task may have changed its state after its ID was selected.
+            if t_ex.state == states.RUNNING:
+                _check_and_fix_task_integrity(t_ex, check_after_seconds)
+
+
+def _check_and_fix_task_integrity(t_ex, check_after_seconds):
+    # To break cyclic dependency.
+    from mistral.engine import task_handler
+
+    # The idea is that we take the latest known timestamp of the task
+    # execution and consider it eligible for checking and fixing only
+    # if some minimum period of time elapsed since the last update.
+    timestamp = t_ex.updated_at or t_ex.created_at
+
+    delta = timeutils.delta_seconds(timestamp, timeutils.utcnow())
+
+    if delta < check_after_seconds:
+        return
+
+    child_executions = t_ex.executions
+
+    if not child_executions:
+        return
+
+    all_finished = all(
+        [states.is_completed(c_ex.state) for c_ex in child_executions]
+    )
+
+    if all_finished:
+        # Find the timestamp of the most recently finished child.
+        most_recent_child_timestamp = max(
+            [c_ex.updated_at or c_ex.created_at for c_ex in
+             child_executions]
+        )
+        interval = timeutils.delta_seconds(
+            most_recent_child_timestamp,
+            timeutils.utcnow()
+        )
+
+        if interval > check_after_seconds:
+            # We found a task execution in RUNNING state for which all
+            # child executions are finished. We need to call
+            # "schedule_on_action_complete" on the task handler for
+            # any of the child executions so that the task state is
+            # calculated and updated properly.
+            LOG.warning(
+                "Found a task execution that is likely stuck in"
+                " RUNNING state because all child executions are"
+                " finished, will try to recover [task_execution=%s]",
+                t_ex.id
             )
 
-            if all_finished:
-                # Find the timestamp of the most recently finished child.
-                most_recent_child_timestamp = max(
-                    [c_ex.updated_at or c_ex.created_at for c_ex in
-                     child_executions]
-                )
-                interval = timeutils.delta_seconds(
-                    most_recent_child_timestamp,
-                    timeutils.utcnow()
-                )
-
-                if interval > check_after_seconds:
-                    # We found a task execution in RUNNING state for which all
-                    # child executions are finished. We need to call
-                    # "schedule_on_action_complete" on the task handler for
-                    # any of the child executions so that the task state is
-                    # calculated and updated properly.
-                    LOG.warning(
-                        "Found a task execution that is likely stuck in"
-                        " RUNNING state because all child executions are"
-                        " finished, will try to recover [task_execution=%s]",
-                        t_ex.id
-                    )
-
-                    task_handler.schedule_on_action_complete(
-                        child_executions[-1]
-                    )
+            task_handler.schedule_on_action_complete(
+                child_executions[-1]
+            )
 
 
 def pause_workflow(wf_ex, msg=None):
@@ -284,6 +321,10 @@ def _schedule_check_and_fix_integrity(wf_ex, delay=0):
         # Never check integrity if it's a negative value.
         return
 
+    if CONF.engine.execution_integrity_sweep_interval:
+        # The integrity sweeper takes care of all executions.
+        return
+
     sched = sched_base.get_system_scheduler()
 
     job = sched_base.SchedulerJob(
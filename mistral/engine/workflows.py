@@ -362,6 +362,9 @@ class Workflow(object, metaclass=abc.ABCMeta):
             'runtime_context': {'index': params.get('index', 0)}
         }
 
+        if cfg.CONF.engine.track_incomplete_tasks:
+            values['incomplete_tasks_count'] = 0
+
         if wf_def.workbook_name:
             values['runtime_context']['wb_name'] = wf_def.workbook_name
 
@@ -444,9 +447,7 @@ class Workflow(object, metaclass=abc.ABCMeta):
 
         # Workflow is not completed if there are any incomplete task
         # executions.
-        incomplete_tasks_count = db_api.get_incomplete_task_executions_count(
-            workflow_execution_id=self.wf_ex.id,
-        )
+        incomplete_tasks_count = self._get_incomplete_tasks_count()
 
         if incomplete_tasks_count > 0:
             return incomplete_tasks_count
@@ -479,10 +480,40 @@ class Workflow(object, metaclass=abc.ABCMeta):
 
         return 0
 
+    def _get_incomplete_tasks_count(self):
+        if self.wf_ex.incomplete_tasks_count is None:
+            return db_api.get_incomplete_task_executions_count(
+                workflow_execution_id=self.wf_ex.id
+            )
+
+        cnt = db_api.get_incomplete_tasks_count(self.wf_ex.id)
+
+        if cnt > 0:
+            return cnt
+
+        # Make sure the counter is consistent before making a decision
+        # that the workflow has completed.
+        actual_cnt = db_api.get_incomplete_task_executions_count(
+            workflow_execution_id=self.wf_ex.id
+        )
+
+        if actual_cnt != cnt:
+            LOG.warning(
+                "The counter of incomplete tasks is inconsistent, fixing it "
+                "[wf_ex_id=%s, counter=%s, actual=%s]",
+                self.wf_ex.id,
+                cnt,
+                actual_cnt
+            )
+
+            db_api.set_incomplete_tasks_count(self.wf_ex.id, actual_cnt)
+
+        return actual_cnt
+
     def _succeed_workflow(self, final_context, msg=None):
         output = data_flow.evaluate_workflow_output(
             self.wf_ex,
-            self.wf_spec.get_output(),
+            self.wf_spec.get_output_plan(),
             final_context
         )
 
@@ -504,7 +535,7 @@ class Workflow(object, metaclass=abc.ABCMeta):
         try:
             output_on_error = data_flow.evaluate_workflow_output(
                 self.wf_ex,
-                self.wf_spec.get_output_on_error(),
+                self.wf_spec.get_output_on_error_plan(),
                 final_context
             )
         except exc.MistralException as e:
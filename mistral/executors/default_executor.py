@@ -23,6 +23,7 @@ from mistral import exceptions as exc
 from mistral.executors import base
 from mistral.rpc import clients as rpc
 from mistral.services import action_heartbeat_sender
+from mistral.services import action_result_batcher
 
 LOG = logging.getLogger(__name__)
 
@@ -121,11 +122,12 @@ class DefaultExecutor(base.Executor):
         # Send action result.
         try:
             if action_ex_id and (action.is_sync() or result.is_error()):
-                self._engine_client.on_action_complete(
-                    action_ex_id,
-                    result,
-                    async_=True
-                )
+                if not action_result_batcher.add_result(action_ex_id, result):
+                    self._engine_client.on_action_complete(
+                        action_ex_id,
+                        result,
+                        async_=True
+                    )
 
         except exc.MistralException as e:
             # In case of a Mistral exception we can try to send error info to
@@ -19,6 +19,7 @@ from mistral.executors import default_executor as exe
 from mistral.rpc import base as rpc
 from mistral.service import base as service_base
 from mistral.services import action_heartbeat_sender
+from mistral.services import action_result_batcher
 from mistral.services import actions as action_service
 from mistral.utils import profiler as profiler_utils
 
@@ -45,6 +46,7 @@ class ExecutorServer(service_base.MistralService):
         super(ExecutorServer, self).start()
 
         action_heartbeat_sender.start()
+        action_result_batcher.start()
 
         if self._setup_profiler:
             profiler_utils.setup('mistral-executor', cfg.CONF.executor.host)
@@ -70,6 +72,10 @@ class ExecutorServer(service_base.MistralService):
         if self._rpc_server:
             self._rpc_server.stop(graceful)
 
+        # Results accumulated by the moment when the RPC server is stopped
+        # still need to be sent.
+        action_result_batcher.stop(graceful)
+
     def run_action(self, rpc_ctx, action, action_ex_id, safe_rerun, exec_ctx,
                    timeout):
 
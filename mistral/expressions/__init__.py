@@ -72,6 +72,51 @@ def evaluate(expression, context):
     return expression
 
 
+def _find_evaluator(s):
+    for _, evaluator in _evaluators:
+        if evaluator.is_expression(s):
+            return evaluator
+
+    return None
+
+
+def find_expressions(data):
+    """Finds the parts of the given data structure that contain expressions.
+
+    The result can be computed once for static data (e.g. a part of a
+    specification) and then passed to evaluate_recursively() to avoid
+    scanning the same data again on every evaluation.
+
+    :param data: Data (a string, dict or a list) that possibly contains
+        YAQL/Jinja expressions.
+    :return: An evaluator class if the data is a string containing an
+        expression of the corresponding type. Otherwise, a dictionary that
+        maps keys (for dictionaries) or indexes (for lists) to the same
+        kind of result calculated for the corresponding nested values.
+        Only values containing expressions are included so the dictionary
+        is empty if the data doesn't contain any expressions.
+    """
+    if isinstance(data, str):
+        return _find_evaluator(data) or {}
+
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        items = enumerate(data)
+    else:
+        return {}
+
+    expr_map = {}
+
+    for key, val in items:
+        val_map = find_expressions(val)
+
+        if val_map:
+            expr_map[key] = val_map
+
+    return expr_map
+
+
 def _evaluate_item(item, context):
     if isinstance(item, str):
         try:
@@ -88,7 +133,70 @@ def _evaluate_item(item, context):
         return evaluate_recursively(item, context)
 
 
-def evaluate_recursively(data, context):
+def _evaluate_expression_map_in_place(data, expr_map, context):
+    if not isinstance(expr_map, dict):
+        return _evaluate_expression_map(data, expr_map, context)
+
+    for key, val_map in expr_map.items():
+        data[key] = _evaluate_expression_map_in_place(
+            data[key],
+            val_map,
+            context
+        )
+
+    return data
+
+
+def _evaluate_expression_map(data, expr_map, context):
+    if not isinstance(expr_map, dict):
+        # It's a leaf so the evaluator is already known.
+        try:
+            return expr_map.evaluate(data, context)
+        except AttributeError as e:
+            LOG.debug(
+                "Expression %s is not evaluated, [context=%s]: %s",
+                data,
+                context,
+                e
+            )
+            return data
+
+    # Only containers on the path to the expressions get copied,
+    # everything else is shared with the original data.
+    result = dict(data) if isinstance(data, dict) else list(data)
+
+    for key, val_map in expr_map.items():
+        result[key] = _evaluate_expression_map(data[key], val_map, context)
+
+    return result
+
+
+def evaluate_recursively(data, context, copy_on_write=False, expr_map=None):
+    """Evaluates all expressions found in the given data.
+
+    :param data: Data (a string, dict or a list) that possibly contains
+        YAQL/Jinja expressions.
+    :param context: Data context.
+    :param copy_on_write: If False, the data is deep copied before the
+        evaluation. If True, only containers holding expressions (directly
+        or in nested containers) are copied and the rest is shared with
+        the original data. In this case the caller must not modify the
+        result in place. If the data doesn't contain any expressions
+        then the data itself is returned.
+    :param expr_map: The result of find_expressions() for the given data.
+        It makes sense only in the copy-on-write mode. If not provided,
+        it's calculated on the fly.
+    :return: Evaluated data.
+    """
+    if copy_on_write:
+        if expr_map is None:
+            expr_map = find_expressions(data)
+
+        if not context or not expr_map:
+            return data
+
+        return _evaluate_expression_map(data, expr_map, context)
+
     data = copy.deepcopy(data)
 
     if not context:
@@ -104,3 +212,54 @@ def evaluate_recursively(data, context):
         return _evaluate_item(data, context)
 
     return data
+
+
+class EvaluationPlan(object):
+    """Precompiled plan of evaluating expressions in static data.
+
+    The plan keeps the data (usually a part of a specification) along with
+    the map of expressions found in it so that the data can be evaluated
+    many times without scanning it for expressions again. Parsing of the
+    expressions themselves is cached by the evaluators.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._expr_map = find_expressions(data)
+
+    def get_data(self):
+        return self._data
+
+    def has_expressions(self):
+        return bool(self._expr_map)
+
+    def evaluate(self, context, copy_on_write=False):
+        """Evaluates the data of the plan against the given context.
+
+        :param context: Data context.
+        :param copy_on_write: If False, the result is a deep copy of
+            the data where all expressions are replaced with their values.
+            If True, the result shares all parts that don't contain
+            expressions with the original data and hence the caller must
+            not modify it in place.
+        :return: Evaluated data.
+        """
+        if copy_on_write:
+            if not self._expr_map:
+                return self._data
+
+            return _evaluate_expression_map(
+                self._data,
+                self._expr_map,
+                context
+            )
+
+        data = copy.deepcopy(self._data)
+
+        if not self._expr_map:
+            return data
+
+        return _evaluate_expression_map_in_place(data, self._expr_map, context)
+
+    def __repr__(self):
+        return "EvaluationPlan %s" % self._data
@@ -14,9 +14,13 @@
 #    limitations under the License.
 
 import abc
+import threading
 
+import cachetools
 from stevedore import extension
 
+from mistral.config import cfg
+
 
 class Evaluator(object):
     """Expression evaluator interface.
@@ -74,3 +78,136 @@ def get_custom_functions():
         result[name] = mgr[name].plugin
 
     return result
+
+
+class _LRUCache(cachetools.LRUCache):
+    """LRU cache that notifies about items evicted due to the size limit."""
+
+    def __init__(self, maxsize, on_evict):
+        super(_LRUCache, self).__init__(maxsize=maxsize)
+
+        self._on_evict = on_evict
+
+    def popitem(self):
+        item = super(_LRUCache, self).popitem()
+
+        self._on_evict()
+
+        return item
+
+
+class ExpressionCache(object):
+    """Thread-safe LRU cache of parsed expressions.
+
+    Parsing an expression (building a YAQL expression tree or compiling
+    a Jinja template) is much more expensive than evaluating it whereas
+    the number of distinct expressions in the system is relatively small
+    and bounded by workflow definitions. So the cache keeps the results
+    of parsing keyed by the expression text and the evaluator options
+    that affect parsing.
+    """
+
+    def __init__(self, maxsize):
+        self._maxsize = maxsize
+        self._cache = (
+            _LRUCache(maxsize, self._on_evict) if maxsize > 0 else None
+        )
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _on_evict(self):
+        self.evictions += 1
+
+    def get(self, key, parse_func):
+        """Returns a cached parsed expression or parses and caches it.
+
+        :param key: Hashable cache key. It must contain the expression
+            text and everything else that affects the result of parsing.
+        :param parse_func: Function without arguments that parses the
+            expression if it's not found in the cache.
+        :return: Parsed expression.
+        """
+        if self._cache is None:
+            with self._lock:
+                self.misses += 1
+
+            return parse_func()
+
+        with self._lock:
+            try:
+                res = self._cache[key]
+
+                self.hits += 1
+
+                return res
+            except KeyError:
+                self.misses += 1
+
+        # NOTE: Parsing is done outside of the lock so that concurrent
+        # threads don't wait for each other. In the worst case the same
+        # expression will be parsed more than once which is harmless.
+        res = parse_func()
+
+        with self._lock:
+            self._cache[key] = res
+
+        return res
+
+    def clear(self):
+        with self._lock:
+            if self._cache is not None:
+                self._cache.clear()
+
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'size': len(self._cache) if self._cache is not None else 0,
+                'maxsize': self._maxsize,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
+
+
+_EXPRESSION_CACHE = None
+_EXPRESSION_CACHE_LOCK = threading.Lock()
+
+
+def get_expression_cache():
+    """Returns the process wide cache of parsed expressions.
+
+    The cache is created lazily because its size is taken from the
+    configuration that is not yet loaded when the module gets imported.
+    """
+    global _EXPRESSION_CACHE
+
+    if _EXPRESSION_CACHE is not None:
+        return _EXPRESSION_CACHE
+
+    with _EXPRESSION_CACHE_LOCK:
+        if _EXPRESSION_CACHE is None:
+            _EXPRESSION_CACHE = ExpressionCache(
+                cfg.CONF.engine.expression_cache_size
+            )
+
+    return _EXPRESSION_CACHE
+
+
+def get_expression_cache_stats():
+    """Returns hit, miss and eviction counters of the expression cache."""
+    return get_expression_cache().get_stats()
+
+
+def clear_expression_cache():
+    """Clears the cache of parsed expressions and resets its counters."""
+    global _EXPRESSION_CACHE
+
+    with _EXPRESSION_CACHE_LOCK:
+        _EXPRESSION_CACHE = None
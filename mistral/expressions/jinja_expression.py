@@ -59,6 +59,24 @@ def get_jinja_context(data_context):
     return new_ctx
 
 
+def _compile_expression(env, expression):
+    key = ('jinja', expression, tuple(sorted(JINJA_OPTS.items())))
+
+    return base.get_expression_cache().get(
+        key,
+        lambda: env.compile_expression(expression, **JINJA_OPTS)
+    )
+
+
+def _compile_template(env, expression):
+    key = ('jinja_template', expression)
+
+    return base.get_expression_cache().get(
+        key,
+        lambda: env.from_string(expression)
+    )
+
+
 def _register_jinja_functions(jinja_ctx):
     functions = base.get_custom_functions()
 
@@ -87,7 +105,7 @@ class JinjaEvaluator(base.Evaluator):
     def evaluate(cls, expression, data_context):
         ctx = get_jinja_context(data_context)
 
-        result = cls._env.compile_expression(expression, **JINJA_OPTS)(**ctx)
+        result = _compile_expression(cls._env, expression)(**ctx)
 
         # For StrictUndefined values, UndefinedError only gets raised when
         # the value is accessed, not when it gets created. The simplest way
@@ -142,7 +160,7 @@ class InlineJinjaEvaluator(base.Evaluator):
             else:
                 ctx = get_jinja_context(data_context)
 
-                result = cls._env.from_string(expression).render(**ctx)
+                result = _compile_template(cls._env, expression).render(**ctx)
         except Exception as e:
             # NOTE(rakhmerov): if we hit a database error then we need to
             # re-raise the initial exception so that upper layers had a
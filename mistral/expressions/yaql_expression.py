@@ -14,7 +14,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-import collections
+import collections.abc
 import inspect
 import re
 
@@ -50,6 +50,112 @@ representer.SafeRepresenter.add_representer(
 )
 
 
+class ImmutableData(collections.abc.Mapping):
+    """Read-only view of data that never changes during its lifetime.
+
+    It's intended for parts of a data context like workflow input or
+    environment. Since the data can't change, values converted into
+    YAQL internal types are memoized and reused by all evaluations
+    made against the same view.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._converted = {}
+
+    def get_data(self):
+        return self._data
+
+    def get_converted(self, key):
+        try:
+            return self._converted[key]
+        except KeyError:
+            pass
+
+        val = yaql_utils.convert_input_data(self._data[key])
+
+        self._converted[key] = val
+
+        return val
+
+    def __getitem__(self, key):
+        return self._data[key]
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return repr(self._data)
+
+
+class LazyConvertedData(collections.abc.Mapping):
+    """Data context converting its values into YAQL types on demand.
+
+    Converting the whole data context before every evaluation is
+    expensive if the context is big, so only values that an expression
+    actually reads get converted. If the data context is a composite
+    context view then the values taken from its immutable parts are
+    converted at most once per part.
+    """
+
+    def __init__(self, data):
+        self._data = data
+        self._parts = getattr(data, 'dicts', None)
+        self._converted = {}
+
+    def __getitem__(self, key):
+        try:
+            return self._converted[key]
+        except KeyError:
+            pass
+
+        val = self._convert(key)
+
+        self._converted[key] = val
+
+        return val
+
+    def _convert(self, key):
+        parts = self._parts if self._parts is not None else [self._data]
+
+        for d in parts:
+            if key in d:
+                if isinstance(d, ImmutableData):
+                    return d.get_converted(key)
+
+                return yaql_utils.convert_input_data(d[key])
+
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._data
+
+    def __iter__(self):
+        return iter(self._data.keys())
+
+    def __len__(self):
+        return len(self._data)
+
+    def __hash__(self):
+        return hash(yaql_utils.FrozenDict(self.items()))
+
+    def __repr__(self):
+        return repr(dict(self.items()))
+
+
+def _convert_input_data(data_context):
+    if isinstance(data_context, collections.abc.Mapping):
+        return LazyConvertedData(data_context)
+
+    return yaql_utils.convert_input_data(data_context)
+
+
 def get_yaql_context(data_context):
     global ROOT_YAQL_CONTEXT
 
@@ -62,7 +168,7 @@ def get_yaql_context(data_context):
 
     new_ctx['$'] = (
         data_context if not cfg.CONF.yaql.convert_input_data
-        else yaql_utils.convert_input_data(data_context)
+        else _convert_input_data(data_context)
     )
 
     if isinstance(data_context, dict):
@@ -125,6 +231,22 @@ def get_yaql_engine_class():
     return YAQL_ENGINE
 
 
+def _parse_yaql_expression(expression):
+    engine = get_yaql_engine_class()
+
+    # The engine options are a part of the key because a parsed
+    # expression keeps a reference to the engine that created it.
+    key = (
+        'yaql',
+        expression,
+        engine.options,
+        _YAQL_CONF.keyword_operator,
+        _YAQL_CONF.allow_delegates
+    )
+
+    return base.get_expression_cache().get(key, lambda: engine(expression))
+
+
 def _sanitize_yaql_result(result):
     # Expression output conversion can be disabled but we can still
     # do some basic unboxing if we got an internal YAQL type.
@@ -135,7 +257,11 @@ def _sanitize_yaql_result(result):
     if isinstance(result, yaql_utils.FrozenDict):
         return result._d
 
-    if inspect.isgenerator(result) or isinstance(result, collections.Iterator):
+    if isinstance(result, LazyConvertedData):
+        return dict(result.items())
+
+    if (inspect.isgenerator(result) or
+            isinstance(result, collections.abc.Iterator)):
         return list(result)
 
     return result
@@ -154,7 +280,7 @@ class YAQLEvaluator(base.Evaluator):
         expression = expression.strip() if expression else expression
 
         try:
-            result = get_yaql_engine_class()(expression).evaluate(
+            result = _parse_yaql_expression(expression).evaluate(
                 context=get_yaql_context(data_context)
             )
         except Exception as e:
@@ -208,6 +208,9 @@ class BaseSpec(object):
         self._data = data
         self._validate = validate
 
+        # {property name => expressions.EvaluationPlan}.
+        self._eval_plans = {}
+
         if validate:
             self.validate_schema()
 
@@ -255,6 +258,27 @@ class BaseSpec(object):
                 if isinstance(expression, str):
                     expr.validate(expression)
 
+    def _get_evaluation_plan(self, prop_name, prop_val):
+        """Returns an evaluation plan of the specification property.
+
+        Specifications are immutable once built so the plan is built only
+        once per specification object and then it's reused so that the
+        engine doesn't need to scan the property value for expressions
+        every time it needs to evaluate it.
+
+        :param prop_name: Property name used as a cache key.
+        :param prop_val: Property value.
+        :return: Evaluation plan (expressions.EvaluationPlan).
+        """
+        plan = self._eval_plans.get(prop_name)
+
+        if plan is None:
+            plan = expr.EvaluationPlan(prop_val)
+
+            self._eval_plans[prop_name] = plan
+
+        return plan
+
     def _spec_property(self, prop_name, spec_cls):
         prop_val = self._data.get(prop_name)
 
@@ -14,11 +14,17 @@
 #    limitations under the License.
 
 import cachetools
+import hashlib
+import json
 import threading
+import time
+import weakref
 from yaml import error
 
 import io as six_io
 
+from oslo_config import cfg
+
 from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
 from mistral.lang import base
@@ -33,13 +39,122 @@ V2_0 = '2.0'
 ALL_VERSIONS = [V2_0]
 
 
-# {workflow execution id => workflow specification}.
-_WF_EX_CACHE = cachetools.LRUCache(maxsize=100)
-_WF_EX_CACHE_LOCK = threading.RLock()
+class _SpecLRUCache(cachetools.LRUCache):
+    """LRU cache of specifications bounded by entry count and size.
+
+    Values are tuples (specification, size) where size is the length of
+    the serialized specification. It's only used as an estimate of the
+    memory taken by the specification.
+    """
+
+    def __init__(self, max_entries, max_size, on_evict):
+        super(_SpecLRUCache, self).__init__(
+            maxsize=max_size if max_size > 0 else float('inf'),
+            getsizeof=lambda value: value[1]
+        )
+
+        self._max_entries = max_entries
+        self._on_evict = on_evict
+
+    def __setitem__(self, key, value):
+        super(_SpecLRUCache, self).__setitem__(key, value)
+
+        while len(self) > self._max_entries:
+            self.popitem()
 
-# {(workflow def id, workflow def updated at) => workflow specification}.
-_WF_DEF_CACHE = cachetools.LRUCache(maxsize=100)
-_WF_DEF_CACHE_LOCK = threading.RLock()
+    def popitem(self):
+        item = super(_SpecLRUCache, self).popitem()
+
+        self._on_evict()
+
+        return item
+
+
+class _SpecCache(object):
+    """Thread-safe cache of workflow specifications with statistics."""
+
+    def __init__(self, max_entries, max_size):
+        self._maxsize = max_entries
+        self._cache = (
+            _SpecLRUCache(max_entries, max_size, self._on_evict)
+            if max_entries > 0 else None
+        )
+        self._lock = threading.RLock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.parse_count = 0
+        self.parse_time = 0.0
+
+    def _on_evict(self):
+        self.evictions += 1
+
+    def get(self, key):
+        """Returns a cached specification or None if it's not cached."""
+        with self._lock:
+            try:
+                res = self._cache[key][0] if self._cache is not None else None
+            except KeyError:
+                res = None
+
+            if res is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+            return res
+
+    def put(self, key, spec, size):
+        if self._cache is None:
+            return
+
+        with self._lock:
+            try:
+                self._cache[key] = (spec, size)
+            except ValueError:
+                # The specification alone is bigger than the cache.
+                self._cache.pop(key, None)
+
+    def add_parse_time(self, seconds):
+        with self._lock:
+            self.parse_count += 1
+            self.parse_time += seconds
+
+    def __len__(self):
+        return len(self._cache) if self._cache is not None else 0
+
+    def get_stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+
+            return {
+                'size': len(self),
+                'maxsize': self._maxsize,
+                'estimated_size': (
+                    self._cache.currsize if self._cache is not None else 0
+                ),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': float(self.hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'parse_count': self.parse_count,
+                'parse_time': self.parse_time
+            }
+
+
+# A tuple of two specification caches:
+#  {workflow execution id => workflow specification}
+#  {(workflow def id, workflow def updated at) => workflow specification}
+_WF_SPEC_CACHES = None
+_WF_SPEC_CACHES_LOCK = threading.Lock()
+
+# {digest of specification dictionary => workflow specification}.
+# Specifications are immutable so the caches above share the same object
+# for the same workflow definition version instead of parsing it again.
+# Entries disappear once a specification isn't referenced from anywhere.
+_SPECS_BY_DIGEST = weakref.WeakValueDictionary()
+_SPECS_BY_DIGEST_LOCK = threading.Lock()
 
 
 def parse_yaml(text):
@@ -207,7 +322,65 @@ def _parse_def_from_wb(wb_def, section_name, item_name):
 # Methods for obtaining specifications in a more efficient way using
 # caching techniques.
 
-@cachetools.cached(_WF_EX_CACHE, lock=_WF_EX_CACHE_LOCK)
+def _get_caches():
+    """Returns the workflow execution and definition specification caches.
+
+    The caches are created lazily because their size is taken from the
+    configuration that is not yet loaded when the module gets imported.
+    """
+    global _WF_SPEC_CACHES
+
+    caches = _WF_SPEC_CACHES
+
+    if caches is not None:
+        return caches
+
+    with _WF_SPEC_CACHES_LOCK:
+        if _WF_SPEC_CACHES is None:
+            conf = cfg.CONF.engine
+
+            max_entries = conf.workflow_spec_cache_size
+            max_size = conf.workflow_spec_cache_max_memory * 1024
+
+            _WF_SPEC_CACHES = (
+                _SpecCache(max_entries, max_size),
+                _SpecCache(max_entries, max_size)
+            )
+
+        return _WF_SPEC_CACHES
+
+
+def _serialize_spec_dict(spec_dict):
+    return json.dumps(spec_dict, sort_keys=True, default=str)
+
+
+def _get_shared_workflow_spec(spec_dict, cache):
+    """Gets workflow specification reusing already parsed ones.
+
+    :param spec_dict: Raw specification dictionary.
+    :param cache: Specification cache to account the parse time in.
+    :return: A tuple (specification, size).
+    """
+    spec_str = _serialize_spec_dict(spec_dict)
+    digest = hashlib.sha256(spec_str.encode('utf-8')).hexdigest()
+
+    with _SPECS_BY_DIGEST_LOCK:
+        wf_spec = _SPECS_BY_DIGEST.get(digest)
+
+    if wf_spec is None:
+        started = time.time()
+
+        wf_spec = get_workflow_spec(spec_dict)
+
+        cache.add_parse_time(time.time() - started)
+
+        if wf_spec is not None:
+            with _SPECS_BY_DIGEST_LOCK:
+                wf_spec = _SPECS_BY_DIGEST.setdefault(digest, wf_spec)
+
+    return wf_spec, len(spec_str)
+
+
 def get_workflow_spec_by_execution_id(wf_ex_id):
     """Gets workflow specification by workflow execution id.
 
@@ -223,12 +396,22 @@ def get_workflow_spec_by_execution_id(wf_ex_id):
     if not wf_ex_id:
         return None
 
+    cache = _get_caches()[0]
+
+    wf_spec = cache.get(wf_ex_id)
+
+    if wf_spec is not None:
+        return wf_spec
+
     wf_ex = db_api.get_workflow_execution(wf_ex_id)
 
-    return get_workflow_spec(wf_ex.spec)
+    wf_spec, size = _get_shared_workflow_spec(wf_ex.spec, cache)
+
+    cache.put(wf_ex_id, wf_spec, size)
+
+    return wf_spec
 
 
-@cachetools.cached(_WF_DEF_CACHE, lock=_WF_DEF_CACHE_LOCK)
 def get_workflow_spec_by_definition_id(wf_def_id, wf_def_updated_at):
     """Gets specification by workflow definition id and its 'updated_at'.
 
@@ -250,28 +433,68 @@ def get_workflow_spec_by_definition_id(wf_def_id, wf_def_updated_at):
     if not wf_def_id:
         return None
 
+    cache = _get_caches()[1]
+
+    key = (wf_def_id, wf_def_updated_at)
+
+    wf_spec = cache.get(key)
+
+    if wf_spec is not None:
+        return wf_spec
+
     wf_def = db_api.get_workflow_definition(wf_def_id)
 
-    return get_workflow_spec(wf_def.spec)
+    wf_spec, size = _get_shared_workflow_spec(wf_def.spec, cache)
+
+    cache.put(key, wf_spec, size)
+
+    return wf_spec
 
 
 def cache_workflow_spec_by_execution_id(wf_ex_id, wf_spec):
-    with _WF_EX_CACHE_LOCK:
-        _WF_EX_CACHE[cachetools.keys.hashkey(wf_ex_id)] = wf_spec
+    cache = _get_caches()[0]
+
+    # Serializing the specification just to estimate its size is only
+    # needed if the cache is bounded by memory.
+    size = (
+        len(_serialize_spec_dict(wf_spec.to_dict()))
+        if cfg.CONF.engine.workflow_spec_cache_max_memory > 0 else 1
+    )
+
+    cache.put(wf_ex_id, wf_spec, size)
 
 
 def get_wf_execution_spec_cache_size():
-    return len(_WF_EX_CACHE)
+    return len(_get_caches()[0])
 
 
 def get_wf_definition_spec_cache_size():
-    return len(_WF_DEF_CACHE)
+    return len(_get_caches()[1])
+
+
+def get_spec_cache_stats():
+    """Returns statistics of the workflow specification caches.
+
+    :return: Dictionary {'execution': stats, 'definition': stats} where
+        stats contains the number of cached specifications and their
+        estimated total size (see _SpecLRUCache), hits, misses, hit rate,
+        evictions, and how many times and for how long in total
+        (in seconds) specifications had to be parsed.
+    """
+    wf_ex_cache, wf_def_cache = _get_caches()
+
+    return {
+        'execution': wf_ex_cache.get_stats(),
+        'definition': wf_def_cache.get_stats()
+    }
 
 
 def clear_caches():
-    """Clears all specification caches."""
-    with _WF_EX_CACHE_LOCK:
-        _WF_EX_CACHE.clear()
+    """Clears all specification caches and resets their statistics."""
+    global _WF_SPEC_CACHES
+
+    with _WF_SPEC_CACHES_LOCK:
+        _WF_SPEC_CACHES = None
 
-    with _WF_DEF_CACHE_LOCK:
-        _WF_DEF_CACHE.clear()
+    with _SPECS_BY_DIGEST_LOCK:
+        _SPECS_BY_DIGEST.clear()
@@ -13,6 +13,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from mistral import expressions as expr
 from mistral.lang import types
 from mistral.lang.v2 import base
 from mistral.lang.v2 import publish
@@ -104,6 +105,8 @@ class OnClauseSpec(base.BaseSpec):
             self._publish = self._spec_property('publish', publish.PublishSpec)
             self._next = prepare_next_clause(data.get('next'))
 
+        self._next_plans = None
+
     @classmethod
     def get_schema(cls, includes=('definitions',)):
         return super(OnClauseSpec, cls).get_schema(includes)
@@ -114,6 +117,21 @@ class OnClauseSpec(base.BaseSpec):
     def get_next(self):
         return self._next
 
+    def get_next_plans(self):
+        """Returns the "next" clause with evaluation plans.
+
+        :return: A list of tuples (task name, condition evaluation plan,
+            parameters evaluation plan) that corresponds to the result of
+            get_next().
+        """
+        if self._next_plans is None:
+            self._next_plans = [
+                (name, expr.EvaluationPlan(cond), expr.EvaluationPlan(params))
+                for name, cond, params in self._next
+            ]
+
+        return self._next_plans
+
 
 def _as_list_of_tuples(data):
     if not data:
@@ -72,6 +72,9 @@ class PoliciesSpec(base.BaseSpec):
     def get_timeout(self):
         return self._timeout
 
+    def get_timeout_plan(self):
+        return self._get_evaluation_plan('timeout', self._timeout)
+
     def get_pause_before(self):
         return self._pause_before
 
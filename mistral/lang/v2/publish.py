@@ -13,6 +13,8 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import copy
+
 from mistral import exceptions as exc
 from mistral.lang import types
 from mistral.lang.v2 import base
@@ -55,12 +57,24 @@ class PublishSpec(base.BaseSpec):
     def get_branch(self):
         return self._branch
 
+    def get_branch_plan(self):
+        return self._get_evaluation_plan('branch', self._branch)
+
     def get_global(self):
         return self._global
 
+    def get_global_plan(self):
+        return self._get_evaluation_plan('global', self._global)
+
     def get_atomic(self):
         return self._atomic
 
+    def get_atomic_plan(self):
+        return self._get_evaluation_plan('atomic', self._atomic)
+
+    def copy(self):
+        return PublishSpec(copy.deepcopy(self._data), validate=False)
+
     def merge(self, spec_to_merge):
         if spec_to_merge:
             if spec_to_merge.get_branch():
@@ -69,3 +83,6 @@ class PublishSpec(base.BaseSpec):
                 utils.merge_dicts(self._global, spec_to_merge.get_global())
             if spec_to_merge.get_atomic():
                 utils.merge_dicts(self._atomic, spec_to_merge.get_atomic())
+
+            # Evaluation plans built before merging are not valid anymore.
+            self._eval_plans.clear()
@@ -84,8 +84,14 @@ class RetrySpec(base.BaseSpec):
     def get_break_on(self):
         return self._break_on
 
+    def get_break_on_plan(self):
+        return self._get_evaluation_plan('break-on', self._break_on)
+
     def get_continue_on(self):
         return self._continue_on
 
+    def get_continue_on_plan(self):
+        return self._get_evaluation_plan('continue-on', self._continue_on)
+
     def get_delay(self):
         return self._delay
@@ -135,6 +135,9 @@ class TaskSpec(base.BaseSpec):
         self._keep_result = data.get('keep-result', True)
         self._safe_rerun = data.get('safe-rerun')
 
+        # {task state => publish specification}.
+        self._publish_specs = {}
+
         self._process_action_and_workflow()
 
     def validate_schema(self):
@@ -238,26 +241,48 @@ class TaskSpec(base.BaseSpec):
     def get_input(self):
         return self._input
 
+    def get_input_plan(self):
+        return self._get_evaluation_plan('input', self._input)
+
     def get_with_items(self):
         return self._with_items
 
+    def get_with_items_plan(self):
+        return self._get_evaluation_plan('with-items', self._with_items)
+
     def get_policies(self):
         return self._policies
 
     def get_target(self):
         return self._target
 
+    def get_target_plan(self):
+        return self._get_evaluation_plan('target', self._target)
+
     def get_publish(self, state):
+        """Returns a publish specification for the given task state.
+
+        The specification is built only once for every state so that
+        its evaluation plans are built only once too.
+        """
+        if state not in self._publish_specs:
+            self._publish_specs[state] = self._build_publish_spec(state)
+
+        return self._publish_specs[state]
+
+    def _build_publish_spec(self, state):
         spec = None
 
+        # NOTE: The raw data is copied because publish specifications
+        # may get merged and we must not modify the task specification.
         if state == states.SUCCESS and self._publish:
             spec = publish.PublishSpec(
-                {'branch': self._publish},
+                {'branch': copy.deepcopy(self._publish)},
                 validate=self._validate
             )
         elif state == states.ERROR and self._publish_on_error:
             spec = publish.PublishSpec(
-                {'branch': self._publish_on_error},
+                {'branch': copy.deepcopy(self._publish_on_error)},
                 validate=self._validate
             )
         return spec
@@ -332,14 +357,16 @@ class DirectWorkflowTaskSpec(TaskSpec):
         [self.validate_expr(t)
             for t in ([val] if isinstance(val, str) else val)]
 
-    def get_publish(self, state):
-        spec = super(DirectWorkflowTaskSpec, self).get_publish(state)
+    def _build_publish_spec(self, state):
+        spec = super(DirectWorkflowTaskSpec, self)._build_publish_spec(state)
 
         if self._on_complete and self._on_complete.get_publish():
             if spec:
                 spec.merge(self._on_complete.get_publish())
             else:
-                spec = self._on_complete.get_publish()
+                spec = self._on_complete.get_publish().copy()
+
+        on_clause = None
 
         if state == states.SUCCESS:
             on_clause = self._on_success
@@ -347,10 +374,12 @@ class DirectWorkflowTaskSpec(TaskSpec):
             on_clause = self._on_error
 
         if on_clause and on_clause.get_publish():
+            on_clause_spec = on_clause.get_publish().copy()
+
             if spec:
-                on_clause.get_publish().merge(spec)
+                on_clause_spec.merge(spec)
 
-            return on_clause.get_publish()
+            return on_clause_spec
 
         return spec
 
@@ -13,6 +13,8 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import networkx as nx
+from networkx.algorithms import traversal
 from oslo_utils import uuidutils
 from osprofiler import profiler
 
@@ -132,12 +134,24 @@ class WorkflowSpec(base.BaseSpec):
     def get_output(self):
         return self._output
 
+    def get_output_plan(self):
+        return self._get_evaluation_plan('output', self._output)
+
     def get_output_on_error(self):
         return self._output_on_error
 
+    def get_output_on_error_plan(self):
+        return self._get_evaluation_plan(
+            'output-on-error',
+            self._output_on_error
+        )
+
     def get_vars(self):
         return self._vars
 
+    def get_vars_plan(self):
+        return self._get_evaluation_plan('vars', self._vars)
+
     def get_task_defaults(self):
         return self._task_defaults
 
@@ -163,16 +177,80 @@ class DirectWorkflowSpec(WorkflowSpec):
         }
     }
 
+    _ON_CLAUSE_GETTERS = (
+        ('on-error', lambda s: s.get_on_error()),
+        ('on-success', lambda s: s.get_on_success()),
+        ('on-complete', lambda s: s.get_on_complete())
+    )
+
     def __init__(self, data, validate):
         super(DirectWorkflowSpec, self).__init__(data, validate)
 
-        # Init simple dictionary based caches for inbound and
-        # outbound task specifications. In fact, we don't need
-        # any special cache implementations here because these
-        # structures can't grow indefinitely.
+        # {(task name, clause name) => [(task name, condition, params)]}
+        # where the clauses are already merged with task defaults.
+        self._on_clauses = {}
+
+        # {(task name, clause name) => [(task name, plan, plan)]}.
+        self._on_clause_plans = {}
+
+        # {task name => set of outbound task names}.
+        self._outbound_task_names = {}
+
+        # Dictionaries {task name => list of task specifications}.
+        # They are fully built along with the specification because
+        # the workflow graph can't change.
         self.inbound_tasks_cache = {}
         self.outbound_tasks_cache = {}
 
+        self._start_tasks = []
+
+        # {(task name, max depth) => set of ancestor task names}.
+        self.ancestor_tasks_cache = {}
+
+        self._build_task_graph()
+
+    @profiler.trace('direct-wf-spec-build-task-graph', hide_args=True)
+    def _build_task_graph(self):
+        """Builds indexes of transitions between tasks in one pass."""
+        task_specs = list(self.get_tasks())
+
+        positions = {t_s.get_name(): i for i, t_s in enumerate(task_specs)}
+
+        for t_s in task_specs:
+            t_name = t_s.get_name()
+
+            out_names = set()
+
+            for clause_name, clause_getter in self._ON_CLAUSE_GETTERS:
+                clause = self._get_on_clause(t_name, clause_getter)
+
+                self._on_clauses[(t_name, clause_name)] = clause
+
+                out_names.update(tup[0] for tup in clause)
+
+            self._outbound_task_names[t_name] = out_names
+
+            self.inbound_tasks_cache.setdefault(t_name, [])
+
+            out_t_names = sorted(
+                [n for n in out_names if n in positions],
+                key=lambda n: positions[n]
+            )
+
+            self.outbound_tasks_cache[t_name] = [
+                task_specs[positions[n]] for n in out_t_names
+            ]
+
+            # Tasks are iterated in their natural order so inbound lists
+            # keep this order as well.
+            for out_t_name in out_t_names:
+                self.inbound_tasks_cache.setdefault(out_t_name, []).append(t_s)
+
+        self._start_tasks = [
+            t_s for t_s in task_specs
+            if not self.inbound_tasks_cache[t_s.get_name()]
+        ]
+
     @profiler.trace('direct-wf-spec-validate-semantics', hide_args=True)
     def validate_semantics(self):
         super(DirectWorkflowSpec, self).validate_semantics()
@@ -230,44 +308,58 @@ class DirectWorkflowSpec(WorkflowSpec):
             raise exc.InvalidModelException('\n'.join(err_msgs))
 
     def find_start_tasks(self):
-        return [
-            t_s for t_s in self.get_tasks()
-            if not self.has_inbound_transitions(t_s)
-        ]
+        return self._start_tasks
 
     def find_inbound_task_specs(self, task_spec):
-        task_name = task_spec.get_name()
+        return self.inbound_tasks_cache.get(task_spec.get_name(), [])
 
-        specs = self.inbound_tasks_cache.get(task_name)
+    def find_outbound_task_specs(self, task_spec):
+        return self.outbound_tasks_cache.get(task_spec.get_name(), [])
 
-        if specs is not None:
-            return specs
+    def find_ancestor_task_names(self, task_spec, max_depth):
+        """Finds names of the tasks that the given task can be reached from.
 
-        specs = [
-            t_s for t_s in self.get_tasks()
-            if self.transition_exists(t_s.get_name(), task_name)
-        ]
+        :param task_spec: Task specification.
+        :param max_depth: Maximum depth of the search. Tasks found at this
+            depth are included in the result but their inbound tasks are
+            not searched.
+        :return: Set of task names. It includes the given task name only
+            if the task has no inbound tasks or the task is reachable
+            from itself.
+        """
+        key = (task_spec.get_name(), max_depth)
 
-        self.inbound_tasks_cache[task_name] = specs
+        names = self.ancestor_tasks_cache.get(key)
 
-        return specs
+        if names is not None:
+            return names
 
-    def find_outbound_task_specs(self, task_spec):
-        task_name = task_spec.get_name()
+        names = self._find_ancestor_task_names(task_spec, max_depth)
 
-        specs = self.outbound_tasks_cache.get(task_name)
+        self.ancestor_tasks_cache[key] = names
 
-        if specs is not None:
-            return specs
+        return names
 
-        specs = [
-            t_s for t_s in self.get_tasks()
-            if self.transition_exists(task_name, t_s.get_name())
-        ]
+    def _find_ancestor_task_names(self, task_spec, max_depth, depth=1):
+        if depth == max_depth:
+            return {task_spec.get_name()}
 
-        self.outbound_tasks_cache[task_name] = specs
+        in_task_specs = self.find_inbound_task_specs(task_spec)
 
-        return specs
+        if not in_task_specs:
+            return {task_spec.get_name()}
+
+        names = set()
+
+        for t_s in in_task_specs:
+            names.update(
+                self._find_ancestor_task_names(t_s, max_depth, depth + 1)
+            )
+
+        if depth > 1:
+            names.add(task_spec.get_name())
+
+        return names
 
     def has_inbound_transitions(self, task_spec):
         return len(self.find_inbound_task_specs(task_spec)) > 0
@@ -276,80 +368,96 @@ class DirectWorkflowSpec(WorkflowSpec):
         return len(self.find_outbound_task_specs(task_spec)) > 0
 
     def find_outbound_task_names(self, task_name):
-        t_names = set()
-
-        for tup in self.get_on_error_clause(task_name):
-            t_names.add(tup[0])
-
-        for tup in self.get_on_success_clause(task_name):
-            t_names.add(tup[0])
-
-        for tup in self.get_on_complete_clause(task_name):
-            t_names.add(tup[0])
-
-        return t_names
+        # Return a copy because callers are allowed to modify it.
+        return set(self._outbound_task_names.get(task_name, ()))
 
     def transition_exists(self, from_task_name, to_task_name):
-        t_names = self.find_outbound_task_names(from_task_name)
-
-        return to_task_name in t_names
-
-    def get_on_error_clause(self, t_name):
-        result = []
+        return to_task_name in self._outbound_task_names.get(
+            from_task_name,
+            ()
+        )
 
-        on_clause = self.get_task(t_name).get_on_error()
+    def _get_on_clause(self, t_name, clause_getter, plans=False):
+        on_clause = clause_getter(self.get_task(t_name))
 
-        if on_clause:
-            result = on_clause.get_next()
+        result = self._get_next(on_clause, plans) if on_clause else []
 
         if not result:
             t_defaults = self.get_task_defaults()
 
-            if t_defaults and t_defaults.get_on_error():
+            on_clause = clause_getter(t_defaults) if t_defaults else None
+
+            if on_clause:
                 result = self._remove_task_from_clause(
-                    t_defaults.get_on_error().get_next(),
+                    self._get_next(on_clause, plans),
                     t_name
                 )
 
         return result
 
-    def get_on_success_clause(self, t_name):
-        result = []
+    @staticmethod
+    def _get_next(on_clause, plans):
+        return on_clause.get_next_plans() if plans else on_clause.get_next()
 
-        on_clause = self.get_task(t_name).get_on_success()
+    def _get_indexed_on_clause(self, t_name, clause_name, clause_getter,
+                               plans=False):
+        index = self._on_clause_plans if plans else self._on_clauses
 
-        if on_clause:
-            result = on_clause.get_next()
+        key = (t_name, clause_name)
 
-        if not result:
-            t_defaults = self.get_task_defaults()
+        result = index.get(key)
 
-            if t_defaults and t_defaults.get_on_success():
-                result = self._remove_task_from_clause(
-                    t_defaults.get_on_success().get_next(),
-                    t_name
-                )
+        if result is None:
+            result = self._get_on_clause(t_name, clause_getter, plans)
+
+            index[key] = result
 
         return result
 
-    def get_on_complete_clause(self, t_name):
-        result = []
+    def get_on_error_clause(self, t_name):
+        return self._get_indexed_on_clause(
+            t_name,
+            'on-error',
+            lambda s: s.get_on_error()
+        )
 
-        on_clause = self.get_task(t_name).get_on_complete()
+    def get_on_success_clause(self, t_name):
+        return self._get_indexed_on_clause(
+            t_name,
+            'on-success',
+            lambda s: s.get_on_success()
+        )
 
-        if on_clause:
-            result = on_clause.get_next()
+    def get_on_complete_clause(self, t_name):
+        return self._get_indexed_on_clause(
+            t_name,
+            'on-complete',
+            lambda s: s.get_on_complete()
+        )
 
-        if not result:
-            t_defaults = self.get_task_defaults()
+    def get_on_error_clause_plans(self, t_name):
+        return self._get_indexed_on_clause(
+            t_name,
+            'on-error',
+            lambda s: s.get_on_error(),
+            plans=True
+        )
 
-            if t_defaults and t_defaults.get_on_complete():
-                result = self._remove_task_from_clause(
-                    t_defaults.get_on_complete().get_next(),
-                    t_name
-                )
+    def get_on_success_clause_plans(self, t_name):
+        return self._get_indexed_on_clause(
+            t_name,
+            'on-success',
+            lambda s: s.get_on_success(),
+            plans=True
+        )
 
-        return result
+    def get_on_complete_clause_plans(self, t_name):
+        return self._get_indexed_on_clause(
+            t_name,
+            'on-complete',
+            lambda s: s.get_on_complete(),
+            plans=True
+        )
 
     @staticmethod
     def _remove_task_from_clause(on_clause, t_name):
@@ -371,6 +479,41 @@ class ReverseWorkflowSpec(WorkflowSpec):
         }
     }
 
+    def __init__(self, data, validate):
+        super(ReverseWorkflowSpec, self).__init__(data, validate)
+
+        # {task name => list of names of the tasks it requires}.
+        self._task_requires = {}
+
+        # Dependency graph where nodes are task names and edges go
+        # from required tasks to the tasks that require them.
+        self._task_graph = nx.DiGraph()
+
+        # {target task name => tuple of task specifications}.
+        self._task_plans = {}
+
+        self._build_task_graph()
+
+    @profiler.trace('reverse-wf-spec-build-task-graph', hide_args=True)
+    def _build_task_graph(self):
+        """Builds the dependency graph of the tasks.
+
+        The graph can't change so it's built once along with the
+        specification.
+        """
+        for t_s in self.get_tasks():
+            t_name = t_s.get_name()
+
+            requires = self._get_task_requires(t_s)
+
+            self._task_requires[t_name] = requires
+
+            self._task_graph.add_node(t_name)
+
+            for req in requires:
+                if self.get_tasks().get(req):
+                    self._task_graph.add_edge(req, t_name)
+
     def validate_semantics(self):
         super(ReverseWorkflowSpec, self).validate_semantics()
 
@@ -378,10 +521,10 @@ class ReverseWorkflowSpec(WorkflowSpec):
 
     def _check_workflow_integrity(self):
         for t_s in self.get_tasks():
-            for req in self.get_task_requires(t_s):
+            for req in self._get_task_requires(t_s):
                 self._validate_task_link(req, allow_engine_cmds=False)
 
-    def get_task_requires(self, task_spec):
+    def _get_task_requires(self, task_spec):
         requires = set(task_spec.get_requires())
 
         defaults = self.get_task_defaults()
@@ -393,6 +536,43 @@ class ReverseWorkflowSpec(WorkflowSpec):
 
         return list(requires)
 
+    def get_task_requires(self, task_spec):
+        requires = self._task_requires.get(task_spec.get_name())
+
+        if requires is None:
+            return self._get_task_requires(task_spec)
+
+        return list(requires)
+
+    def get_task_plan(self, target_task_name):
+        """Returns the tasks that need to run to run the target task.
+
+        The result is calculated once per target task and cached.
+
+        :param target_task_name: Target task name.
+        :return: Tuple of specifications of all tasks that the target task
+            depends on directly or indirectly, and the target task itself,
+            in topological order. That is, every task goes after all the
+            tasks it requires and the target task goes last.
+        """
+        plan = self._task_plans.get(target_task_name)
+
+        if plan is None:
+            tasks = self.get_tasks()
+
+            # Unwind tasks from the target task.
+            plan = tuple(
+                tasks.get(t_name) for t_name in
+                traversal.dfs_postorder_nodes(
+                    self._task_graph.reverse(copy=False),
+                    target_task_name
+                )
+            )
+
+            self._task_plans[target_task_name] = plan
+
+        return plan
+
 
 class WorkflowSpecList(base.BaseSpecList):
     item_class = WorkflowSpec
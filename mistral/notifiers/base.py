@@ -76,3 +76,24 @@ class NotificationPublisher(object, metaclass=abc.ABCMeta):
     @abc.abstractmethod
     def publish(self, ctx, ex_id, data, event, timestamp, **kwargs):
         raise NotImplementedError()
+
+    def publish_batch(self, ctx, notifications, **kwargs):
+        """Publishes multiple notifications.
+
+        Publishers that can send multiple notifications at once should
+        override this method. By default, notifications are published
+        one by one.
+
+        :param ctx: Security context.
+        :param notifications: List of dictionaries with keys "ex_id",
+            "data", "event" and "timestamp".
+        """
+        for n in notifications:
+            self.publish(
+                ctx,
+                n['ex_id'],
+                n['data'],
+                n['event'],
+                n['timestamp'],
+                **kwargs
+            )
@@ -12,33 +12,59 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-import copy
-
+from oslo_config import cfg
 from oslo_log import log as logging
 
 from mistral import context as auth_ctx
 from mistral.notifiers import base
+from mistral.notifiers import notification_queue
 
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 
 class DefaultNotifier(base.Notifier):
     """Local notifier that process notification request."""
 
+    def __init__(self):
+        self._queue = None
+
+        if CONF.notifier.async_queue_size:
+            self._queue = notification_queue.NotificationQueue(
+                CONF.notifier.async_queue_size,
+                CONF.notifier.async_workers
+            )
+
     def notify(self, ex_id, data, event, timestamp, publishers):
         ctx = auth_ctx.ctx()
 
         data['event'] = event
 
         for entry in publishers:
-            params = copy.deepcopy(entry)
+            # Publishers don't modify parameters so a shallow copy
+            # without the publisher type is enough.
+            params = dict(entry)
             publisher_name = params.pop('type', None)
 
             if not publisher_name:
                 LOG.error('Notification publisher type is not specified.')
                 continue
 
+            if self._queue:
+                self._queue.put(
+                    ctx,
+                    publisher_name,
+                    params,
+                    ex_id,
+                    data,
+                    event,
+                    timestamp
+                )
+
+                continue
+
             try:
                 publisher = base.get_notification_publisher(publisher_name)
                 publisher.publish(ctx, ex_id, data, event, timestamp, **params)
@@ -47,3 +73,15 @@ class DefaultNotifier(base.Notifier):
                     'Unable to process event for publisher "%s".',
                     publisher_name
                 )
+
+    def stop(self):
+        if self._queue:
+            self._queue.stop()
+
+    def get_stats(self):
+        """Returns statistics of asynchronous notification delivery."""
+        return self._queue.get_stats() if self._queue else {}
+
+    def get_dead_letters(self):
+        """Returns notifications that could not be delivered."""
+        return self._queue.get_dead_letters() if self._queue else []
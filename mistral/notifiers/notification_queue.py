@@ -0,0 +1,371 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import collections
+import json
+import threading
+import time
+
+import eventlet
+from eventlet import queue
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from mistral import context as auth_ctx
+from mistral.notifiers import base
+
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+
+Notification = collections.namedtuple(
+    'Notification',
+    ['ex_id', 'data', 'event', 'timestamp', 'enqueued_at']
+)
+
+
+class _Batch(object):
+    def __init__(self, ctx, publisher_name, params):
+        self.ctx = ctx
+        self.publisher_name = publisher_name
+        self.params = params
+        self.notifications = []
+        self.created_at = time.monotonic()
+
+
+class NotificationQueue(object):
+    """Delivers notifications asynchronously.
+
+    Notifications are put into a bounded queue and delivered by a pool
+    of green threads so that slow publishers don't block the engine.
+    Failed deliveries are retried with exponential backoff and the ones
+    that still fail go to a bounded in-memory dead letter store.
+
+    If a publisher entry has "batch_size" greater than 1 then
+    notifications for the same publisher with the same parameters
+    (e.g. the same webhook URL) are delivered in batches using the
+    publish_batch() method of the publisher.
+    """
+
+    def __init__(self, queue_size, workers):
+        self._queue = queue.LightQueue(queue_size)
+        self._workers = workers
+        self._threads = []
+        self._lock = threading.Lock()
+
+        # {batch key => _Batch}.
+        self._batches = {}
+
+        self._dead_letters = collections.deque(
+            maxlen=CONF.notifier.dead_letter_size
+        )
+
+        self._stats = {
+            'delivered': 0,
+            'retried': 0,
+            'failed': 0,
+            'dropped': 0,
+            'total_latency': 0.,
+            'max_latency': 0.
+        }
+
+    def put(self, ctx, publisher_name, params, ex_id, data, event,
+            timestamp):
+        """Puts a notification into the queue.
+
+        :param ctx: Security context.
+        :param publisher_name: Name of the publisher to deliver with.
+        :param params: Publisher parameters.
+        :param ex_id: Workflow, task, or action execution id.
+        :param data: Dictionary to include in the notification message.
+        :param event: Event being notified on.
+        :param timestamp: Datetime when this event occurred.
+        """
+        self._ensure_started()
+
+        notification = Notification(
+            ex_id,
+            data,
+            event,
+            timestamp,
+            time.monotonic()
+        )
+
+        try:
+            self._queue.put_nowait(
+                (ctx, publisher_name, params, notification)
+            )
+        except queue.Full:
+            LOG.warning(
+                'Notification queue is full, the notification is moved to '
+                'the dead letter store [ex_id=%s, event=%s, publisher=%s]',
+                ex_id,
+                event,
+                publisher_name
+            )
+
+            with self._lock:
+                self._stats['dropped'] += 1
+
+            self._add_dead_letter(
+                publisher_name,
+                params,
+                [notification],
+                'Notification queue is full.'
+            )
+
+    def _ensure_started(self):
+        with self._lock:
+            if self._threads:
+                return
+
+            for _ in range(self._workers):
+                self._threads.append(eventlet.spawn(self._worker_loop))
+
+            self._threads.append(eventlet.spawn(self._batch_flush_loop))
+
+    def stop(self):
+        """Delivers pending batches and stops the workers.
+
+        Notifications still waiting in the queue are not delivered.
+        """
+        self.flush_batches()
+
+        with self._lock:
+            threads = self._threads
+
+            self._threads = []
+
+        for t in threads:
+            t.kill()
+
+    def _worker_loop(self):
+        while True:
+            ctx, publisher_name, params, notification = self._queue.get()
+
+            try:
+                batch_size = int(params.get('batch_size') or 1)
+
+                if batch_size > 1:
+                    batch = self._add_to_batch(
+                        ctx,
+                        publisher_name,
+                        params,
+                        notification,
+                        batch_size
+                    )
+
+                    if batch:
+                        self._deliver_batch(batch)
+                else:
+                    self._deliver(
+                        ctx,
+                        publisher_name,
+                        params,
+                        [notification],
+                        batched=False
+                    )
+            except Exception:
+                LOG.exception(
+                    'Unable to process notification [publisher=%s].',
+                    publisher_name
+                )
+
+    def _add_to_batch(self, ctx, publisher_name, params, notification,
+                      batch_size):
+        project_id = ctx.project_id if ctx else None
+
+        key = (
+            project_id,
+            publisher_name,
+            json.dumps(params, sort_keys=True, default=str)
+        )
+
+        with self._lock:
+            batch = self._batches.get(key)
+
+            if batch is None:
+                batch = _Batch(ctx, publisher_name, params)
+
+                self._batches[key] = batch
+
+            batch.notifications.append(notification)
+
+            if len(batch.notifications) < batch_size:
+                return None
+
+            del self._batches[key]
+
+        return batch
+
+    def _batch_flush_loop(self):
+        while True:
+            interval = CONF.notifier.batch_interval
+
+            eventlet.sleep(interval or 0.1)
+
+            try:
+                self.flush_batches(interval)
+            except Exception:
+                LOG.exception('Failed to flush notification batches.')
+
+    def flush_batches(self, min_age=0):
+        """Delivers the batches that are not full yet.
+
+        :param min_age: Only batches created at least this number of
+            seconds ago are delivered.
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            keys = [
+                key for key, batch in self._batches.items()
+                if now - batch.created_at >= min_age
+            ]
+
+            batches = [self._batches.pop(key) for key in keys]
+
+        for batch in batches:
+            self._deliver_batch(batch)
+
+    def _deliver_batch(self, batch):
+        self._deliver(
+            batch.ctx,
+            batch.publisher_name,
+            batch.params,
+            batch.notifications,
+            batched=True
+        )
+
+    def _deliver(self, ctx, publisher_name, params, notifications, batched):
+        auth_ctx.set_ctx(ctx)
+
+        publisher = base.get_notification_publisher(publisher_name)
+
+        max_retries = CONF.notifier.max_retries
+
+        for attempt in range(max_retries + 1):
+            try:
+                if batched:
+                    publisher.publish_batch(
+                        ctx,
+                        [n._asdict() for n in notifications],
+                        **params
+                    )
+                else:
+                    n = notifications[0]
+
+                    publisher.publish(
+                        ctx,
+                        n.ex_id,
+                        n.data,
+                        n.event,
+                        n.timestamp,
+                        **params
+                    )
+
+                break
+            except Exception as e:
+                if attempt == max_retries:
+                    LOG.exception(
+                        'Unable to deliver notifications, they are moved to '
+                        'the dead letter store [publisher=%s, count=%s].',
+                        publisher_name,
+                        len(notifications)
+                    )
+
+                    with self._lock:
+                        self._stats['failed'] += len(notifications)
+
+                    self._add_dead_letter(
+                        publisher_name,
+                        params,
+                        notifications,
+                        str(e)
+                    )
+
+                    return
+
+                delay = CONF.notifier.retry_delay * 2 ** attempt
+
+                LOG.warning(
+                    'Unable to deliver notifications, retrying in %s seconds'
+                    ' [publisher=%s, attempt=%s, error=%s]',
+                    delay,
+                    publisher_name,
+                    attempt + 1,
+                    e
+                )
+
+                with self._lock:
+                    self._stats['retried'] += 1
+
+                eventlet.sleep(delay)
+
+        now = time.monotonic()
+
+        with self._lock:
+            for n in notifications:
+                latency = now - n.enqueued_at
+
+                self._stats['delivered'] += 1
+                self._stats['total_latency'] += latency
+                self._stats['max_latency'] = max(
+                    self._stats['max_latency'],
+                    latency
+                )
+
+    def _add_dead_letter(self, publisher_name, params, notifications, error):
+        with self._lock:
+            for n in notifications:
+                self._dead_letters.append({
+                    'publisher': publisher_name,
+                    'params': params,
+                    'ex_id': n.ex_id,
+                    'data': n.data,
+                    'event': n.event,
+                    'timestamp': n.timestamp,
+                    'error': error
+                })
+
+    def get_dead_letters(self):
+        """Returns notifications that could not be delivered."""
+        with self._lock:
+            return list(self._dead_letters)
+
+    def get_stats(self):
+        """Returns statistics of notification delivery.
+
+        :return: Dictionary with the number of notifications waiting for
+            delivery (including the ones collected into batches), numbers
+            of delivered, retried, failed and dropped notifications, size
+            of the dead letter store and average/max delivery latency in
+            seconds counted from the moment a notification is queued.
+        """
+        with self._lock:
+            stats = dict(self._stats)
+
+            delivered = stats['delivered']
+
+            stats['avg_latency'] = (
+                stats.pop('total_latency') / delivered if delivered else 0.
+            )
+            stats['queue_depth'] = self._queue.qsize() + sum(
+                len(b.notifications) for b in self._batches.values()
+            )
+            stats['dead_letters'] = len(self._dead_letters)
+
+        return stats
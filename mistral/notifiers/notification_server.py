@@ -56,6 +56,8 @@ class NotificationServer(service_base.MistralService):
         if self._rpc_server:
             self._rpc_server.stop(graceful)
 
+        self.notifier.stop()
+
     def notify(self, rpc_ctx, ex_id, data, event, timestamp, publishers):
         """Receives calls over RPC to notify on notification server.
 
@@ -14,25 +14,72 @@
 
 from http import HTTPStatus
 import json
-import requests
+import threading
+from urllib import parse
 
+from oslo_config import cfg
 from oslo_log import log as logging
+import requests
+from requests import adapters
 
 from mistral.notifiers import base
 
 
 LOG = logging.getLogger(__name__)
 
+CONF = cfg.CONF
+
 
 class WebhookPublisher(base.NotificationPublisher):
+    def __init__(self):
+        # {(scheme, host and port) => requests.Session}. Sessions keep
+        # connections to endpoints alive between notifications.
+        self._sessions = {}
+        self._lock = threading.Lock()
 
-    def publish(self, ctx, ex_id, data, event, timestamp, **kwargs):
-        url = kwargs.get('url')
-        headers = kwargs.get('headers', {})
+    def _get_session(self, url):
+        key = parse.urlsplit(url)[:2]
+
+        with self._lock:
+            session = self._sessions.get(key)
+
+            if session is None:
+                pool_size = CONF.notifier.webhook_pool_size
+
+                adapter = adapters.HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=pool_size
+                )
 
-        resp = requests.post(url, data=json.dumps(data), headers=headers)
+                session = requests.Session()
+
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+
+                self._sessions[key] = session
+
+        return session
+
+    def _post(self, url, body, headers):
+        resp = self._get_session(url).post(
+            url,
+            data=json.dumps(body),
+            headers=headers,
+            timeout=CONF.notifier.webhook_timeout or None
+        )
 
         LOG.info("Webook request url=%s code=%s", url, resp.status_code)
 
         if resp.status_code not in [HTTPStatus.OK, HTTPStatus.CREATED]:
             raise Exception(resp.text)
+
+    def publish(self, ctx, ex_id, data, event, timestamp, **kwargs):
+        self._post(kwargs.get('url'), data, kwargs.get('headers', {}))
+
+    def publish_batch(self, ctx, notifications, **kwargs):
+        # All notifications are sent in one request as a JSON list.
+        self._post(
+            kwargs.get('url'),
+            [n['data'] for n in notifications],
+            kwargs.get('headers', {})
+        )
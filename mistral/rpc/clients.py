@@ -16,6 +16,7 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from mistral_lib import serialization
 from oslo_config import cfg
 from oslo_log import log as logging
 from osprofiler import profiler
@@ -207,6 +208,35 @@ class EngineClient(eng.Engine):
             wf_action=wf_action
         )
 
+    @base.wrap_messaging_exception
+    @profiler.trace('engine-client-on-actions-complete', hide_args=True)
+    def on_actions_complete(self, results, async_=True):
+        """Conveys results of multiple actions to Mistral Engine.
+
+        This method is used by executors to send accumulated action results
+        in one RPC call instead of calling on_action_complete for each of
+        them.
+
+        :param results: List of pairs (action execution id, result).
+        :param async_: If True, run action in asynchronous mode (w/o waiting
+            for completion).
+        """
+
+        call = self._client.async_call if async_ else self._client.sync_call
+
+        # Results are serialized explicitly because the RPC serializer
+        # doesn't look into collections.
+        serializer = serialization.get_polymorphic_serializer()
+
+        return call(
+            auth_ctx.ctx(),
+            'on_actions_complete',
+            results=[
+                (action_ex_id, serializer.serialize(result))
+                for action_ex_id, result in results
+            ]
+        )
+
     @base.wrap_messaging_exception
     @profiler.trace('engine-client-on-action-update', hide_args=True)
     def on_action_update(self, action_ex_id, state, wf_action=False,
@@ -336,10 +366,19 @@ class EngineClient(eng.Engine):
 
         :param action_ex_ids: Action execution ids.
         """
+        packed_ids = None
+
+        # Send IDs packed into one string if possible to keep
+        # the payload small when there are many running actions.
+        if cfg.CONF.action_heartbeat.pack_action_ids:
+            packed_ids = base.pack_uuids(action_ex_ids)
+
         return self._client.async_call(
             auth_ctx.ctx(),
             'report_running_actions',
-            action_ex_ids=action_ex_ids
+            action_ex_ids=(
+                packed_ids if packed_ids is not None else list(action_ex_ids)
+            )
         )
 
 
@@ -13,6 +13,7 @@
 #    limitations under the License.
 
 import amqp
+import collections
 import socket
 import threading
 import time
@@ -44,12 +45,45 @@ _pool_opts = [
     ),
 ]
 
+_server_opts = [
+    cfg.IntOpt(
+        'kombu_prefetch_count',
+        min=1,
+        default=1,
+        help='The number of unacknowledged messages that the broker can'
+        ' deliver to one Kombu RPC server at a time. Messages are'
+        ' acknowledged once they have been processed so this value also'
+        ' limits how many messages are processed concurrently.'
+    ),
+    cfg.IntOpt(
+        'kombu_max_in_flight',
+        min=0,
+        default=0,
+        help='The maximum number of received messages that are being'
+        ' processed or waiting for processing in a Kombu RPC server. Once'
+        ' it is reached the server stops consuming new messages until some'
+        ' of them are processed. If set to 0 then the size of the executor'
+        ' thread pool is used.'
+    ),
+    cfg.DictOpt(
+        'kombu_method_concurrency',
+        default={},
+        help='Limits of how many calls of particular RPC methods can be'
+        ' processed concurrently by a Kombu RPC server, for example'
+        ' "start_workflow:10,on_action_complete:50". Messages exceeding'
+        ' the limit wait in the server until running calls of the same'
+        ' method complete. Methods without a limit are only limited by'
+        ' the executor thread pool.'
+    )
+]
+
 
 class KombuRPCServer(rpc_base.RPCServer, kombu_base.Base):
     def __init__(self, conf):
         super(KombuRPCServer, self).__init__(conf)
 
         CONF.register_opts(_pool_opts)
+        CONF.register_opts(_server_opts)
 
         kombu_base.set_transport_options()
 
@@ -79,6 +113,33 @@ class KombuRPCServer(rpc_base.RPCServer, kombu_base.Base):
         self._sleep_time = 1
         self._max_sleep_time = 10
 
+        self._prefetch_count = CONF.kombu_prefetch_count
+        self._max_in_flight = CONF.kombu_max_in_flight
+        self._method_limits = {
+            name: int(limit)
+            for name, limit in CONF.kombu_method_concurrency.items()
+        }
+
+        # The lock guards all the structures related to dispatching
+        # messages and the condition lets the consumer loop wait until
+        # the number of messages in flight decreases.
+        self._lock = threading.Lock()
+        self._capacity_available = threading.Condition(self._lock)
+
+        # Messages received but not acknowledged yet.
+        self._in_flight = 0
+
+        # Messages received but not being processed yet.
+        self._waiting = 0
+
+        # Number of messages being processed for every method with
+        # a concurrency limit and messages waiting for the limit.
+        self._running_by_method = collections.defaultdict(int)
+        self._pending_by_method = collections.defaultdict(collections.deque)
+
+        # {method name => [calls, total latency, max latency, total wait]}.
+        self._method_stats = collections.defaultdict(lambda: [0, 0., 0., 0.])
+
     @property
     def is_running(self):
         """Return whether server is running."""
@@ -126,7 +187,7 @@ class KombuRPCServer(rpc_base.RPCServer, kombu_base.Base):
                         queues=queue,
                         callbacks=[self._process_message],
                 ) as consumer:
-                    consumer.qos(prefetch_count=1)
+                    consumer.qos(prefetch_count=self._prefetch_count)
 
                     self._running.set()
                     self._stopped.clear()
@@ -139,6 +200,9 @@ class KombuRPCServer(rpc_base.RPCServer, kombu_base.Base):
                     self._sleep_time = 1
 
                     while self.is_running:
+                        if not self._wait_for_capacity(timeout=1):
+                            continue
+
                         try:
                             conn.drain_events(timeout=1)
                         except socket.timeout:
@@ -278,8 +342,129 @@ class KombuRPCServer(rpc_base.RPCServer, kombu_base.Base):
     def register_endpoint(self, endpoint):
         self.endpoints.append(endpoint)
 
+    def _wait_for_capacity(self, timeout):
+        """Waits until the server can take more messages.
+
+        :param timeout: Max time to wait in seconds.
+        :return: True if more messages can be consumed.
+        """
+        max_in_flight = self._max_in_flight or self._executor_threads
+
+        with self._capacity_available:
+            if self._in_flight < max_in_flight:
+                return True
+
+            self._capacity_available.wait(timeout)
+
+            return self._in_flight < max_in_flight
+
     def _process_message(self, request, message):
-        self._worker.submit(self._on_message_safe, request, message)
+        method_name = request.get('rpc_method')
+        received_at = time.monotonic()
+
+        with self._lock:
+            self._in_flight += 1
+            self._waiting += 1
+
+            limit = self._method_limits.get(method_name)
+
+            if limit:
+                if self._running_by_method[method_name] >= limit:
+                    self._pending_by_method[method_name].append(
+                        (request, message, received_at)
+                    )
+
+                    return
+
+                self._running_by_method[method_name] += 1
+
+        self._submit_message(method_name, request, message, received_at)
+
+    def _submit_message(self, method_name, request, message, received_at):
+        self._worker.submit(
+            self._handle_message,
+            method_name,
+            request,
+            message,
+            received_at
+        )
+
+    def _handle_message(self, method_name, request, message, received_at):
+        started_at = time.monotonic()
+
+        with self._lock:
+            self._waiting -= 1
+
+        try:
+            self._on_message_safe(request, message)
+        finally:
+            next_msg = self._on_message_processed(
+                method_name,
+                started_at - received_at,
+                time.monotonic() - started_at
+            )
+
+            if next_msg:
+                self._submit_message(method_name, *next_msg)
+
+    def _on_message_processed(self, method_name, wait_time, latency):
+        """Updates the server state once a message has been processed.
+
+        :return: A message of the same method waiting for its concurrency
+            limit, if any, in the form of a tuple (request, message,
+            received_at). It has to be submitted instead of the processed
+            one, the number of running calls of the method stays the same.
+        """
+        with self._capacity_available:
+            stats = self._method_stats[method_name]
+
+            stats[0] += 1
+            stats[1] += latency
+            stats[2] = max(stats[2], latency)
+            stats[3] += wait_time
+
+            self._in_flight -= 1
+
+            self._capacity_available.notify()
+
+            if method_name not in self._method_limits:
+                return None
+
+            pending = self._pending_by_method[method_name]
+
+            if pending:
+                return pending.popleft()
+
+            self._running_by_method[method_name] -= 1
+
+            return None
+
+    def get_stats(self):
+        """Returns statistics of message processing.
+
+        :return: Dictionary with the number of messages in flight, the
+            number of received messages waiting for processing and,
+            for every RPC method, the number of processed calls and
+            the average time they waited and were handled, in seconds.
+        """
+        with self._lock:
+            methods = {}
+
+            for name, stats in self._method_stats.items():
+                cnt, latency, max_latency, wait_time = stats
+
+                methods[name] = {
+                    'calls': cnt,
+                    'avg_latency': latency / cnt if cnt else 0.,
+                    'max_latency': max_latency,
+                    'avg_wait_time': wait_time / cnt if cnt else 0.
+                }
+
+            return {
+                'in_flight': self._in_flight,
+                'queue_depth': self._waiting,
+                'methods': methods
+            }
 
     def _prepare_worker(self, executor='blocking'):
         mgr = driver.DriverManager('kombu_driver.executors', executor)
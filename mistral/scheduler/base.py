@@ -54,6 +54,15 @@ class Scheduler(object, metaclass=abc.ABCMeta):
         """
         raise NotImplementedError
 
+    def get_stats(self):
+        """Returns statistics of this scheduler.
+
+        :return: Dictionary with the number of jobs that were not
+            scheduled because a pending job with the same key already
+            existed.
+        """
+        return {'deduplicated_jobs': 0}
+
     @abc.abstractmethod
     def start(self):
         """Starts this scheduler."""
@@ -73,7 +82,7 @@ class SchedulerJob(object):
     """
     def __init__(self, run_after=0, target_factory_func_name=None,
                  func_name=None, func_args=None,
-                 func_arg_serializers=None, key=None):
+                 func_arg_serializers=None, key=None, unique=False):
         """Initializes a Scheduler Job.
 
         :param run_after: Amount of seconds after which to invoke
@@ -96,17 +105,25 @@ class SchedulerJob(object):
             whose values can't be saved into a persistent storage as is and
             they need to be converted first into a value of a primitive type.
         :param key: A value that can be used to find the job.
+        :param unique: If True, the job is not scheduled if there's already
+            a job with the same key that hasn't started processing yet.
+            The pending job will do the same work so there's no need to
+            run it twice.
         """
 
         if not func_name:
             raise RuntimeError("'target_method_name' must be provided.")
 
+        if unique and key is None:
+            raise RuntimeError("'key' must be provided for a unique job.")
+
         self.run_after = run_after
         self.target_factory_func_name = target_factory_func_name
         self.func_name = func_name
         self.func_args = func_args or {}
         self.func_arg_serializers = func_arg_serializers
         self.key = key
+        self.unique = unique
 
 
 def get_system_scheduler():
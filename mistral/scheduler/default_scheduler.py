@@ -12,12 +12,16 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import collections
 import copy
 import datetime
 import eventlet
+import heapq
+import itertools
 import random
 import sys
 import threading
+import time
 
 from oslo_config import cfg
 from oslo_log import log as logging
@@ -50,33 +54,93 @@ class DefaultScheduler(base.Scheduler):
             store for the new jobs to run.
         :param batch_size: Defines how many jobs this scheduler can pick
             up from the job store at once.
+        :param pool_size: Defines how many jobs picked up from the job
+            store this scheduler can run concurrently.
         """
 
         self._fixed_delay = conf.fixed_delay
         self._random_delay = conf.random_delay
         self._batch_size = conf.batch_size
 
-        # Dictionary containing {GreenThread: ScheduledJob} pairs that
+        # A pool of green threads running jobs picked up from the job store.
+        self._pool = eventlet.GreenPool(conf.pool_size)
+
+        # A green thread deleting processed jobs from the job store.
+        self._job_deleter = eventlet.GreenPool(1)
+
+        # IDs of the processed jobs that haven't been deleted from the job
+        # store yet. If deleting them fails it's retried on every iteration.
+        self._processed_job_ids = []
+
+        # The number of jobs captured during the last job store iteration.
+        self._captured_cnt = 0
+
+        # The number of unique jobs that haven't been scheduled because
+        # a pending job with the same key already existed.
+        self._deduplicated_cnt = 0
+
+        # Dictionary containing {job ID: ScheduledJob} pairs that
         # represent in-memory jobs.
         self.in_memory_jobs = {}
 
+        # Index of in-memory jobs by their keys: {key: set of job IDs}.
+        self._in_memory_job_ids_by_key = collections.defaultdict(set)
+
+        # A heap of (run time, sequence number, job ID) tuples ordered by
+        # the time when in-memory jobs need to run. Jobs that are no longer
+        # in "in_memory_jobs" are skipped lazily when popped from the heap.
+        self._in_memory_heap = []
+        self._in_memory_seq = itertools.count()
+
+        # Wakes up the in-memory job dispatcher if a job with an earlier
+        # run time has been scheduled or the scheduler is being stopped.
+        self._in_memory_wakeup = threading.Event()
+
         self._job_store_checker_thread = threading.Thread(
             target=self._job_store_checker
         )
         self._job_store_checker_thread.daemon = True
 
+        self._memory_job_dispatcher_thread = threading.Thread(
+            target=self._memory_job_dispatcher
+        )
+        self._memory_job_dispatcher_thread.daemon = True
+
         self._stopped = True
 
     def start(self):
         self._stopped = False
 
         self._job_store_checker_thread.start()
+        self._memory_job_dispatcher_thread.start()
 
     def stop(self, graceful=False):
         self._stopped = True
 
+        self._in_memory_wakeup.set()
+
         if graceful:
             self._job_store_checker_thread.join()
+            self._memory_job_dispatcher_thread.join()
+
+            self._pool.waitall()
+            self._job_deleter.waitall()
+
+            self._delete_processed_jobs()
+
+    def _get_delay(self):
+        delay = (
+            self._fixed_delay +
+            random.Random().randint(0, self._random_delay * 1000) * 0.001
+        )
+
+        # If the previous iteration picked up a full batch then there are
+        # likely more jobs waiting in the job store so we need to check it
+        # again sooner. The fuller the batch the shorter the delay.
+        if self._batch_size and self._captured_cnt:
+            delay *= max(0.0, 1.0 - self._captured_cnt / self._batch_size)
+
+        return delay
 
     def _job_store_checker(self):
         while not self._stopped:
@@ -84,12 +148,11 @@ class DefaultScheduler(base.Scheduler):
                 "Starting Scheduler Job Store checker [scheduler=%s]...", self
             )
 
-            eventlet.sleep(
-                self._fixed_delay +
-                random.Random().randint(0, self._random_delay * 1000) * 0.001
-            )
+            eventlet.sleep(self._get_delay())
 
             try:
+                self._delete_processed_jobs()
+
                 self._process_store_jobs()
             except Exception:
                 LOG.exception(
@@ -117,25 +180,99 @@ class DefaultScheduler(base.Scheduler):
                 if self._capture_scheduled_job(job)
             ]
 
-        # Invoke and delete scheduled jobs.
+        self._captured_cnt = len(captured_jobs)
+
+        if not captured_jobs:
+            return
+
+        # Invoke scheduled jobs concurrently. If all workers are busy
+        # spawning blocks until one of them is released so that we don't
+        # pick up more jobs than we can run.
         for job in captured_jobs:
-            auth_ctx, func, func_args = self._prepare_job(job)
+            self._pool.spawn_n(self._process_store_job, job)
 
-            self._invoke_job(auth_ctx, func, func_args)
+    def _process_store_job(self, scheduled_job):
+        try:
+            auth_ctx, func, func_args = self._prepare_job(scheduled_job)
+        except Exception:
+            # The job stays in the job store and will be captured again
+            # once the captured job timeout elapses.
+            LOG.exception(
+                "Failed to prepare a scheduled job [scheduled_job=%s]",
+                scheduled_job
+            )
+
+            return
+
+        self._invoke_job(auth_ctx, func, func_args)
+
+        # The job is deleted right after it's processed without waiting
+        # for other jobs of the same batch. Otherwise, it would be captured
+        # again and run once more after the captured job timeout elapses.
+        # Jobs processed while the previous ones are being deleted are
+        # deleted together with one query.
+        self._processed_job_ids.append(scheduled_job.id)
+
+        if not self._job_deleter.running():
+            self._job_deleter.spawn_n(self._delete_processed_jobs_loop)
+
+    def _delete_processed_jobs_loop(self):
+        while self._processed_job_ids:
+            if not self._delete_processed_jobs():
+                # The job store checker will try again.
+                return
 
-            self._delete_scheduled_job(job)
+    def _delete_processed_jobs(self):
+        job_ids = self._processed_job_ids
+        self._processed_job_ids = []
+
+        if not job_ids:
+            return True
+
+        try:
+            self._delete_scheduled_jobs(job_ids)
+        except Exception:
+            LOG.exception(
+                "Failed to delete processed scheduled jobs, will try again"
+                " [job_ids=%s]", job_ids
+            )
+
+            self._processed_job_ids.extend(job_ids)
+
+            return False
+
+        return True
 
     def schedule(self, job, allow_redistribute=False):
+        if job.unique and self.has_scheduled_jobs(key=job.key,
+                                                  processing=False):
+            self._deduplicated_cnt += 1
+
+            LOG.debug(
+                "A pending job with the same key already exists, skipping"
+                " [key=%s]", job.key
+            )
+
+            return
+
         scheduled_job = self._persist_job(job)
 
         self._schedule_in_memory(job.run_after, scheduled_job)
 
     def has_scheduled_jobs(self, **filters):
         # Checking in-memory jobs first.
-        for j in self.in_memory_jobs.values():
-            if filters and 'key' in filters and filters['key'] != j.key:
-                continue
+        if filters and 'key' in filters:
+            in_memory_jobs = [
+                self.in_memory_jobs[job_id]
+                for job_id in self._in_memory_job_ids_by_key.get(
+                    filters['key'],
+                    ()
+                )
+            ]
+        else:
+            in_memory_jobs = self.in_memory_jobs.values()
 
+        for j in in_memory_jobs:
             if filters and 'processing' in filters:
                 if filters['processing'] is (j.captured_at is None):
                     continue
@@ -149,6 +286,9 @@ class DefaultScheduler(base.Scheduler):
 
         return db_api.get_scheduled_jobs_count(**filters) > 0
 
+    def get_stats(self):
+        return {'deduplicated_jobs': self._deduplicated_cnt}
+
     @staticmethod
     def _persist_job(job):
         ctx_serializer = context.RpcContextSerializer()
@@ -195,37 +335,98 @@ class DefaultScheduler(base.Scheduler):
         return db_api.create_scheduled_job(values)
 
     def _schedule_in_memory(self, run_after, scheduled_job):
-        green_thread = eventlet.spawn_after(
-            run_after,
-            self._process_memory_job,
-            scheduled_job
+        run_at = time.monotonic() + run_after
+
+        self.in_memory_jobs[scheduled_job.id] = scheduled_job
+        self._in_memory_job_ids_by_key[scheduled_job.key].add(
+            scheduled_job.id
         )
 
-        self.in_memory_jobs[green_thread] = scheduled_job
+        heapq.heappush(
+            self._in_memory_heap,
+            (run_at, next(self._in_memory_seq), scheduled_job.id)
+        )
 
-    def _process_memory_job(self, scheduled_job):
-        # 1. Capture the job in Job Store.
-        if not self._capture_scheduled_job(scheduled_job):
-            LOG.warning(
-                "Unable to capture a scheduled job [scheduled_job=%s]",
-                scheduled_job
-            )
+        # The dispatcher needs to recalculate its delay only if the new
+        # job has to run before all the others.
+        if self._in_memory_heap[0][2] == scheduled_job.id:
+            self._in_memory_wakeup.set()
 
+    def _remove_memory_job(self, scheduled_job):
+        if self.in_memory_jobs.pop(scheduled_job.id, None) is None:
             return
 
-        # 2. Invoke the target function.
-        auth_ctx, func, func_args = self._prepare_job(scheduled_job)
+        job_ids = self._in_memory_job_ids_by_key[scheduled_job.key]
 
-        self._invoke_job(auth_ctx, func, func_args)
+        job_ids.discard(scheduled_job.id)
+
+        if not job_ids:
+            del self._in_memory_job_ids_by_key[scheduled_job.key]
+
+    def _pop_due_memory_jobs(self):
+        """Pops in-memory jobs that are due to run.
+
+        :return: A tuple (jobs, delay) where "jobs" is a list of jobs that
+            need to run now and "delay" is the number of seconds until the
+            next job needs to run or None if there are no more jobs.
+        """
+
+        now = time.monotonic()
+
+        jobs = []
+
+        while self._in_memory_heap:
+            run_at, _, job_id = self._in_memory_heap[0]
 
-        self._delete_scheduled_job(scheduled_job)
+            if job_id not in self.in_memory_jobs:
+                heapq.heappop(self._in_memory_heap)
 
-        # 3. Delete the job from Job Store, if success.
-        # TODO(rakhmerov):
-        # 3.1 What do we do if invocation wasn't successful?
+                continue
+
+            if run_at > now:
+                return jobs, run_at - now
+
+            heapq.heappop(self._in_memory_heap)
+
+            jobs.append(self.in_memory_jobs[job_id])
+
+        return jobs, None
+
+    def _memory_job_dispatcher(self):
+        while not self._stopped:
+            self._in_memory_wakeup.clear()
+
+            jobs, delay = self._pop_due_memory_jobs()
+
+            for job in jobs:
+                eventlet.spawn_n(self._process_memory_job, job)
+
+            if not jobs:
+                self._in_memory_wakeup.wait(delay)
+
+    def _process_memory_job(self, scheduled_job):
+        try:
+            # 1. Capture the job in Job Store.
+            if not self._capture_scheduled_job(scheduled_job):
+                LOG.warning(
+                    "Unable to capture a scheduled job [scheduled_job=%s]",
+                    scheduled_job
+                )
 
-        # Delete from a local collection of in-memory jobs.
-        del self.in_memory_jobs[eventlet.getcurrent()]
+                return
+
+            # 2. Invoke the target function.
+            auth_ctx, func, func_args = self._prepare_job(scheduled_job)
+
+            self._invoke_job(auth_ctx, func, func_args)
+
+            # 3. Delete the job from Job Store, if success.
+            # TODO(rakhmerov):
+            # 3.1 What do we do if invocation wasn't successful?
+            self._delete_scheduled_job(scheduled_job)
+        finally:
+            # Delete from a local collection of in-memory jobs.
+            self._remove_memory_job(scheduled_job)
 
     @staticmethod
     def _capture_scheduled_job(scheduled_job):
@@ -263,6 +464,11 @@ class DefaultScheduler(base.Scheduler):
     def _delete_scheduled_job(self, scheduled_job):
         db_api.delete_scheduled_job(scheduled_job.id)
 
+    @db_utils.retry_on_db_error
+    def _delete_scheduled_jobs(self, job_ids):
+        with db_api.transaction():
+            db_api.delete_scheduled_jobs(id={'in': job_ids})
+
     @staticmethod
     def _prepare_job(scheduled_job):
         """Prepares a scheduled job for invocation.
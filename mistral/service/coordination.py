@@ -139,6 +139,27 @@ class ServiceCoordinator(object):
 
             return []
 
+    def get_member_position(self, group_id):
+        """Gets the position of this member in the coordination group.
+
+        It allows to split some work between the group members. Members
+        are ordered by their IDs so all of them see the same positions.
+
+        ToozError exception must be handled when this function is invoked
+        the same way as for get_members().
+
+        :param group_id: Group ID.
+        :return: Tuple (position, number of members). If the coordination
+            is not active or this member has not joined the group then
+            (0, 1) is returned, i.e. all the work goes to this member.
+        """
+        members = sorted(self.get_members(group_id))
+
+        if self._my_id not in members:
+            return 0, 1
+
+        return members.index(self._my_id), len(members)
+
 
 def cleanup_service_coordinator():
     """Intends to be used by tests to recreate service coordinator."""
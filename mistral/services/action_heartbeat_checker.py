@@ -21,6 +21,7 @@ from mistral.db import utils as db_utils
 from mistral.db.v2 import api as db_api
 from mistral.engine import action_handler
 from mistral.engine import post_tx_queue
+from mistral.workflow import states
 from mistral_lib import actions as mistral_lib
 from mistral_lib import utils
 from oslo_config import cfg
@@ -33,40 +34,78 @@ CONF = cfg.CONF
 _stopped = True
 
 
-@db_utils.retry_on_db_error
-@post_tx_queue.run
 def handle_expired_actions():
     LOG.debug("Running heartbeat checker...")
 
     interval = CONF.action_heartbeat.check_interval
     max_missed = CONF.action_heartbeat.max_missed_heartbeats
+    batch_size = CONF.action_heartbeat.batch_size
 
     exp_date = utils.utc_now_sec() - datetime.timedelta(
         seconds=max_missed * interval
     )
 
+    processed_ids = set()
+
+    # Expired action executions are processed page by page. Only IDs
+    # are selected to find them, full rows are loaded just for the
+    # current page. Processed action executions are not running
+    # anymore so they don't get into the next page.
+    while True:
+        action_ex_ids = _get_expired_action_ex_ids(exp_date, batch_size)
+
+        LOG.debug("Found {} running and expired actions.".format(
+            len(action_ex_ids))
+        )
+
+        # Protect from looping endlessly in case some of the action
+        # executions could not be moved out of the RUNNING state.
+        action_ex_ids = [
+            a_ex_id for a_ex_id in action_ex_ids
+            if a_ex_id not in processed_ids
+        ]
+
+        if not action_ex_ids:
+            break
+
+        _fail_expired_actions(action_ex_ids)
+
+        processed_ids.update(action_ex_ids)
+
+        if not batch_size or len(action_ex_ids) < batch_size:
+            break
+
+
+@db_utils.retry_on_db_error
+def _get_expired_action_ex_ids(exp_date, batch_size):
     with db_api.transaction():
-        action_exs = db_api.get_running_expired_sync_action_executions(
+        return db_api.get_running_expired_sync_action_execution_ids(
             exp_date,
-            CONF.action_heartbeat.batch_size
+            batch_size
         )
 
-        LOG.debug("Found {} running and expired actions.".format(
-            len(action_exs))
-        )
 
-        if action_exs:
-            LOG.info(
-                "Actions executions to transit to error, because "
-                "heartbeat wasn't received: {}".format(action_exs)
-            )
+@db_utils.retry_on_db_error
+@post_tx_queue.run
+def _fail_expired_actions(action_ex_ids):
+    LOG.info(
+        "Actions executions to transit to error, because "
+        "heartbeat wasn't received: {}".format(action_ex_ids)
+    )
+
+    with db_api.transaction():
+        for a_ex_id in action_ex_ids:
+            action_ex = db_api.get_action_execution(a_ex_id, insecure=True)
+
+            # The action may have completed after its ID was selected.
+            if action_ex.state != states.RUNNING:
+                continue
 
-            for action_ex in action_exs:
-                result = mistral_lib.Result(
-                    error="Heartbeat wasn't received."
-                )
+            result = mistral_lib.Result(
+                error="Heartbeat wasn't received."
+            )
 
-                action_handler.on_action_complete(action_ex, result)
+            action_handler.on_action_complete(action_ex, result)
 
 
 def _loop():
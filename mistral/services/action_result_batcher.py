@@ -0,0 +1,203 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import collections
+import threading
+
+import eventlet
+from mistral_lib import actions as mistral_lib
+from oslo_config import cfg
+from oslo_log import log as logging
+
+from mistral import context as auth_ctx
+from mistral import exceptions as exc
+from mistral.rpc import clients as rpc
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+
+_stopped = True
+
+_lock = threading.Lock()
+
+_loop_thread = None
+
+# {security context key => (security context, [(action_ex_id, result)])}.
+# Results are grouped by security context because the engine processes
+# all of the results sent in one RPC call on behalf of one user.
+_pending_results = collections.OrderedDict()
+
+_flush_event = threading.Event()
+
+
+def add_result(action_ex_id, result):
+    """Adds an action result to be sent to the engine with the next batch.
+
+    :param action_ex_id: Action execution id.
+    :param result: Action result.
+    :return: False if batching is disabled and the result has to be sent
+        by the caller, True otherwise.
+    """
+    ctx = auth_ctx.ctx() if auth_ctx.has_ctx() else None
+
+    with _lock:
+        if _stopped:
+            return False
+
+        _, results = _pending_results.setdefault(
+            _get_context_key(ctx),
+            (ctx, [])
+        )
+
+        results.append((action_ex_id, result))
+
+        is_full = len(results) >= CONF.executor.result_batch_size
+
+    if is_full:
+        _flush_event.set()
+
+    return True
+
+
+def _get_context_key(ctx):
+    if ctx is None:
+        return None
+
+    return ctx.project_id, ctx.user_id, ctx.is_admin
+
+
+def send_action_results():
+    with _lock:
+        pending_results = list(_pending_results.values())
+
+        _pending_results.clear()
+
+    batch_size = CONF.executor.result_batch_size
+
+    old_ctx = auth_ctx.ctx() if auth_ctx.has_ctx() else None
+
+    try:
+        for ctx, results in pending_results:
+            auth_ctx.set_ctx(ctx)
+
+            for i in range(0, len(results), batch_size):
+                _send_batch(results[i:i + batch_size])
+    finally:
+        # The caller may be a thread with its own security context,
+        # e.g. when the service is being stopped.
+        auth_ctx.set_ctx(old_ctx)
+
+
+def _send_batch(results):
+    LOG.debug('Sending a batch of action results [size=%s]', len(results))
+
+    try:
+        rpc.get_engine_client().on_actions_complete(results, async_=True)
+    except Exception:
+        LOG.exception(
+            'Failed to send a batch of action results, sending them '
+            'one by one.'
+        )
+
+        for action_ex_id, result in results:
+            _send_result(action_ex_id, result)
+
+
+def _send_result(action_ex_id, result):
+    engine_client = rpc.get_engine_client()
+
+    try:
+        engine_client.on_action_complete(action_ex_id, result, async_=True)
+    except exc.MistralException as e:
+        # The same as in the executor, most likely the result can't be
+        # serialized so we can try to send error info instead.
+        msg = (
+            "Failed to complete action due to a Mistral exception "
+            "[action_ex_id=%s]\n %s" % (action_ex_id, e)
+        )
+
+        LOG.exception(msg)
+
+        engine_client.on_action_complete(
+            action_ex_id,
+            mistral_lib.Result(error=msg)
+        )
+    except Exception as e:
+        LOG.exception(
+            "Failed to complete action due to an unexpected exception "
+            "[action_ex_id=%s]\n %s", action_ex_id, e
+        )
+
+
+def _loop():
+    while not _stopped:
+        _flush_event.wait(CONF.executor.result_batch_interval)
+        _flush_event.clear()
+
+        try:
+            send_action_results()
+        except Exception:
+            LOG.exception(
+                'Action result sender iteration failed'
+                ' due to an unexpected exception.'
+            )
+
+
+def start():
+    global _stopped, _loop_thread
+
+    if not CONF.executor.result_batch_interval:
+        LOG.info("Action result batching is disabled.")
+
+        return
+
+    with _lock:
+        # The engine and the executor may run in the same process and
+        # both of them start the batcher.
+        if not _stopped:
+            return
+
+        _stopped = False
+
+        # Results left by a previous run must not be sent by this one.
+        _pending_results.clear()
+        _flush_event.clear()
+
+    _loop_thread = eventlet.spawn(_loop)
+
+
+def stop(graceful=False):
+    global _stopped, _loop_thread
+
+    with _lock:
+        if _stopped:
+            return
+
+        _stopped = True
+
+    _flush_event.set()
+
+    if _loop_thread:
+        _loop_thread.wait()
+
+        _loop_thread = None
+
+    # Send whatever has been accumulated so far. New results won't be
+    # added anymore, the caller will send them directly.
+    try:
+        send_action_results()
+    except Exception:
+        LOG.exception('Failed to send remaining action results.')
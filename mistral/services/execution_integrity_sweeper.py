@@ -0,0 +1,180 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+import zlib
+
+import eventlet
+from oslo_config import cfg
+from oslo_log import log as logging
+import tooz.coordination
+
+from mistral import context as auth_ctx
+from mistral.db import utils as db_utils
+from mistral.db.v2 import api as db_api
+from mistral.engine import workflow_handler
+from mistral.service import coordination
+from mistral_lib import utils
+
+LOG = logging.getLogger(__name__)
+
+CONF = cfg.CONF
+
+_stopped = True
+
+_cluster_group = None
+
+
+def sweep():
+    """Finds and fixes task executions stuck in RUNNING state.
+
+    Running task executions of all workflow executions are selected page
+    by page with one query per page. Every engine only fixes the task
+    executions of the workflow executions assigned to it.
+    """
+    check_after_seconds = CONF.engine.execution_integrity_check_delay
+
+    if check_after_seconds < 0:
+        # Never check integrity if it's a negative value.
+        return
+
+    LOG.debug("Running execution integrity sweeper...")
+
+    position, members_cnt = _get_member_position()
+
+    updated_before = utils.utc_now_sec() - datetime.timedelta(
+        seconds=check_after_seconds
+    )
+
+    batch_size = CONF.engine.execution_integrity_sweep_batch_size
+
+    marker = None
+
+    while True:
+        rows = _get_stale_running_task_ex_ids(
+            updated_before,
+            batch_size,
+            marker
+        )
+
+        if not rows:
+            break
+
+        marker = rows[-1][0]
+
+        task_ex_ids = [
+            t_ex_id for t_ex_id, wf_ex_id in rows
+            if _get_partition(wf_ex_id, members_cnt) == position
+        ]
+
+        LOG.debug(
+            "Found %s stale running task executions, %s of them are "
+            "assigned to this engine.",
+            len(rows),
+            len(task_ex_ids)
+        )
+
+        if task_ex_ids:
+            _check_and_fix_tasks_integrity(task_ex_ids)
+
+        if len(rows) < batch_size:
+            break
+
+
+def _get_member_position():
+    if not _cluster_group:
+        return 0, 1
+
+    coordinator = coordination.get_service_coordinator()
+
+    try:
+        return coordinator.get_member_position(_cluster_group)
+    except tooz.coordination.ToozError:
+        LOG.exception(
+            "Failed to get members of the engine group, checking all "
+            "workflow executions."
+        )
+
+        return 0, 1
+
+
+def _get_partition(wf_ex_id, members_cnt):
+    # All tasks of one workflow execution go to the same engine.
+    return zlib.crc32(wf_ex_id.encode()) % members_cnt
+
+
+@db_utils.retry_on_db_error
+def _get_stale_running_task_ex_ids(updated_before, batch_size, marker):
+    with db_api.transaction():
+        return db_api.get_stale_running_task_execution_ids(
+            updated_before,
+            batch_size,
+            marker
+        )
+
+
+@db_utils.retry_on_db_error
+def _check_and_fix_tasks_integrity(task_ex_ids):
+    workflow_handler.check_and_fix_tasks_integrity(task_ex_ids)
+
+
+def _loop():
+    # This is an administrative thread so we need to set an admin
+    # security context.
+    auth_ctx.set_ctx(
+        auth_ctx.MistralContext(
+            user=None,
+            tenant=None,
+            auth_token=None,
+            is_admin=True
+        )
+    )
+
+    while not _stopped:
+        try:
+            sweep()
+        except Exception:
+            LOG.exception(
+                'Execution integrity sweeper iteration failed'
+                ' due to an unexpected exception.'
+            )
+
+        eventlet.sleep(CONF.engine.execution_integrity_sweep_interval)
+
+
+def start(cluster_group=None):
+    """Starts the execution integrity sweeper.
+
+    :param cluster_group: Coordination group of the engines that the
+        workflow executions are split between.
+    """
+    interval = CONF.engine.execution_integrity_sweep_interval
+
+    if not interval or CONF.engine.execution_integrity_check_delay < 0:
+        LOG.info("Execution integrity sweeper is disabled.")
+
+        return
+
+    global _stopped, _cluster_group
+
+    _stopped = False
+    _cluster_group = cluster_group
+
+    eventlet.spawn_after(interval, _loop)
+
+
+def stop(graceful=False):
+    global _stopped
+
+    _stopped = True
@@ -108,7 +108,22 @@ class LegacyScheduler(sched_base.Scheduler):
         self._random_delay = conf.random_delay
         self._batch_size = conf.batch_size
 
+        # The number of unique jobs that haven't been scheduled because
+        # a pending job with the same key already existed.
+        self._deduplicated_cnt = 0
+
     def schedule(self, job, allow_redistribute=False):
+        if job.unique and self.has_scheduled_jobs(key=job.key,
+                                                  processing=False):
+            self._deduplicated_cnt += 1
+
+            LOG.debug(
+                "A pending call with the same key already exists, skipping"
+                " [key=%s]", job.key
+            )
+
+            return
+
         _schedule_call(
             job.target_factory_func_name,
             job.func_name,
@@ -121,6 +136,9 @@ class LegacyScheduler(sched_base.Scheduler):
     def has_scheduled_jobs(self, **filters):
         return db_api.get_delayed_calls_count(**filters) > 0
 
+    def get_stats(self):
+        return {'deduplicated_jobs': self._deduplicated_cnt}
+
     def start(self):
         self._thread.start()
 
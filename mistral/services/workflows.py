@@ -18,6 +18,7 @@ from mistral import exceptions as exc
 from mistral.lang import parser as spec_parser
 from mistral import services
 from mistral.utils import safe_yaml
+from mistral.workflow import data_flow
 from mistral.workflow import states
 from mistral_lib import utils
 from oslo_log import log as logging
@@ -180,6 +181,10 @@ def update_workflow_execution_env(wf_ex, env):
 
     wf_ex.params['env'] = utils.merge_dicts(wf_ex.params['env'], env)
 
+    # The environment has been changed in place so the cached view
+    # of it is not valid anymore.
+    data_flow.reset_workflow_environment_dict(wf_ex)
+
     return wf_ex
 
 
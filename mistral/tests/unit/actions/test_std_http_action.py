@@ -13,6 +13,10 @@
 #    limitations under the License.
 
 import json
+import os
+import shutil
+import tempfile
+import time
 from unittest import mock
 
 import requests
@@ -187,3 +191,139 @@ class HTTPActionTest(base.BaseTest):
         result = action.run(mock_ctx)
 
         self.assertIsNone(result['encoding'])
+
+
+class FakeStreamingResponse(base.FakeHTTPResponse):
+    def __init__(self, content, status_code, **kwargs):
+        super(FakeStreamingResponse, self).__init__(
+            None,
+            status_code,
+            **kwargs
+        )
+
+        self._body = content
+        self.closed = False
+
+    def iter_content(self, chunk_size=1):
+        for i in range(0, len(self._body), chunk_size):
+            yield self._body[i:i + chunk_size]
+
+    def close(self):
+        self.closed = True
+
+
+class HTTPActionStreamingTest(base.BaseTest):
+    def setUp(self):
+        super(HTTPActionStreamingTest, self).setUp()
+
+        self.addCleanup(std._HTTP_SESSIONS.clear)
+
+    @mock.patch.object(requests.Session, 'request')
+    def test_http_action_pooled_session(self, mocked_method):
+        self.override_config('http_action_pool_size', 5, 'executor')
+
+        mocked_method.return_value = get_success_fake_response()
+
+        for path in ('/1', '/2'):
+            result = std.HTTPAction(url=URL + path).run(mock.Mock())
+
+            self.assertEqual(DATA, result['content'])
+
+        self.assertEqual(2, mocked_method.call_count)
+
+        # Both requests are sent to the same host so the session is reused.
+        self.assertEqual(1, len(std._HTTP_SESSIONS))
+
+        std.HTTPAction(url='http://another_url').run(mock.Mock())
+
+        self.assertEqual(2, len(std._HTTP_SESSIONS))
+
+    @mock.patch.object(requests, 'request')
+    def test_http_action_max_content_size(self, mocked_method):
+        resp = FakeStreamingResponse(
+            json.dumps(DATA).encode(),
+            200,
+            headers={'Content-Type': 'application/json'}
+        )
+
+        mocked_method.return_value = resp
+
+        action = std.HTTPAction(url=URL, max_content_size=10)
+
+        result = action.run(mock.Mock())
+
+        self.assertEqual(json.dumps(DATA).encode()[:10], result['content'])
+        self.assertTrue(result['content_truncated'])
+        self.assertTrue(resp.closed)
+
+        args, kwargs = mocked_method.call_args
+
+        self.assertTrue(kwargs['stream'])
+
+    @mock.patch.object(requests, 'request')
+    def test_http_action_max_content_size_not_exceeded(self, mocked_method):
+        self.override_config('http_action_max_content_size', 1024, 'executor')
+
+        mocked_method.return_value = FakeStreamingResponse(
+            json.dumps(DATA).encode(),
+            200
+        )
+
+        result = std.HTTPAction(url=URL).run(mock.Mock())
+
+        self.assertEqual(DATA, result['content'])
+        self.assertNotIn('content_truncated', result)
+
+    @mock.patch.object(requests, 'request')
+    def test_http_action_content_to_file(self, mocked_method):
+        content_dir = tempfile.mkdtemp()
+
+        self.addCleanup(shutil.rmtree, content_dir)
+
+        self.override_config(
+            'http_action_content_dir',
+            content_dir,
+            'executor'
+        )
+
+        # An expired file left by a previous action.
+        expired_file = os.path.join(content_dir, 'mistral-http-expired')
+
+        with open(expired_file, 'wb') as f:
+            f.write(b'x')
+
+        expired_time = time.time() - 3601
+
+        os.utime(expired_file, (expired_time, expired_time))
+
+        body = b'x' * (std._CONTENT_CHUNK_SIZE * 2 + 10)
+
+        mocked_method.return_value = FakeStreamingResponse(body, 200)
+
+        action = std.HTTPAction(url=URL, content_to_file=True)
+
+        with mock.patch.object(std, '_content_files_cleanup_time', 0):
+            result = action.run(mock.Mock())
+
+        self.assertIsNone(result['content'])
+        self.assertEqual(len(body), result['content_size'])
+        self.assertEqual(content_dir, os.path.dirname(result['content_file']))
+
+        with open(result['content_file'], 'rb') as f:
+            self.assertEqual(body, f.read())
+
+        self.assertFalse(os.path.exists(expired_file))
+
+    def test_http_session_closed_on_eviction(self):
+        sessions = std._HTTPSessionCache(maxsize=1)
+
+        session1 = mock.Mock()
+        session2 = mock.Mock()
+
+        sessions['key1'] = session1
+        sessions['key2'] = session2
+
+        session1.close.assert_called_once_with()
+        session2.close.assert_not_called()
+
+        self.assertEqual(['key2'], list(sessions.keys()))
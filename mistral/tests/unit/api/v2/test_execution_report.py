@@ -12,6 +12,14 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import sqlalchemy as sa
+
+from mistral.api.controllers import resource
+from mistral.api.controllers.v2 import execution_report
+from mistral.api.controllers.v2 import resources
+from mistral.db.sqlalchemy import base as db_base
+from mistral.db.v2 import api as db_api
+from mistral.db.v2.sqlalchemy import models as db_models
 from mistral.services import workbooks as wb_service
 from mistral.services import workflows as wf_service
 from mistral.tests.unit.api import base
@@ -19,6 +27,119 @@ from mistral.tests.unit.engine import base as engine_base
 from mistral.workflow import states
 
 
+class _QueryCounter(object):
+    """Counts SQL statements sent to the database within its context."""
+
+    def __init__(self):
+        self.count = 0
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+    def __enter__(self):
+        sa.event.listen(
+            db_base.get_engine(),
+            'before_cursor_execute',
+            self._on_execute
+        )
+
+        return self
+
+    def __exit__(self, *args):
+        sa.event.remove(
+            db_base.get_engine(),
+            'before_cursor_execute',
+            self._on_execute
+        )
+
+
+# The functions below build the report loading executions one by one,
+# the way the API did before it switched to execution_report.ExecutionTree.
+# They are used as a reference implementation.
+
+def _analyse_task_execution(task_ex_id, stat, filters, cur_depth):
+    with db_api.transaction():
+        task_ex = db_api.get_task_execution(task_ex_id)
+
+        if filters['errors_only'] and task_ex.state != states.ERROR:
+            return None
+
+        execution_report.update_statistics_with_task(stat, task_ex)
+
+        entry = execution_report.create_task_execution_entry(task_ex)
+
+        child_executions = task_ex.executions
+
+    if 'retry_task_policy' in task_ex.runtime_context:
+        retry_ctx = task_ex.runtime_context['retry_task_policy']
+
+        entry.retry_count = retry_ctx['retry_no']
+
+    entry.action_executions = []
+    entry.workflow_executions = []
+
+    for c_ex in child_executions:
+        if isinstance(c_ex, db_models.ActionExecution):
+            entry.action_executions.append(
+                execution_report.create_action_execution_entry(c_ex)
+            )
+        else:
+            entry.workflow_executions.append(
+                _analyse_workflow_execution(c_ex.id, stat, filters, cur_depth)
+            )
+
+    return entry
+
+
+def _analyse_workflow_execution(wf_ex_id, stat, filters, cur_depth):
+    with db_api.transaction():
+        wf_ex = db_api.get_workflow_execution(wf_ex_id)
+
+        entry = execution_report.create_workflow_execution_entry(wf_ex)
+
+        max_depth = filters['max_depth']
+
+        # Don't get deeper into the workflow task executions if
+        # maximum depth is defined and the current depth exceeds it.
+        if 0 <= max_depth < cur_depth:
+            return entry
+
+        task_execs = wf_ex.task_executions
+
+    entry.task_executions = []
+
+    for t_ex in task_execs:
+        task_exec_entry = _analyse_task_execution(
+            t_ex.id,
+            stat,
+            filters,
+            cur_depth + 1
+        )
+
+        if task_exec_entry:
+            entry.task_executions.append(task_exec_entry)
+
+    return entry
+
+
+def _normalize_report_entry(val):
+    # The implementations may return entries in different order so
+    # all the lists get sorted to compare reports.
+    if isinstance(val, resource.Resource):
+        val = val.to_dict()
+
+    if isinstance(val, dict):
+        return {k: _normalize_report_entry(v) for k, v in val.items()}
+
+    if isinstance(val, list):
+        return sorted(
+            (_normalize_report_entry(v) for v in val),
+            key=lambda d: d['id']
+        )
+
+    return val
+
+
 class TestExecutionReportController(base.APITest, engine_base.EngineTestCase):
     def test_simple_sequence_wf(self):
         wf_text = """---
@@ -550,3 +671,102 @@ class TestExecutionReportController(base.APITest, engine_base.EngineTestCase):
         )
 
         self.assertEqual(3, task2['retry_count'])
+
+    def test_report_matches_legacy_implementation(self):
+        wb_text = """---
+        version: '2.0'
+
+        name: wb
+
+        workflows:
+          parent_wf:
+            tasks:
+              task1:
+                with-items: i in <% range(0, 10) %>
+                workflow: sub_wf
+                on-complete: task2
+
+              task2:
+                action: std.noop
+
+          sub_wf:
+            tasks:
+              task1:
+                with-items: j in <% range(0, 3) %>
+                action: std.noop
+                on-success: task2
+
+              task2:
+                workflow: sub_sub_wf
+
+          sub_sub_wf:
+            tasks:
+              task1:
+                action: std.noop
+                on-success: task2
+
+              task2:
+                action: std.fail
+        """
+
+        wb_service.create_workbook_v2(wb_text)
+
+        wf_ex = self.engine.start_workflow('wb.parent_wf')
+
+        self.await_workflow_error(wf_ex.id)
+
+        with db_api.transaction():
+            sub_wf_ex_id = db_api.get_workflow_executions(
+                workflow_name='wb.sub_wf'
+            )[0].id
+
+        for ex_id in (wf_ex.id, sub_wf_ex_id):
+            for errors_only in (False, True):
+                for max_depth in (-1, 0, 1):
+                    filters = {
+                        'errors_only': errors_only,
+                        'max_depth': max_depth
+                    }
+
+                    self._assert_report_matches_legacy(ex_id, filters)
+
+    def _assert_report_matches_legacy(self, wf_ex_id, filters):
+        legacy_stat = resources.ExecutionReportStatistics()
+        stat = resources.ExecutionReportStatistics()
+        stat_only = resources.ExecutionReportStatistics()
+
+        with _QueryCounter() as legacy_queries:
+            legacy_entry = _analyse_workflow_execution(
+                wf_ex_id,
+                legacy_stat,
+                filters,
+                0
+            )
+
+        with _QueryCounter() as report_queries:
+            entry = execution_report.ExecutionTree(
+                wf_ex_id,
+                filters
+            ).build_report(stat)
+
+        with _QueryCounter() as stat_queries:
+            execution_report.ExecutionTree(
+                wf_ex_id,
+                filters
+            ).build_statistics(stat_only)
+
+        self.assertEqual(
+            _normalize_report_entry(legacy_entry),
+            _normalize_report_entry(entry)
+        )
+        self.assertEqual(legacy_stat.to_dict(), stat.to_dict())
+        self.assertEqual(legacy_stat.to_dict(), stat_only.to_dict())
+
+        # The tree is smaller than one chunk of IDs so the number of
+        # queries doesn't depend on the number of executions: the root
+        # execution, the tree, task and action executions (task counts).
+        self.assertLessEqual(report_queries.count, 4)
+        self.assertLessEqual(stat_queries.count, 3)
+
+        if stat.total_tasks_count:
+            self.assertGreater(legacy_queries.count, stat.total_tasks_count)
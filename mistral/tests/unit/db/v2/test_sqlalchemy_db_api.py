@@ -16,13 +16,19 @@
 
 # TODO(rakhmerov): Add checks for timestamps.
 
+import collections
 import copy
 import datetime
 import time
+from unittest import mock
 
+import eventlet
 from oslo_config import cfg
+from oslo_db import exception as db_exc
 
 from mistral import context as auth_context
+from mistral.db.sqlalchemy import base as db_base
+from mistral.db.sqlalchemy import striped_lock
 from mistral.db.v2.sqlalchemy import api as db_api
 from mistral.db.v2.sqlalchemy import models as db_models
 from mistral import exceptions as exc
@@ -1566,6 +1572,67 @@ class ActionExecutionTest(SQLAlchemyTest):
 
             self.assertIsNot(created_last_heartbeat, fetched_last_heartbeat)
 
+    def test_update_action_executions_heartbeat(self):
+        past = utils.utc_now_sec() - datetime.timedelta(seconds=100)
+
+        with db_api.transaction():
+            created0 = db_api.create_action_execution(
+                dict(ACTION_EXECS[0], last_heartbeat=past)
+            )
+            created1 = db_api.create_action_execution(
+                dict(ACTION_EXECS[1], last_heartbeat=past)
+            )
+
+            cnt = db_api.update_action_executions_heartbeat(
+                [created0.id, created1.id, 'not-existing-id']
+            )
+
+            self.assertEqual(2, cnt)
+
+        with db_api.transaction():
+            for a_ex_id in (created0.id, created1.id):
+                fetched = db_api.get_action_execution(a_ex_id)
+
+                self.assertGreater(fetched.last_heartbeat, past)
+
+    def test_get_running_expired_sync_action_execution_ids(self):
+        now = utils.utc_now_sec()
+
+        def _create(seconds_ago, **kwargs):
+            values = dict(
+                ACTION_EXECS[0],
+                state='RUNNING',
+                is_sync=True,
+                last_heartbeat=now - datetime.timedelta(seconds=seconds_ago)
+            )
+
+            values.update(kwargs)
+
+            return db_api.create_action_execution(values).id
+
+        with db_api.transaction():
+            expired1 = _create(100)
+            expired2 = _create(200)
+
+            _create(1)
+            _create(100, state='SUCCESS')
+            _create(100, is_sync=False)
+
+        exp_date = now - datetime.timedelta(seconds=50)
+
+        # The oldest heartbeats go first.
+        self.assertEqual(
+            [expired2, expired1],
+            db_api.get_running_expired_sync_action_execution_ids(
+                exp_date,
+                None
+            )
+        )
+        self.assertEqual(
+            [expired2],
+            db_api.get_running_expired_sync_action_execution_ids(exp_date, 1)
+        )
+
     def test_get_action_executions(self):
         with db_api.transaction():
             created0 = db_api.create_action_execution(WF_EXECS[0])
@@ -1578,6 +1645,24 @@ class ActionExecutionTest(SQLAlchemyTest):
             self.assertEqual(1, len(fetched))
             self.assertEqual(created0, fetched[0])
 
+    def test_get_action_execution_outputs(self):
+        with db_api.transaction():
+            created0 = db_api.create_action_execution(ACTION_EXECS[0])
+            created1 = db_api.create_action_execution(ACTION_EXECS[1])
+
+            outputs = db_api.get_action_execution_outputs(
+                [created0.id, created1.id, 'not-existing-id']
+            )
+
+        self.assertDictEqual(
+            {
+                created0.id: ACTION_EXECS[0]['output'],
+                created1.id: ACTION_EXECS[1]['output']
+            },
+            outputs
+        )
+        self.assertDictEqual({}, db_api.get_action_execution_outputs([]))
+
     def test_delete_action_execution(self):
         with db_api.transaction():
             created = db_api.create_action_execution(ACTION_EXECS[0])
@@ -2443,6 +2528,75 @@ class TaskExecutionTest(SQLAlchemyTest):
                 )
             )
 
+    def test_get_completed_task_executions_as_batches(self):
+        wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
+
+        created_at = datetime.datetime(2016, 12, 1, 15, 0, 0)
+
+        with db_api.transaction():
+            for i in range(7):
+                values = copy.deepcopy(TASK_EXECS[0])
+                values.update({
+                    'workflow_execution_id': wf_ex.id,
+                    'name': 'task%s' % i,
+                    'state': 'SUCCESS' if i < 5 else 'RUNNING',
+                    # Tasks 1 and 2 are created at the same time.
+                    'created_at': created_at + datetime.timedelta(
+                        seconds=(0, 1, 1, 3, 4, 5, 6)[i]
+                    )
+                })
+
+                db_api.create_task_execution(values)
+
+            batches = list(
+                db_api.get_completed_task_executions_as_batches(
+                    workflow_execution_id=wf_ex.id,
+                    batch_size=2
+                )
+            )
+
+            self.assertEqual([2, 2, 1], [len(b) for b in batches])
+
+            t_execs = [t_ex for b in batches for t_ex in b]
+
+            # Task executions are ordered by creation time and then by ID.
+            self.assertEqual(
+                sorted(t_execs, key=lambda t_ex: (t_ex.created_at, t_ex.id)),
+                t_execs
+            )
+            self.assertEqual(
+                ['task0'],
+                [t_ex.name for t_ex in t_execs[:1]]
+            )
+            self.assertEqual(
+                {'task1', 'task2'},
+                {t_ex.name for t_ex in t_execs[1:3]}
+            )
+            self.assertEqual(
+                ['task3', 'task4'],
+                [t_ex.name for t_ex in t_execs[3:]]
+            )
+
+            # Rows added during the iteration don't shift the results.
+            batches = db_api.get_completed_task_executions_as_batches(
+                workflow_execution_id=wf_ex.id,
+                batch_size=5
+            )
+
+            self.assertEqual(5, len(next(batches)))
+
+            values = copy.deepcopy(TASK_EXECS[0])
+            values.update({
+                'id': '0' * 36,
+                'workflow_execution_id': wf_ex.id,
+                'state': 'SUCCESS',
+                'created_at': created_at
+            })
+
+            db_api.create_task_execution(values)
+
+            self.assertEqual([], list(batches))
+
     def test_task_execution_repr(self):
         wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
 
@@ -2470,6 +2624,86 @@ class TaskExecutionTest(SQLAlchemyTest):
 
         return created0, created1
 
+    @mock.patch.object(db_api, '_TREE_QUERY_CHUNK_SIZE', 1)
+    def test_get_execution_tree(self):
+        with db_api.transaction():
+            root_wf_ex = db_api.create_workflow_execution(WF_EXECS[0])
+
+            values = copy.deepcopy(TASK_EXECS[0])
+            values.update({
+                'workflow_execution_id': root_wf_ex.id,
+                'state': 'ERROR'
+            })
+
+            task_ex = db_api.create_task_execution(values)
+
+            values = copy.deepcopy(WF_EXECS[1])
+            values.update({
+                'task_execution_id': task_ex.id,
+                'root_execution_id': root_wf_ex.id
+            })
+
+            sub_wf_ex = db_api.create_workflow_execution(values)
+
+            for wf_ex_id, state in ((sub_wf_ex.id, 'SUCCESS'),
+                                    (sub_wf_ex.id, 'ERROR')):
+                values = copy.deepcopy(TASK_EXECS[1])
+                values.update({
+                    'workflow_execution_id': wf_ex_id,
+                    'state': state
+                })
+
+                sub_task_ex = db_api.create_task_execution(values)
+
+            db_api.create_action_execution({
+                'name': 'std.noop',
+                'task_execution_id': sub_task_ex.id
+            })
+
+            # Unrelated workflow execution.
+            db_api.create_workflow_execution(WF_EXECS[1])
+
+        tree = db_api.get_workflow_execution_tree(
+            root_wf_ex.id,
+            fields=('name',)
+        )
+
+        self.assertEqual(
+            [
+                (root_wf_ex.id, None, None),
+                (sub_wf_ex.id, root_wf_ex.id, 'ERROR')
+            ],
+            [(r.id, r.parent_wf_ex_id, r.parent_task_state) for r in tree]
+        )
+
+        wf_ex_ids = [root_wf_ex.id, sub_wf_ex.id]
+
+        self.assertEqual(
+            {'SUCCESS': 1, 'ERROR': 2},
+            db_api.get_task_execution_state_counts(wf_ex_ids)
+        )
+        self.assertEqual(
+            {'ERROR': 2},
+            db_api.get_task_execution_state_counts(wf_ex_ids, state='ERROR')
+        )
+
+        task_exs = db_api.get_task_executions_by_workflow_ids(
+            wf_ex_ids,
+            fields=('id', 'state')
+        )
+
+        self.assertEqual(3, len(task_exs))
+
+        action_exs = db_api.get_action_executions_by_task_ids(
+            [t_ex.id for t_ex in task_exs],
+            fields=('name',)
+        )
+
+        self.assertEqual(
+            [('std.noop', sub_task_ex.id)],
+            [(a.name, a.task_execution_id) for a in action_exs]
+        )
+
 
 CRON_TRIGGERS = [
     {
@@ -3564,6 +3798,188 @@ class LockTest(SQLAlchemyTest):
         # Make sure that outside 'with' section the lock record does not exist.
         self.assertEqual(0, len(db_api.get_named_locks()))
 
+    def test_named_lock_stats(self):
+        db_api.reset_named_lock_stats()
+
+        with db_api.named_lock('lock1'):
+            pass
+
+        with db_api.named_lock('lock1'):
+            pass
+
+        with db_api.named_lock('lock2'):
+            pass
+
+        stats = db_api.get_named_lock_stats('lock1')
+
+        self.assertEqual(2, stats['acquired'])
+        self.assertEqual(0, stats['contended'])
+        self.assertGreaterEqual(stats['wait_time'], stats['max_wait_time'])
+
+        self.assertEqual(3, db_api.get_named_lock_stats()['acquired'])
+        self.assertEqual(0, db_api.get_named_lock_stats('lock3')['acquired'])
+
+    def test_advisory_named_lock_falls_back_to_db(self):
+        self.override_config('named_lock_backend', 'advisory', 'engine')
+
+        with db_api.named_lock('lock1'):
+            # SQLite doesn't support advisory locks.
+            self.assertEqual(1, len(db_api.get_named_locks()))
+
+        self.assertEqual(0, len(db_api.get_named_locks()))
+
+    @mock.patch.object(db_base, 'get_dialect_name', return_value='mysql')
+    def test_mysql_advisory_lock_released_when_tx_ends(self, _):
+        # MySQL named locks are emulated with SQLite functions registered
+        # only on the connection used by the transaction, so the locks
+        # can't be released by any other connection.
+        locks = collections.Counter()
+
+        def _get_lock(name, timeout):
+            locks[name] += 1
+
+            return 1
+
+        def _release_lock(name):
+            if not locks[name]:
+                return None
+
+            locks[name] -= 1
+
+            return 1
+
+        def _register_functions(session):
+            dbapi_conn = session.connection().connection.connection
+
+            dbapi_conn.create_function('GET_LOCK', 2, _get_lock)
+            dbapi_conn.create_function('RELEASE_LOCK', 1, _release_lock)
+
+            self.addCleanup(dbapi_conn.create_function, 'GET_LOCK', 2, None)
+            self.addCleanup(
+                dbapi_conn.create_function,
+                'RELEASE_LOCK',
+                1,
+                None
+            )
+
+        with db_api.transaction():
+            _register_functions(db_base._get_thread_local_session())
+
+            # Taking the same name twice within one transaction.
+            db_api._acquire_advisory_named_lock('lock1')
+            db_api._acquire_advisory_named_lock('lock1')
+            db_api._acquire_advisory_named_lock('lock2')
+
+            self.assertEqual(3, sum(locks.values()))
+
+        self.assertEqual(0, sum(locks.values()))
+
+        # The locks are also released if the transaction is rolled back.
+        def _lock_and_fail():
+            with db_api.transaction():
+                _register_functions(db_base._get_thread_local_session())
+
+                db_api._acquire_advisory_named_lock('lock1')
+
+                self.assertEqual(1, sum(locks.values()))
+
+                raise RuntimeError('Rollback')
+
+        self.assertRaises(RuntimeError, _lock_and_fail)
+
+        self.assertEqual(0, sum(locks.values()))
+
+    def test_local_named_lock(self):
+        self.override_config('named_lock_backend', 'local', 'engine')
+        self.override_config('named_lock_stripes', 2, 'engine')
+
+        db_api.reset_named_lock_stats()
+
+        holders = []
+        entered = []
+
+        def _lock(name):
+            with db_api.transaction():
+                with db_api.named_lock(name):
+                    entered.append(name)
+                    holders.append(name)
+
+                    eventlet.sleep(0.01)
+
+                    self.assertEqual(1, len(holders))
+
+                    holders.remove(name)
+
+        threads = [eventlet.spawn(_lock, 'lock1') for _ in range(5)]
+
+        [t.wait() for t in threads]
+
+        self.assertEqual(5, len(entered))
+
+        # Local locks don't write anything to the database.
+        self.assertEqual(0, len(db_api.get_named_locks()))
+
+        stats = db_api.get_named_lock_stats('lock1')
+
+        self.assertEqual(5, stats['acquired'])
+        self.assertEqual(4, stats['contended'])
+        self.assertGreater(stats['max_wait_time'], 0)
+
+        # All stripes are released once transactions are over.
+        self.assertEqual({}, striped_lock.get_locks())
+
+    def test_striped_lock_out_of_order_stripe(self):
+        self.addCleanup(striped_lock.cleanup)
+
+        owner1 = object()
+        owner2 = object()
+
+        low = striped_lock.get_stripe('lock4', 2)
+        high = striped_lock.get_stripe('lock1', 2)
+
+        self.assertLess(low, high)
+
+        self.assertFalse(striped_lock.acquire_lock('lock1', owner1, 2))
+        self.assertFalse(striped_lock.acquire_lock('lock4', owner2, 2))
+
+        # Waiting for a stripe with a lower index than the one already
+        # held may lead to a deadlock with "owner2" waiting for "lock1".
+        self.assertRaises(
+            db_exc.DBDeadlock,
+            striped_lock.acquire_lock,
+            'lock4',
+            owner1,
+            2
+        )
+
+        striped_lock.release_locks(owner2)
+
+        # A free stripe can be taken in any order.
+        self.assertFalse(striped_lock.acquire_lock('lock4', owner1, 2))
+
+        self.assertEqual(
+            {low: owner1, high: owner1},
+            striped_lock.get_locks()
+        )
+
+        striped_lock.release_locks(owner1)
+
+        self.assertEqual({}, striped_lock.get_locks())
+
+    def test_local_named_lock_reentrant_stripe(self):
+        self.override_config('named_lock_backend', 'local', 'engine')
+        self.override_config('named_lock_stripes', 1, 'engine')
+
+        with db_api.transaction():
+            with db_api.named_lock('lock1'):
+                # The same stripe must not block its owner.
+                with db_api.named_lock('lock2'):
+                    self.assertEqual(1, len(striped_lock.get_locks()))
+
+            self.assertEqual(1, len(striped_lock.get_locks()))
+
+        self.assertEqual({}, striped_lock.get_locks())
+
     def test_internal_get_direct_subworkflows(self):
         def wex(wex_id, tex_id=None):
             db_api.create_workflow_execution(
@@ -0,0 +1,207 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from unittest import mock
+
+from oslo_config import cfg
+
+from mistral import context as auth_context
+from mistral.db.v2 import api as db_api
+from mistral.rpc import clients as rpc_clients
+from mistral.services import action_result_batcher
+from mistral.services import workflows as wf_service
+from mistral.tests.unit import base as test_base
+from mistral.tests.unit.engine import base
+
+# Use the set_default method to set value otherwise in certain test cases
+# the change in value is not permanent.
+cfg.CONF.set_default('auth_enable', False, group='pecan')
+
+
+WF = """---
+version: '2.0'
+
+wf:
+  input:
+    - items
+
+  tasks:
+    task1:
+      with-items: i in <% $.items %>
+      action: std.noop
+      concurrency: 20
+"""
+
+
+class ActionResultBatchingEngineTest(base.EngineTestCase):
+    def setUp(self):
+        self.override_config('result_batch_interval', 0.05, 'executor')
+        self.override_config('result_batch_size', 10, 'executor')
+
+        super(ActionResultBatchingEngineTest, self).setUp()
+
+        wf_service.create_workflows(WF)
+
+    def _run_workflow(self, items_cnt):
+        wf_ex = self.engine.start_workflow(
+            'wf',
+            wf_input={'items': list(range(items_cnt))}
+        )
+
+        self.await_workflow_success(wf_ex.id, timeout=60)
+
+        with db_api.transaction():
+            task_ex = db_api.get_workflow_execution(
+                wf_ex.id
+            ).task_executions[0]
+
+            self.assertEqual(items_cnt, len(task_ex.executions))
+
+            return {ex.id for ex in task_ex.executions}
+
+    @mock.patch.object(
+        rpc_clients.EngineClient,
+        'on_actions_complete',
+        autospec=True,
+        side_effect=rpc_clients.EngineClient.on_actions_complete
+    )
+    @mock.patch.object(
+        rpc_clients.EngineClient,
+        'on_action_complete',
+        autospec=True,
+        side_effect=rpc_clients.EngineClient.on_action_complete
+    )
+    def test_action_results_sent_in_batches(self, on_action_complete,
+                                            on_actions_complete):
+        action_ex_ids = self._run_workflow(30)
+
+        # Only the results of this workflow are taken into account in
+        # case actions of other tests are still completing.
+        batches = [
+            [r for r in c[0][1] if r[0] in action_ex_ids]
+            for c in on_actions_complete.call_args_list
+        ]
+        batches = [b for b in batches if b]
+
+        # All results have been sent in batches not exceeding the
+        # configured size so it took at least 3 RPC calls but much
+        # fewer than one per result.
+        self.assertGreaterEqual(len(batches), 3)
+        self.assertLess(len(batches), 30)
+        self.assertEqual(30, sum(len(b) for b in batches))
+        self.assertTrue(all(len(b) <= 10 for b in batches))
+
+        on_action_complete.assert_not_called()
+
+
+class ActionResultNoBatchingEngineTest(base.EngineTestCase):
+    def setUp(self):
+        self.override_config('result_batch_interval', 0, 'executor')
+
+        super(ActionResultNoBatchingEngineTest, self).setUp()
+
+        wf_service.create_workflows(WF)
+
+    @mock.patch.object(
+        rpc_clients.EngineClient,
+        'on_actions_complete',
+        autospec=True,
+        side_effect=rpc_clients.EngineClient.on_actions_complete
+    )
+    @mock.patch.object(
+        rpc_clients.EngineClient,
+        'on_action_complete',
+        autospec=True,
+        side_effect=rpc_clients.EngineClient.on_action_complete
+    )
+    def test_action_results_sent_one_by_one(self, on_action_complete,
+                                            on_actions_complete):
+        wf_ex = self.engine.start_workflow(
+            'wf',
+            wf_input={'items': list(range(30))}
+        )
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            action_ex_ids = {
+                ex.id for ex in db_api.get_workflow_execution(
+                    wf_ex.id
+                ).task_executions[0].executions
+            }
+
+        # With batching disabled there's one RPC call per result.
+        self.assertEqual(
+            30,
+            len([
+                c for c in on_action_complete.call_args_list
+                if c[0][1] in action_ex_ids
+            ])
+        )
+
+        on_actions_complete.assert_not_called()
+
+
+class ActionResultBatcherTest(test_base.BaseTest):
+    @mock.patch.object(rpc_clients, 'get_engine_client')
+    def test_send_action_results_restores_context(self, get_engine_client):
+        ctx1 = auth_context.MistralContext(project_id='project1')
+        ctx2 = auth_context.MistralContext(project_id='project2')
+        caller_ctx = auth_context.MistralContext(project_id='caller')
+
+        sent_ctxs = []
+
+        get_engine_client.return_value.on_actions_complete.side_effect = (
+            lambda results, async_: sent_ctxs.append(
+                auth_context.ctx().project_id
+            )
+        )
+
+        for ctx in (ctx1, ctx2):
+            action_result_batcher._pending_results[
+                action_result_batcher._get_context_key(ctx)
+            ] = (ctx, [('action_ex_id', 'result')])
+
+        auth_context.set_ctx(caller_ctx)
+
+        self.addCleanup(auth_context.set_ctx, None)
+
+        action_result_batcher.send_action_results()
+
+        # Each group is sent on behalf of its own user.
+        self.assertEqual(['project1', 'project2'], sent_ctxs)
+
+        # The context of the calling thread is not changed.
+        self.assertIs(caller_ctx, auth_context.ctx())
+
+    @mock.patch.object(action_result_batcher.eventlet, 'spawn')
+    def test_start_resets_state(self, spawn):
+        self.override_config('result_batch_interval', 10, 'executor')
+
+        # A result left by a previous run.
+        action_result_batcher._pending_results[None] = (
+            None,
+            [('action_ex_id', 'result')]
+        )
+
+        action_result_batcher.start()
+
+        self.addCleanup(action_result_batcher.stop)
+
+        # The engine and the executor running in the same process both
+        # start the batcher but only one sending loop must run.
+        action_result_batcher.start()
+
+        self.assertEqual(1, spawn.call_count)
+        self.assertEqual({}, dict(action_result_batcher._pending_results))
@@ -13,8 +13,11 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from unittest import mock
+
 from oslo_config import cfg
 
+from mistral.actions import std_actions
 from mistral.db.v2 import api as db_api
 from mistral.db.v2.sqlalchemy import models
 from mistral import exceptions as exc
@@ -1273,6 +1276,283 @@ class DataFlowEngineTest(engine_test_base.EngineTestCase):
         )
         self.assertEqual('value2', task2.published['res2'])
 
+    def test_join_takes_most_recently_published_value(self):
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          tasks:
+            task0:
+              action: std.noop
+              publish:
+                var: 0
+              on-success:
+                - task1
+                - task2
+
+            task1:
+              action: std.noop
+              publish:
+                var: 1
+              on-success:
+                - task1_1
+
+            task1_1:
+              action: std.noop
+              on-success:
+                - task3
+
+            task2:
+              action: std.noop
+              on-success:
+                - task3
+
+            task3:
+              join: all
+              action: std.noop
+              publish:
+                result: <% $.var %>
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            # Note: We need to reread execution to access related tasks.
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            tasks = wf_ex.task_executions
+
+            task3 = self._assert_single_item(tasks, name='task3')
+
+            # The value published by 'task1' must not be overridden with
+            # the stale value that 'task2' inherited from 'task0'.
+            self.assertDictEqual({'result': 1}, task3.published)
+
+            # Only references to the upstream tasks are stored.
+            self.assertDictEqual({}, task3.in_context)
+            self.assertEqual(2, len(task3.context_layers['refs']))
+
+    def test_task_context_layers_limit(self):
+        self.override_config('max_task_context_layers', 2, 'engine')
+
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.noop
+              publish:
+                var1: 1
+              on-success:
+                - task2
+
+            task2:
+              action: std.noop
+              publish:
+                var2: 2
+              on-success:
+                - task3
+
+            task3:
+              action: std.noop
+              publish:
+                var3: 3
+              on-success:
+                - task4
+
+            task4:
+              action: std.noop
+              publish:
+                result: <% [$.var1, $.var2, $.var3] %>
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            # Note: We need to reread execution to access related tasks.
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            tasks = wf_ex.task_executions
+
+            task2 = self._assert_single_item(tasks, name='task2')
+            task3 = self._assert_single_item(tasks, name='task3')
+            task4 = self._assert_single_item(tasks, name='task4')
+
+            self.assertDictEqual({}, task2.in_context)
+
+            # The context of 'task3' would consist of two layers so
+            # it's stored in full.
+            self.assertDictEqual({'var1': 1, 'var2': 2}, task3.in_context)
+            self.assertEqual([], task3.context_layers['refs'])
+
+            self.assertDictEqual({}, task4.in_context)
+            self.assertDictEqual(
+                {'var1': 1, 'var2': 2, 'var3': 3},
+                data_flow.evaluate_task_inbound_context(task4)
+            )
+            self.assertDictEqual({'result': [1, 2, 3]}, task4.published)
+
+    def test_task_context_materialization_queries(self):
+        self.override_config('max_task_context_layers', 3, 'engine')
+
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.noop
+              publish:
+                var1: 1
+              on-success:
+                - task2
+
+            task2:
+              action: std.noop
+              publish:
+                var2: 2
+              on-success:
+                - task3
+
+            task3:
+              action: std.noop
+              publish:
+                var3: 3
+              on-success:
+                - task4
+
+            task4:
+              action: std.noop
+              publish:
+                var4: 4
+              on-success:
+                - task5
+
+            task5:
+              action: std.noop
+              publish:
+                var5: 5
+              on-success:
+                - task6
+
+            task6:
+              action: std.noop
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        queries_counts = []
+
+        for i in range(1, 7):
+            # A new transaction so that no contexts are memoized.
+            with db_api.transaction():
+                task_ex = db_api.get_task_executions(
+                    workflow_execution_id=wf_ex.id,
+                    name='task%s' % i
+                )[0]
+
+                with mock.patch.object(
+                        db_api,
+                        'get_task_executions',
+                        wraps=db_api.get_task_executions) as get_t_execs:
+                    ctx = data_flow.evaluate_task_inbound_context(task_ex)
+
+                queries_counts.append(get_t_execs.call_count)
+
+                self.assertDictEqual(
+                    {'var%s' % j: j for j in range(1, i)},
+                    ctx
+                )
+
+        # One query per layer and the number of layers is limited so
+        # the context of 'task4' is stored in full.
+        self.assertEqual([0, 1, 2, 0, 1, 2], queries_counts)
+
+    @mock.patch.object(
+        std_actions.EchoAction,
+        'run',
+        mock.MagicMock(
+            side_effect=[
+                exc.ActionException(),  # Mock task1 exception for first run.
+                'Task 1'                # Mock task1 success for rerun.
+            ]
+        )
+    )
+    def test_rerun_keeps_downstream_task_context(self):
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.echo output="Task 1"
+              publish:
+                var: success
+              publish-on-error:
+                var: error
+              on-complete:
+                - task2
+
+            task2:
+              action: std.noop
+              publish:
+                result: <% $.var %>
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        # Start workflow.
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_error(wf_ex.id)
+
+        with db_api.transaction():
+            task1 = db_api.get_task_executions(
+                workflow_execution_id=wf_ex.id,
+                name='task1'
+            )[0]
+
+        self.engine.rerun_workflow(task1.id)
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            # Note: We need to reread execution to access related tasks.
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            task2_execs = [
+                t_ex for t_ex in wf_ex.task_executions if t_ex.name == 'task2'
+            ]
+
+            self.assertEqual(
+                ['error', 'success'],
+                sorted(t_ex.published['result'] for t_ex in task2_execs)
+            )
+
+            # The context of the task that ran before the rerun is
+            # the same as it was when the task ran.
+            for t_ex in task2_execs:
+                self.assertDictEqual(
+                    {'var': t_ex.published['result']},
+                    data_flow.evaluate_task_inbound_context(t_ex)
+                )
+
 
 class DataFlowTest(test_base.BaseTest):
     def test_get_task_execution_result(self):
@@ -22,6 +22,7 @@ from mistral.lang import parser as spec_parser
 from mistral.scheduler import base as sched_base
 from mistral.services import workflows as wf_service
 from mistral.tests.unit.engine import base
+from mistral.workflow import data_flow
 from mistral.workflow import states
 from mistral_lib import actions as ml_actions
 
@@ -967,28 +968,27 @@ class DirectWorkflowEngineTest(base.EngineTestCase):
 
             tasks_execs = wf_ex.task_executions
 
-        task0_ex = self._assert_single_item(tasks_execs, name='task0')
-        task1_1_ex = self._assert_single_item(tasks_execs, name='task1_1')
-        task1_2_ex = self._assert_single_item(tasks_execs, name='task1_2')
-        task2_1_ex = self._assert_single_item(tasks_execs, name='task2_1')
-        task2_2_ex = self._assert_single_item(tasks_execs, name='task2_2')
+            in_contexts = {
+                t_ex.name: data_flow.evaluate_task_inbound_context(t_ex)
+                for t_ex in tasks_execs
+            }
 
-        self.assertDictEqual({}, task0_ex.in_context)
-        self.assertDictEqual({'var0': 'val0'}, task1_1_ex.in_context)
+        self.assertDictEqual({}, in_contexts['task0'])
+        self.assertDictEqual({'var0': 'val0'}, in_contexts['task1_1'])
         self.assertDictEqual(
             {
                 'var0': 'val0',
                 'var1': 'val1'
             },
-            task1_2_ex.in_context
+            in_contexts['task1_2']
         )
-        self.assertDictEqual({'var0': 'val0'}, task2_1_ex.in_context)
+        self.assertDictEqual({'var0': 'val0'}, in_contexts['task2_1'])
         self.assertDictEqual(
             {
                 'var0': 'val0',
                 'var2': 'val2'
             },
-            task2_2_ex.in_context
+            in_contexts['task2_2']
         )
 
     def test_big_on_closures(self):
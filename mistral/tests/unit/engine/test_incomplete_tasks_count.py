@@ -0,0 +1,202 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from unittest import mock
+
+import eventlet
+from oslo_config import cfg
+
+from mistral.db.v2 import api as db_api
+from mistral.engine import workflow_handler as wf_handler
+from mistral.services import workflows as wf_service
+from mistral.tests.unit.engine import base
+from mistral.workflow import states
+from mistral_lib import actions as ml_actions
+
+# Use the set_default method to set value otherwise in certain test cases
+# the change in value is not permanent.
+cfg.CONF.set_default('auth_enable', False, group='pecan')
+
+TASKS_CNT = 30
+
+
+def _get_parallel_wf_text(tasks_cnt, action):
+    tasks = ''.join(
+        """
+    task%s:
+      action: %s
+""" % (i, action) for i in range(tasks_cnt)
+    )
+
+    return """---
+version: '2.0'
+
+wf:
+  tasks:%s
+""" % tasks
+
+
+class IncompleteTasksCountTest(base.EngineTestCase):
+    track_incomplete_tasks = True
+
+    def setUp(self):
+        self.override_config(
+            'track_incomplete_tasks',
+            self.track_incomplete_tasks,
+            'engine'
+        )
+
+        super(IncompleteTasksCountTest, self).setUp()
+
+    def test_task_count_queries(self):
+        wf_service.create_workflows(
+            _get_parallel_wf_text(TASKS_CNT, 'std.async_noop')
+        )
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self._await(
+            lambda: len(
+                db_api.get_action_executions(state=states.RUNNING)
+            ) == TASKS_CNT
+        )
+
+        # Only the queries made by this thread are counted since the
+        # periodic completion check may run at the same time.
+        cur_thread = eventlet.getcurrent()
+        count_query = db_api.get_incomplete_task_executions_count
+        queries = []
+
+        def _count_query(**kwargs):
+            if eventlet.getcurrent() is cur_thread:
+                queries.append(kwargs)
+
+            return count_query(**kwargs)
+
+        with mock.patch.object(
+                db_api,
+                'get_incomplete_task_executions_count',
+                side_effect=_count_query):
+            for _ in range(3):
+                with db_api.transaction():
+                    wf_handler.check_and_complete(wf_ex.id)
+
+        # With the counter of incomplete tasks a check doesn't need to
+        # count task executions while there are incomplete tasks.
+        self.assertEqual(
+            0 if self.track_incomplete_tasks else 3,
+            len(queries)
+        )
+
+        for action_ex in db_api.get_action_executions(state=states.RUNNING):
+            self.engine.on_action_complete(
+                action_ex.id,
+                ml_actions.Result(data='done')
+            )
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            self.assertEqual(TASKS_CNT, len(wf_ex.task_executions))
+
+        self.assertEqual(
+            0 if self.track_incomplete_tasks else None,
+            db_api.get_incomplete_tasks_count(wf_ex.id)
+        )
+
+    def test_failed_and_rerun_tasks(self):
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.fail
+              retry: count=2 delay=0
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_error(wf_ex.id)
+
+        with db_api.transaction():
+            task_ex = db_api.get_workflow_execution(
+                wf_ex.id
+            ).task_executions[0]
+
+            self.assertEqual(states.ERROR, task_ex.state)
+
+        expected = 0 if self.track_incomplete_tasks else None
+
+        self.assertEqual(
+            expected,
+            db_api.get_incomplete_tasks_count(wf_ex.id)
+        )
+
+        # Rerunning the task makes it incomplete again.
+        self.engine.rerun_workflow(task_ex.id)
+
+        self.await_workflow_error(wf_ex.id)
+
+        self.assertEqual(
+            expected,
+            db_api.get_incomplete_tasks_count(wf_ex.id)
+        )
+
+    def test_inconsistent_counter_is_fixed(self):
+        if not self.track_incomplete_tasks:
+            self.skipTest('The counter is not maintained.')
+
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.async_noop
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        with db_api.transaction():
+            task_ex = db_api.get_workflow_execution(
+                wf_ex.id
+            ).task_executions[0]
+
+        self.await_task_running(task_ex.id)
+
+        self.assertEqual(1, db_api.get_incomplete_tasks_count(wf_ex.id))
+
+        db_api.set_incomplete_tasks_count(wf_ex.id, 0)
+
+        with db_api.transaction():
+            wf_handler.check_and_complete(wf_ex.id)
+
+        # The workflow must not complete since the task is still running.
+        self.assertEqual(1, db_api.get_incomplete_tasks_count(wf_ex.id))
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            self.assertEqual(states.RUNNING, wf_ex.state)
+
+
+class IncompleteTasksNoCountTest(IncompleteTasksCountTest):
+    track_incomplete_tasks = False
@@ -12,7 +12,14 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import datetime
+from unittest import mock
+
 from mistral.db.v2 import api as db_api
+from mistral.engine import workflow_handler
+from mistral.scheduler import base as sched_base
+from mistral.service import coordination
+from mistral.services import execution_integrity_sweeper as sweeper
 from mistral.services import workflows as wf_service
 from mistral.tests.unit.engine import base
 from mistral.workflow import states
@@ -85,3 +92,85 @@ class IntegrityCheckTest(base.EngineTestCase):
 
         self.await_task_success(task2_ex.id)
         self.await_workflow_success(wf_ex.id)
+
+
+class IntegritySweeperTest(IntegrityCheckTest):
+    def setUp(self):
+        # The sweeper is started along with the engine so it has to be
+        # enabled before.
+        self.override_config(
+            'execution_integrity_sweep_interval',
+            1,
+            group='engine'
+        )
+
+        super(IntegritySweeperTest, self).setUp()
+
+    @mock.patch.object(sched_base, 'get_system_scheduler')
+    def test_no_integrity_check_jobs(self, get_scheduler):
+        wf_ex = mock.Mock(id='wf_ex_id')
+
+        workflow_handler._schedule_check_and_fix_integrity(wf_ex, delay=10)
+
+        get_scheduler.assert_not_called()
+
+    @mock.patch.object(workflow_handler, 'check_and_fix_tasks_integrity')
+    @mock.patch.object(coordination.ServiceCoordinator, 'get_member_position')
+    def test_partitions(self, get_member_position, check_and_fix):
+        # Stop the background sweeper to call it explicitly.
+        sweeper.stop()
+
+        self.override_config(
+            'execution_integrity_sweep_batch_size',
+            3,
+            'engine'
+        )
+
+        with db_api.transaction():
+            for i in range(10):
+                wf_ex = db_api.create_workflow_execution({
+                    'name': 'wf%s' % i,
+                    'state': states.RUNNING,
+                    'spec': {}
+                })
+
+                db_api.create_task_execution({
+                    'name': 'task',
+                    'state': states.RUNNING,
+                    'workflow_execution_id': wf_ex.id,
+                    'spec': {},
+                    'created_at': datetime.datetime(2020, 1, 1)
+                })
+
+        self.addCleanup(setattr, sweeper, '_cluster_group', None)
+
+        sweeper._cluster_group = 'engine_group'
+
+        checked_ids = []
+
+        for position in range(2):
+            get_member_position.return_value = (position, 2)
+            check_and_fix.reset_mock()
+
+            sweeper.sweep()
+
+            ids = [
+                t_ex_id
+                for c in check_and_fix.call_args_list
+                for t_ex_id in c[0][0]
+            ]
+
+            with db_api.transaction():
+                for t_ex_id in ids:
+                    t_ex = db_api.get_task_execution(t_ex_id)
+
+                    self.assertEqual(
+                        position,
+                        sweeper._get_partition(t_ex.workflow_execution_id, 2)
+                    )
+
+            checked_ids.extend(ids)
+
+        # Every task execution is checked by exactly one engine.
+        self.assertEqual(10, len(checked_ids))
+        self.assertEqual(10, len(set(checked_ids)))
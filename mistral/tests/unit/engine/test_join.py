@@ -1098,6 +1098,55 @@ class JoinEngineTest(base.EngineTestCase):
             join_task.runtime_context.get(key)
         )
 
+    def test_join_state_saved_incrementally(self):
+        wf_text = """---
+        version: '2.0'
+
+        wf:
+          type: direct
+
+          tasks:
+            join_task:
+              join: all
+
+            task1:
+              on-success: join_task
+
+            task2:
+              on-error: join_task
+              action: std.fail
+
+            task3:
+              on-complete: join_task
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            t_execs = wf_ex.task_executions
+
+        task1 = self._assert_single_item(t_execs, name='task1')
+        task2 = self._assert_single_item(t_execs, name='task2')
+        task3 = self._assert_single_item(t_execs, name='task3')
+        join_task = self._assert_single_item(t_execs, name='join_task')
+
+        # Inbound tasks that triggered the join are remembered so that
+        # their executions are not loaded again on the next evaluation.
+        self.assertDictEqual(
+            {
+                'task1': [task1.id, 'on-success'],
+                'task2': [task2.id, 'on-error'],
+                'task3': [task3.id, 'on-complete']
+            },
+            join_task.runtime_context['join_state']
+        )
+
     def test_triggered_by_error(self):
         wf_text = """---
         version: '2.0'
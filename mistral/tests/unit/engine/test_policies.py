@@ -358,7 +358,10 @@ class PoliciesTest(base.EngineTestCase):
 
         self.assertIsInstance(p, policies.RetryPolicy)
         self.assertEqual(5, p.count)
-        self.assertEqual('<% $.my_val = 10 %>', p._break_on_clause)
+        self.assertEqual(
+            '<% $.my_val = 10 %>',
+            p._break_on_clause.get_data()
+        )
 
         p = self._assert_single_item(arr, delay=7)
 
@@ -20,6 +20,7 @@ from oslo_config import cfg
 from mistral.actions import std_actions
 from mistral import config
 from mistral.db.v2 import api as db_api
+from mistral.engine import task_handler
 from mistral import exceptions as exc
 from mistral.services import workbooks as wb_service
 from mistral.services import workflows as wf_service
@@ -578,6 +579,37 @@ class WithItemsEngineTest(base.EngineTestCase):
         # Now we can check order of results explicitly.
         self.assertEqual([1, 2, 3], published['one_two_three'])
 
+    def test_with_items_results_loaded_in_batches(self):
+        self.override_config('with_items_result_batch_size', 2, 'engine')
+
+        wf_text = """---
+        version: "2.0"
+
+        wf:
+          tasks:
+            task1:
+              with-items: i in <% range(0, 5) %>
+              action: std.echo output=<% $.i %>
+              publish:
+                result: <% task().result %>
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            task_ex = wf_ex.task_executions[0]
+
+            result = data_flow.get_task_execution_result(task_ex)
+
+        self.assertListEqual(list(range(5)), result)
+        self.assertListEqual(list(range(5)), task_ex.published['result'])
+
     def test_with_items_results_one_item_as_list(self):
         wb_service.create_workbook_v2(WB)
 
@@ -1406,3 +1438,170 @@ class WithItemsEngineTest(base.EngineTestCase):
         self.assertEqual(states.SUCCESS, task2_ex.state)
 
         self.assertEqual(1, mock_http_action.call_count)
+
+
+class WithItemsCompactStateEngineTest(base.EngineTestCase):
+    def setUp(self):
+        super(WithItemsCompactStateEngineTest, self).setUp()
+
+        self.override_config('with_items_compact_state', True, 'engine')
+
+    def test_with_items_dispatched_in_batches(self):
+        self.override_config('with_items_dispatch_batch_size', 4, 'engine')
+
+        wf_text = """---
+        version: "2.0"
+
+        wf:
+          tasks:
+            task1:
+              with-items: i in <% range(0, 10) %>
+              action: std.echo output=<% $.i %>
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            task_ex = wf_ex.task_executions[0]
+
+            result = data_flow.get_task_execution_result(task_ex)
+
+        self.assertListEqual(list(range(10)), result)
+
+        with_items_ctx = task_ex.runtime_context['with_items']
+
+        self.assertEqual(10, with_items_ctx['count'])
+        self.assertEqual(10, with_items_ctx['completed'])
+        self.assertEqual(10, with_items_ctx['next_index'])
+        self.assertEqual(4, with_items_ctx['capacity'])
+        self.assertEqual(0, with_items_ctx['errors'])
+
+    def test_with_items_concurrency(self):
+        wf_text = """---
+        version: "2.0"
+
+        wf:
+          tasks:
+            task1:
+              with-items: i in <% range(0, 7) %>
+              action: std.echo output=<% $.i %>
+              concurrency: 3
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_success(wf_ex.id)
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            task_ex = wf_ex.task_executions[0]
+
+            result = data_flow.get_task_execution_result(task_ex)
+
+        self.assertListEqual(list(range(7)), result)
+
+        with_items_ctx = task_ex.runtime_context['with_items']
+
+        self.assertEqual(7, with_items_ctx['completed'])
+        self.assertEqual(3, with_items_ctx['capacity'])
+        self.assertEqual(3, with_items_ctx['max_capacity'])
+
+    def test_with_items_fail(self):
+        wf_text = """---
+        version: "2.0"
+
+        wf:
+          tasks:
+            task1:
+              with-items: i in [1, 2, 3]
+              action: std.fail
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        self.await_workflow_error(wf_ex.id)
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            task_ex = wf_ex.task_executions[0]
+
+        self.assertEqual(states.ERROR, task_ex.state)
+
+        with_items_ctx = task_ex.runtime_context['with_items']
+
+        self.assertEqual(3, with_items_ctx['completed'])
+        self.assertEqual(3, with_items_ctx['errors'])
+        self.assertEqual(0, with_items_ctx['cancelled'])
+
+    def test_with_items_iteration_completed_once(self):
+        wf_text = """---
+        version: "2.0"
+
+        wf:
+          tasks:
+            task1:
+              with-items: i in [1, 2, 3]
+              action: std.async_noop
+        """
+
+        wf_service.create_workflows(wf_text)
+
+        wf_ex = self.engine.start_workflow('wf')
+
+        with db_api.transaction():
+            wf_ex = db_api.get_workflow_execution(wf_ex.id)
+
+            task_ex = wf_ex.task_executions[0]
+
+            action_ex_ids = [ex.id for ex in task_ex.executions]
+
+        self.assertEqual(3, len(action_ex_ids))
+
+        task_ex_id = task_ex.id
+
+        def _get_with_items_ctx():
+            with db_api.transaction():
+                task_ex = db_api.get_task_execution(task_ex_id)
+
+                return task_ex.runtime_context['with_items']
+
+        self.engine.on_action_complete(
+            action_ex_ids[0],
+            actions_base.Result(data=1)
+        )
+
+        self._await(lambda: _get_with_items_ctx()['completed'] == 1)
+
+        # Process the completion of the same action execution again
+        # like a scheduled job that runs once more would do.
+        task_handler._scheduled_on_action_complete(action_ex_ids[0], False)
+
+        with_items_ctx = _get_with_items_ctx()
+
+        self.assertEqual(1, with_items_ctx['completed'])
+        self.assertEqual(
+            with_items_ctx['max_capacity'] - 2,
+            with_items_ctx['capacity']
+        )
+
+        for action_ex_id in action_ex_ids[1:]:
+            self.engine.on_action_complete(
+                action_ex_id,
+                actions_base.Result(data=1)
+            )
+
+        self.await_workflow_success(wf_ex.id)
+
+        self.assertEqual(3, _get_with_items_ctx()['completed'])
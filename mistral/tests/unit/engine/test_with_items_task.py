@@ -61,3 +61,38 @@ class WithItemsTaskTest(base.BaseTest):
         indexes = task._get_next_indexes()
 
         self.assertListEqual([2, 3, 4], indexes)
+
+    def test_get_next_indices_compact(self):
+        # Task execution for running 6 items with concurrency=3 where
+        # item 2 needs to run again and items 0, 1 and 3 have completed.
+        task_ex = models.TaskExecution(
+            spec={
+                'action': 'myaction'
+            },
+            runtime_context={
+                'with_items': {
+                    'capacity': 3,
+                    'max_capacity': 3,
+                    'count': 6,
+                    'next_index': 4,
+                    'retry_indexes': [2],
+                    'completed': 3,
+                    'errors': 0,
+                    'cancelled': 0
+                }
+            },
+            action_executions=[],
+            workflow_executions=[]
+        )
+
+        task = tasks.WithItemsTask(None, None, None, {}, task_ex)
+
+        self.assertListEqual([2, 4, 5], task._get_next_indexes())
+
+        task._on_iterations_dispatched([2, 4, 5])
+
+        with_items_ctx = task_ex.runtime_context['with_items']
+
+        self.assertListEqual([], with_items_ctx['retry_indexes'])
+        self.assertEqual(6, with_items_ctx['next_index'])
+        self.assertFalse(task._has_more_iterations())
@@ -0,0 +1,98 @@
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from mistral.expressions import base as expr_base
+from mistral.expressions import jinja_expression
+from mistral.expressions import yaql_expression
+from mistral.tests.unit import base
+
+
+class ExpressionCacheTest(base.BaseTest):
+    def setUp(self):
+        super(ExpressionCacheTest, self).setUp()
+
+        expr_base.clear_expression_cache()
+
+        self.addCleanup(expr_base.clear_expression_cache)
+
+    def test_hits_misses_evictions(self):
+        cache = expr_base.ExpressionCache(2)
+
+        self.assertEqual(1, cache.get('a', lambda: 1))
+        self.assertEqual(1, cache.get('a', lambda: 2))
+        self.assertEqual(2, cache.get('b', lambda: 2))
+        self.assertEqual(3, cache.get('c', lambda: 3))
+
+        self.assertDictEqual(
+            {
+                'size': 2,
+                'maxsize': 2,
+                'hits': 1,
+                'misses': 3,
+                'evictions': 1
+            },
+            cache.get_stats()
+        )
+
+        # 'a' was the least recently used item.
+        self.assertEqual(4, cache.get('a', lambda: 4))
+
+    def test_disabled_cache(self):
+        cache = expr_base.ExpressionCache(0)
+
+        self.assertEqual(1, cache.get('a', lambda: 1))
+        self.assertEqual(2, cache.get('a', lambda: 2))
+
+        stats = cache.get_stats()
+
+        self.assertEqual(0, stats['size'])
+        self.assertEqual(0, stats['hits'])
+        self.assertEqual(2, stats['misses'])
+
+    def test_yaql_expression_is_parsed_once(self):
+        evaluator = yaql_expression.InlineYAQLEvaluator
+
+        for i in range(5):
+            self.assertEqual(
+                i + 1,
+                evaluator.evaluate('<% $.a + 1 %>', {'a': i})
+            )
+
+        stats = expr_base.get_expression_cache_stats()
+
+        self.assertEqual(1, stats['misses'])
+        self.assertEqual(4, stats['hits'])
+
+    def test_jinja_expression_is_compiled_once(self):
+        evaluator = jinja_expression.InlineJinjaEvaluator
+
+        for i in range(5):
+            self.assertEqual(
+                i + 1,
+                evaluator.evaluate('{{ _.a + 1 }}', {'a': i})
+            )
+            self.assertEqual(
+                'Value: %s' % i,
+                evaluator.evaluate('Value: {{ _.a }}', {'a': i})
+            )
+
+        stats = expr_base.get_expression_cache_stats()
+
+        self.assertEqual(2, stats['misses'])
+        self.assertEqual(8, stats['hits'])
+
+    def test_cache_size_from_config(self):
+        self.override_config('expression_cache_size', 7, 'engine')
+
+        expr_base.clear_expression_cache()
+
+        self.assertEqual(7, expr_base.get_expression_cache_stats()['maxsize'])
@@ -20,11 +20,13 @@ import sys
 from unittest import mock
 import warnings
 
+from yaql.language import utils as yaql_utils
 
 from mistral.config import cfg
 from mistral import exceptions as exc
 from mistral.expressions import yaql_expression as expr
 from mistral.tests.unit import base
+from mistral.workflow import data_flow
 from mistral_lib import utils
 
 
@@ -257,6 +259,47 @@ class YaqlEvaluatorTest(base.BaseTest):
 
         self.assertEqual(ctx['__env'], self._evaluator.evaluate('env()', ctx))
 
+    def test_lazy_data_conversion(self):
+        def _converted_values(convert_mock):
+            # Nested values are converted by recursive calls that pass
+            # the conversion function as the second argument.
+            return [c[0][0] for c in convert_mock.call_args_list
+                    if len(c[0]) == 1]
+
+        immutable = expr.ImmutableData({'a': [1, 2], 'b': {'c': 'd'}})
+
+        ctx = data_flow.ContextView({'x': {'y': [3]}}, immutable)
+
+        with mock.patch.object(
+                yaql_utils,
+                'convert_input_data',
+                wraps=yaql_utils.convert_input_data) as convert:
+            self.assertEqual(3, self._evaluator.evaluate('$.x.y[0]', ctx))
+
+            # Only the value read by the expression has been converted.
+            self.assertEqual([{'y': [3]}], _converted_values(convert))
+
+            convert.reset_mock()
+
+            for _ in range(3):
+                self.assertEqual(
+                    [1, 2],
+                    self._evaluator.evaluate('$.a', ctx)
+                )
+
+            # Conversion of immutable data is done only once.
+            self.assertEqual([[1, 2]], _converted_values(convert))
+
+        self.assertEqual(
+            {'x': {'y': [3]}, 'a': [1, 2], 'b': {'c': 'd'}},
+            self._evaluator.evaluate('$', ctx)
+        )
+        self.assertEqual(3, self._evaluator.evaluate('len($)', ctx))
+        self.assertEqual(
+            ['a', 'b', 'x'],
+            self._evaluator.evaluate('$.keys().orderBy($)', ctx)
+        )
+
 
 class InlineYAQLEvaluatorTest(base.BaseTest):
     def setUp(self):
@@ -238,6 +238,123 @@ class SpecificationCachingTest(base.DbTestCase):
 
         self.assertEqual(2, len(wf_spec_by_exec_id.get_tasks()))
 
+    def test_spec_shared_between_caches(self):
+        wf_text = """
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.echo output="Echo"
+        """
+
+        wf_def = wf_service.create_workflows(wf_text)[0]
+
+        wf_spec = spec_parser.get_workflow_spec_by_definition_id(
+            wf_def.id,
+            wf_def.updated_at
+        )
+
+        with db_api.transaction():
+            wf_ex = db_api.create_workflow_execution({
+                'id': '1-2-3-4',
+                'name': 'wf',
+                'workflow_id': wf_def.id,
+                'spec': wf_spec.to_dict(),
+                'state': states.RUNNING
+            })
+
+            # The specification of the same definition version must not
+            # be parsed again.
+            wf_spec_by_exec_id = spec_parser.get_workflow_spec_by_execution_id(
+                wf_ex.id
+            )
+
+        self.assertIs(wf_spec, wf_spec_by_exec_id)
+
+        stats = spec_parser.get_spec_cache_stats()
+
+        self.assertEqual(1, stats['definition']['parse_count'])
+        self.assertEqual(0, stats['execution']['parse_count'])
+        self.assertEqual(1, stats['execution']['misses'])
+
+        spec_parser.get_workflow_spec_by_execution_id(wf_ex.id)
+
+        stats = spec_parser.get_spec_cache_stats()
+
+        self.assertEqual(1, stats['execution']['hits'])
+        self.assertEqual(0.5, stats['execution']['hit_rate'])
+
+    def test_cache_size_from_config(self):
+        self.override_config('workflow_spec_cache_size', 2, 'engine')
+
+        spec_parser.clear_caches()
+
+        wf_text = """
+        version: '2.0'
+
+        wf%s:
+          tasks:
+            task1:
+              action: std.echo output="Echo"
+        """
+
+        for i in range(3):
+            wf_def = wf_service.create_workflows(wf_text % i)[0]
+
+            spec_parser.get_workflow_spec_by_definition_id(
+                wf_def.id,
+                wf_def.updated_at
+            )
+
+        stats = spec_parser.get_spec_cache_stats()['definition']
+
+        self.assertEqual(2, stats['size'])
+        self.assertEqual(2, stats['maxsize'])
+        self.assertEqual(1, stats['evictions'])
+        self.assertEqual(3, stats['parse_count'])
+
+    def test_cache_max_memory_from_config(self):
+        self.override_config('workflow_spec_cache_max_memory', 1, 'engine')
+
+        spec_parser.clear_caches()
+
+        wf_text = """
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.echo output="%s"
+        """
+
+        # The specification is bigger than the whole cache.
+        wf_def = wf_service.create_workflows(wf_text % ('x' * 2048))[0]
+
+        spec_parser.get_workflow_spec_by_definition_id(
+            wf_def.id,
+            wf_def.updated_at
+        )
+
+        self.assertEqual(0, spec_parser.get_wf_definition_spec_cache_size())
+        self.assertEqual(
+            0,
+            spec_parser.get_spec_cache_stats()['definition']['estimated_size']
+        )
+
+        wf_def = wf_service.update_workflows(wf_text % 'x')[0]
+
+        spec_parser.get_workflow_spec_by_definition_id(
+            wf_def.id,
+            wf_def.updated_at
+        )
+
+        stats = spec_parser.get_spec_cache_stats()['definition']
+
+        self.assertEqual(1, stats['size'])
+        self.assertGreater(stats['estimated_size'], 0)
+        self.assertLessEqual(stats['estimated_size'], 1024)
+
 
 class SpecificationCachingEngineTest(engine_base.EngineTestCase):
     def test_cache_workflow_spec_no_duplicates(self):
@@ -14,8 +14,10 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from mistral.lang import parser as spec_parser
 from mistral.lang.v2 import workflows
 from mistral.tests.unit.lang.v2 import base as v2_base
+from mistral.workflow import states
 from mistral_lib import utils
 
 
@@ -721,3 +723,68 @@ class TaskSpecValidationTest(v2_base.WorkflowSpecValidationTestCase):
                 changes=overlay,
                 expect_error=expect_error
             )
+
+    def test_evaluation_plans(self):
+        wf_text = """
+        version: '2.0'
+
+        wf:
+          tasks:
+            task1:
+              action: std.echo output=<% $.out %>
+              input:
+                static: {k1: v1, k2: [1, 2, 3]}
+              timeout: <% $.timeout %>
+              publish:
+                res: <% task().result %>
+                const: value
+              on-success:
+                - task2: <% $.go %>
+                - fail msg=<% $.msg %>
+
+            task2:
+              action: std.noop
+        """
+
+        wf_spec = spec_parser.get_workflow_list_spec_from_yaml(
+            wf_text
+        ).get_workflows()[0]
+
+        task_spec = wf_spec.get_task('task1')
+
+        ctx = {
+            'out': 'hello',
+            'timeout': 10,
+            'go': False,
+            'msg': 'failed',
+            '__task_execution': {'id': '123', 'name': 'task1'}
+        }
+
+        input_plan = task_spec.get_input_plan()
+
+        # Plans are built only once per specification object.
+        self.assertIs(input_plan, task_spec.get_input_plan())
+
+        res = input_plan.evaluate(ctx, copy_on_write=True)
+
+        self.assertEqual('hello', res['output'])
+        self.assertIs(task_spec.get_input()['static'], res['static'])
+        self.assertEqual('<% $.out %>', task_spec.get_input()['output'])
+
+        self.assertEqual(
+            10,
+            task_spec.get_policies().get_timeout_plan().evaluate(ctx)
+        )
+
+        publish_spec = task_spec.get_publish(states.SUCCESS)
+
+        self.assertIs(publish_spec, task_spec.get_publish(states.SUCCESS))
+        self.assertTrue(publish_spec.get_branch_plan().has_expressions())
+        self.assertIsNone(publish_spec.get_global_plan().evaluate(ctx))
+
+        clause = wf_spec.get_on_success_clause_plans('task1')
+
+        self.assertEqual(['task2', 'fail'], [name for name, _, _ in clause])
+        self.assertFalse(clause[0][1].evaluate(ctx))
+        self.assertDictEqual({'msg': 'failed'}, clause[1][2].evaluate(ctx))
+        self.assertEqual('', clause[1][1].get_data())
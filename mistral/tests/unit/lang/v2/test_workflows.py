@@ -59,6 +59,89 @@ class WorkflowSpecValidationTest(base.WorkflowSpecValidationTestCase):
         self.assertEqual('test', wfs_spec.get_workflows()[0].get_name())
         self.assertEqual('direct', wfs_spec.get_workflows()[0].get_type())
 
+    def test_direct_workflow_ancestor_task_names(self):
+        overlay = {'test': {'type': 'direct', 'tasks': {}}}
+
+        utils.merge_dicts(
+            overlay['test']['tasks'],
+            {
+                'get': {'on-success': ['echo']},
+                'echo': {'on-success': ['email']},
+                'email': {'join': 'all'}
+            }
+        )
+
+        wfs_spec = self._parse_dsl_spec(
+            add_tasks=True,
+            changes=overlay,
+            expect_error=False
+        )
+
+        wf_spec = wfs_spec.get_workflows()[0]
+
+        email_spec = wf_spec.get_tasks()['email']
+
+        self.assertSetEqual(
+            {'get', 'echo'},
+            wf_spec.find_ancestor_task_names(email_spec, 5)
+        )
+
+        # Tasks found at the max depth are not searched further.
+        self.assertSetEqual(
+            {'echo'},
+            wf_spec.find_ancestor_task_names(email_spec, 2)
+        )
+
+    def test_direct_workflow_task_graph_indexes(self):
+        overlay = {'test': {'type': 'direct', 'tasks': {}}}
+
+        utils.merge_dicts(
+            overlay['test']['tasks'],
+            {
+                'get': {'on-success': ['echo'], 'on-error': ['email']},
+                'echo': {'on-complete': ['email']},
+                'email': {'join': 'all'}
+            }
+        )
+
+        wfs_spec = self._parse_dsl_spec(
+            add_tasks=True,
+            changes=overlay,
+            expect_error=False
+        )
+
+        wf_spec = wfs_spec.get_workflows()[0]
+
+        tasks = wf_spec.get_tasks()
+
+        self.assertListEqual(
+            [tasks['get']],
+            wf_spec.find_start_tasks()
+        )
+        self.assertSetEqual(
+            {'echo', 'email'},
+            wf_spec.find_outbound_task_names('get')
+        )
+        self.assertTrue(wf_spec.transition_exists('echo', 'email'))
+        self.assertFalse(wf_spec.transition_exists('email', 'get'))
+
+        self.assertSetEqual(
+            {'get', 'echo'},
+            set(
+                t_s.get_name()
+                for t_s in wf_spec.find_inbound_task_specs(tasks['email'])
+            )
+        )
+        self.assertListEqual(
+            [],
+            wf_spec.find_outbound_task_specs(tasks['email'])
+        )
+
+        # Modifying a returned set must not affect the index.
+        wf_spec.find_outbound_task_names('get').clear()
+
+        self.assertTrue(wf_spec.transition_exists('get', 'echo'))
+
     def test_direct_workflow_invalid_task(self):
         overlay = {
             'test': {
@@ -0,0 +1,195 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from http import server as http_server
+import json
+import threading
+
+from mistral import context
+from mistral.notifiers import base as notif
+from mistral.notifiers import notification_queue
+from mistral.notifiers.publishers import webhook
+from mistral.tests.unit import base
+
+
+class _StubHandler(http_server.BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+
+        body = json.loads(self.rfile.read(length))
+
+        stub = self.server.stub
+
+        stub.requests.append(body)
+
+        code = stub.codes.pop(0) if stub.codes else 200
+
+        self.send_response(code)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def log_message(self, *args):
+        pass
+
+
+class _HTTPStub(object):
+    """Local HTTP server recording bodies of the received requests."""
+
+    def __init__(self, codes=None):
+        self.requests = []
+
+        # Response codes to return, 200 is returned once they run out.
+        self.codes = list(codes or [])
+
+        self._server = http_server.ThreadingHTTPServer(
+            ('127.0.0.1', 0),
+            _StubHandler
+        )
+        self._server.daemon_threads = True
+        self._server.stub = self
+
+        self.url = 'http://127.0.0.1:%s/' % self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class NotificationQueueTest(base.BaseTest):
+    def setUp(self):
+        super(NotificationQueueTest, self).setUp()
+
+        self.override_config('max_retries', 2, 'notifier')
+        self.override_config('retry_delay', 0, 'notifier')
+        self.override_config('batch_interval', 60, 'notifier')
+
+        self.ctx = context.MistralContext(project_id='project')
+
+        self.addCleanup(notif.cleanup)
+
+    def _start_stub(self, codes=None):
+        stub = _HTTPStub(codes)
+
+        self.addCleanup(stub.stop)
+
+        return stub
+
+    def _create_queue(self, queue_size=100):
+        q = notification_queue.NotificationQueue(queue_size, 2)
+
+        self.addCleanup(q.stop)
+
+        return q
+
+    def _put(self, q, params, idx=0):
+        q.put(
+            self.ctx,
+            'webhook',
+            params,
+            'ex_id%s' % idx,
+            {'id': 'ex_id%s' % idx, 'event': 'TASK_SUCCEEDED'},
+            'TASK_SUCCEEDED',
+            None
+        )
+
+    def test_webhook_reuses_session(self):
+        stub = self._start_stub()
+
+        publisher = webhook.WebhookPublisher()
+
+        publisher.publish(self.ctx, 'id', {'key': 'val1'}, 'event', None,
+                          url=stub.url)
+        publisher.publish(self.ctx, 'id', {'key': 'val2'}, 'event', None,
+                          url=stub.url + 'path')
+
+        self.assertEqual([{'key': 'val1'}, {'key': 'val2'}], stub.requests)
+        self.assertEqual(1, len(publisher._sessions))
+
+    def test_deliver_with_retries(self):
+        stub = self._start_stub(codes=[500])
+
+        q = self._create_queue()
+
+        self._put(q, {'url': stub.url})
+
+        self._await(lambda: q.get_stats()['delivered'] == 1)
+
+        stats = q.get_stats()
+
+        self.assertEqual(1, stats['retried'])
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(2, len(stub.requests))
+        self.assertEqual([], q.get_dead_letters())
+
+    def test_dead_letters(self):
+        stub = self._start_stub(codes=[500, 500, 500])
+
+        q = self._create_queue()
+
+        self._put(q, {'url': stub.url})
+
+        self._await(lambda: q.get_stats()['failed'] == 1)
+
+        dead_letters = q.get_dead_letters()
+
+        self.assertEqual(1, len(dead_letters))
+        self.assertEqual('ex_id0', dead_letters[0]['ex_id'])
+        self.assertEqual(stub.url, dead_letters[0]['params']['url'])
+        self.assertEqual(3, len(stub.requests))
+
+    def test_batching(self):
+        stub = self._start_stub()
+
+        q = self._create_queue()
+
+        params = {'url': stub.url, 'batch_size': 3}
+
+        for i in range(4):
+            self._put(q, params, i)
+
+        self._await(
+            lambda: q.get_stats()['delivered'] == 3 and q._batches
+        )
+
+        # The fourth notification waits for its batch to be filled.
+        self.assertEqual(1, q.get_stats()['queue_depth'])
+
+        q.flush_batches()
+
+        self.assertEqual(4, q.get_stats()['delivered'])
+        self.assertEqual(
+            [['ex_id0', 'ex_id1', 'ex_id2'], ['ex_id3']],
+            [[d['id'] for d in req] for req in stub.requests]
+        )
+
+    def test_queue_full(self):
+        stub = self._start_stub()
+
+        q = self._create_queue(queue_size=1)
+
+        # Workers don't get a chance to take notifications from the queue
+        # in between because there's no context switch.
+        self._put(q, {'url': stub.url}, 0)
+        self._put(q, {'url': stub.url}, 1)
+
+        self.assertEqual(1, q.get_stats()['dropped'])
+        self.assertEqual('ex_id1', q.get_dead_letters()[0]['ex_id'])
+
+        self._await(lambda: q.get_stats()['delivered'] == 1)
@@ -280,6 +280,71 @@ class KombuServerTest(base.KombuTestCase):
             correlation_id
         )
 
+    def test_run_with_configured_prefetch_count(self):
+        self.override_config('kombu_prefetch_count', 10)
+
+        server = kombu_server.KombuRPCServer(self.conf)
+
+        acquire_mock = mock.MagicMock()
+        acquire_mock.drain_events.side_effect = TestException()
+        fake_kombu.connection.acquire.return_value = acquire_mock
+
+        consumer_mock = mock.MagicMock()
+        acquire_mock.Consumer.return_value.__enter__.return_value = (
+            consumer_mock
+        )
+
+        self.assertRaises(TestException, server._run, 'blocking')
+
+        consumer_mock.qos.assert_called_once_with(prefetch_count=10)
+
+    def test_wait_for_capacity(self):
+        self.server._max_in_flight = 2
+
+        self.server._in_flight = 1
+        self.assertTrue(self.server._wait_for_capacity(timeout=0))
+
+        self.server._in_flight = 2
+        self.assertFalse(self.server._wait_for_capacity(timeout=0))
+
+    @mock.patch.object(kombu_server.KombuRPCServer, '_on_message_safe')
+    def test_process_message_method_concurrency(self, on_message_safe):
+        self.server._method_limits = {'start_workflow': 1}
+        self.server._worker = mock.MagicMock()
+
+        submit = self.server._worker.submit
+
+        request1 = {'rpc_method': 'start_workflow'}
+        request2 = {'rpc_method': 'start_workflow'}
+        request3 = {'rpc_method': 'on_action_complete'}
+
+        self.server._process_message(request1, mock.MagicMock())
+        self.server._process_message(request2, mock.MagicMock())
+        self.server._process_message(request3, mock.MagicMock())
+
+        # The second "start_workflow" call waits for the first one.
+        self.assertEqual(2, submit.call_count)
+        self.assertEqual(3, self.server.get_stats()['in_flight'])
+        self.assertEqual(3, self.server.get_stats()['queue_depth'])
+
+        self.server._handle_message(*submit.call_args_list[0][0][1:])
+
+        self.assertEqual(3, submit.call_count)
+        self.assertIs(request2, submit.call_args_list[2][0][2])
+
+        self.server._handle_message(*submit.call_args_list[1][0][1:])
+        self.server._handle_message(*submit.call_args_list[2][0][1:])
+
+        self.assertEqual(3, on_message_safe.call_count)
+
+        stats = self.server.get_stats()
+
+        self.assertEqual(0, stats['in_flight'])
+        self.assertEqual(0, stats['queue_depth'])
+        self.assertEqual(2, stats['methods']['start_workflow']['calls'])
+        self.assertEqual(1, stats['methods']['on_action_complete']['calls'])
+        self.assertEqual(0, self.server._running_by_method['start_workflow'])
+
     def test__prepare_worker(self):
         self.server._prepare_worker('blocking')
         self.assertEqual(
@@ -0,0 +1,65 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+from unittest import mock
+
+from mistral.rpc import base as rpc_base
+from mistral.rpc import clients as rpc_clients
+from mistral.tests.unit import base
+from mistral_lib import utils
+
+
+class RPCBaseTest(base.BaseTest):
+    def test_pack_unpack_uuids(self):
+        ids = [utils.generate_unicode_uuid() for _ in range(10)]
+
+        packed = rpc_base.pack_uuids(ids)
+
+        self.assertLess(len(packed), len(''.join(ids)))
+        self.assertEqual(ids, rpc_base.unpack_uuids(packed))
+
+        self.assertEqual('', rpc_base.pack_uuids([]))
+        self.assertEqual([], rpc_base.unpack_uuids(''))
+
+    def test_pack_uuids_not_canonical(self):
+        uuid_ = utils.generate_unicode_uuid()
+
+        self.assertIsNone(rpc_base.pack_uuids([uuid_, 'not-uuid']))
+        self.assertIsNone(rpc_base.pack_uuids([uuid_.upper()]))
+        self.assertIsNone(rpc_base.pack_uuids([None]))
+
+    @mock.patch('mistral.context.ctx', mock.MagicMock())
+    def test_process_action_heartbeats_packing(self):
+        client = rpc_clients.EngineClient.__new__(rpc_clients.EngineClient)
+        client._client = mock.MagicMock()
+
+        ids = [utils.generate_unicode_uuid() for _ in range(3)]
+
+        # Packing is disabled by default for compatibility with engines
+        # that don't accept packed IDs.
+        client.process_action_heartbeats(ids)
+
+        self.assertEqual(
+            ids,
+            client._client.async_call.call_args[1]['action_ex_ids']
+        )
+
+        self.override_config('pack_action_ids', True, 'action_heartbeat')
+
+        client.process_action_heartbeats(ids)
+
+        self.assertEqual(
+            rpc_base.pack_uuids(ids),
+            client._client.async_call.call_args[1]['action_ex_ids']
+        )
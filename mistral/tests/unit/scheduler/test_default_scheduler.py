@@ -206,3 +206,201 @@ class DefaultSchedulerTest(base.DbTestCase):
             datetime.datetime.utcnow() - before_ts >=
             datetime.timedelta(seconds=3)
         )
+
+    @mock.patch(TARGET_METHOD_PATH)
+    def test_process_store_jobs_concurrently(self, method):
+        started = []
+        all_started = event.Event()
+
+        def _target_method(*args, **kwargs):
+            started.append(kwargs['id'])
+
+            if len(started) == 2:
+                all_started.send()
+
+            self.target_mtd_lock.acquire()
+
+        method.side_effect = _target_method
+
+        self.override_config('pickup_job_after', 1, 'scheduler')
+
+        for i in range(2):
+            db_api.create_scheduled_job({
+                'run_after': 1,
+                'func_name': TARGET_METHOD_PATH,
+                'func_args': {'name': 'task', 'id': str(i)},
+                'execute_at': datetime.datetime.utcnow(),
+                'captured_at': None,
+                'auth_ctx': {}
+            })
+
+        # Both jobs must be running at the same time.
+        all_started.wait()
+
+        self.assertEqual(2, len(db_api.get_scheduled_jobs()))
+
+        self._unlock_target_method()
+        self._unlock_target_method()
+
+        # Processed jobs get deleted.
+        self._await(lambda: not db_api.get_scheduled_jobs())
+
+        self.assertEqual(2, method.call_count)
+
+    @mock.patch(TARGET_METHOD_PATH)
+    def test_job_deleted_once_processed(self, method):
+        self.scheduler.stop(graceful=True)
+
+        slow_job_released = event.Event()
+
+        def _target_method(*args, **kwargs):
+            if kwargs['id'] == '0':
+                slow_job_released.wait()
+
+        method.side_effect = _target_method
+
+        # The jobs are eligible for picking up from the job store.
+        execute_at = datetime.datetime.utcnow() - datetime.timedelta(
+            seconds=CONF.scheduler.pickup_job_after + 1
+        )
+
+        for i in range(3):
+            db_api.create_scheduled_job({
+                'run_after': 0,
+                'func_name': TARGET_METHOD_PATH,
+                'func_args': {'name': 'task', 'id': str(i)},
+                'execute_at': execute_at,
+                'captured_at': None,
+                'auth_ctx': {}
+            })
+
+        scheduler = default_scheduler.DefaultScheduler(CONF.scheduler)
+
+        scheduler._process_store_jobs()
+
+        # The processed jobs must be deleted without waiting for the slow
+        # job of the same batch and for the next iteration of the job
+        # store checker.
+        self._await(lambda: len(db_api.get_scheduled_jobs()) == 1)
+
+        self.assertEqual(
+            '0',
+            db_api.get_scheduled_jobs()[0].func_args['id']
+        )
+
+        slow_job_released.send()
+
+        scheduler._pool.waitall()
+        scheduler._job_deleter.waitall()
+
+        self.assertEqual(3, method.call_count)
+        self.assertEqual(0, len(db_api.get_scheduled_jobs()))
+        self.assertEqual([], scheduler._processed_job_ids)
+
+    def test_adaptive_delay(self):
+        self.override_config('random_delay', 0, 'scheduler')
+        self.override_config('batch_size', 10, 'scheduler')
+
+        scheduler = default_scheduler.DefaultScheduler(CONF.scheduler)
+
+        self.assertEqual(1, scheduler._get_delay())
+
+        scheduler._captured_cnt = 5
+
+        self.assertEqual(0.5, scheduler._get_delay())
+
+        # The batch was full so the job store needs to be checked again
+        # right away.
+        scheduler._captured_cnt = 10
+
+        self.assertEqual(0, scheduler._get_delay())
+
+    @mock.patch(TARGET_METHOD_PATH)
+    def test_in_memory_jobs_order_and_key_index(self, method):
+        called = []
+
+        method.side_effect = lambda *args, **kwargs: called.append(
+            kwargs['id']
+        )
+
+        # The job scheduled last must run first.
+        for i, run_after in enumerate((2, 1)):
+            self.scheduler.schedule(
+                scheduler_base.SchedulerJob(
+                    run_after=run_after,
+                    func_name=TARGET_METHOD_PATH,
+                    func_args={'name': 'task', 'id': str(i)},
+                    key='key-%s' % i
+                )
+            )
+
+        self.assertEqual(2, len(self.scheduler.in_memory_jobs))
+        self.assertTrue(self.scheduler.has_scheduled_jobs(key='key-0'))
+        self.assertTrue(self.scheduler.has_scheduled_jobs(key='key-1'))
+
+        self._await(lambda: len(called) == 2)
+
+        self.assertListEqual(['1', '0'], called)
+
+        self._await(lambda: not self.scheduler.in_memory_jobs)
+
+        self.assertFalse(self.scheduler.has_scheduled_jobs(key='key-0'))
+        self.assertFalse(self.scheduler.has_scheduled_jobs(key='key-1'))
+        self.assertEqual(0, len(self.scheduler._in_memory_job_ids_by_key))
+
+    @mock.patch(TARGET_METHOD_PATH)
+    def test_unique_jobs_deduplicated(self, method):
+        called = []
+
+        method.side_effect = lambda *args, **kwargs: called.append(
+            kwargs['id']
+        )
+
+        for i in range(5):
+            self.scheduler.schedule(
+                scheduler_base.SchedulerJob(
+                    run_after=1,
+                    func_name=TARGET_METHOD_PATH,
+                    func_args={'name': 'task', 'id': str(i)},
+                    key='unique-key',
+                    unique=True
+                )
+            )
+
+        self.assertEqual(1, len(self.scheduler.in_memory_jobs))
+        self.assertEqual(1, len(db_api.get_scheduled_jobs()))
+        self.assertEqual(
+            {'deduplicated_jobs': 4},
+            self.scheduler.get_stats()
+        )
+
+        self._await(lambda: not self.scheduler.in_memory_jobs)
+
+        self.assertListEqual(['0'], called)
+
+        # Once the pending job has been processed a new one can be
+        # scheduled again.
+        self.scheduler.schedule(
+            scheduler_base.SchedulerJob(
+                func_name=TARGET_METHOD_PATH,
+                func_args={'name': 'task', 'id': '5'},
+                key='unique-key',
+                unique=True
+            )
+        )
+
+        self._await(lambda: len(called) == 2)
+
+        self.assertListEqual(['0', '5'], called)
+        self.assertEqual(
+            {'deduplicated_jobs': 4},
+            self.scheduler.get_stats()
+        )
+
+    def test_unique_job_requires_key(self):
+        self.assertRaises(
+            RuntimeError,
+            scheduler_base.SchedulerJob,
+            func_name=TARGET_METHOD_PATH,
+            unique=True
+        )
@@ -344,6 +344,32 @@ class LegacySchedulerTest(base.DbTestCase):
         db_api.get_delayed_call(calls[0].id)
         db_api.delete_delayed_call(calls[0].id)
 
+    @mock.patch(TARGET_METHOD_PATH)
+    def test_scheduler_unique_calls_deduplicated(self, method):
+        method.side_effect = self.target_method
+
+        for i in range(3):
+            job = sched_base.SchedulerJob(
+                run_after=DELAY,
+                func_name=TARGET_METHOD_PATH,
+                func_args={'name': 'task', 'id': i},
+                key='unique-key',
+                unique=True
+            )
+
+            self.scheduler.schedule(job)
+
+        calls = db_api.get_delayed_calls_to_start(get_time_delay())
+
+        self._assert_single_item(calls, key='unique-key')
+
+        self.assertEqual(
+            {'deduplicated_jobs': 2},
+            self.scheduler.get_stats()
+        )
+
+        self.queue.get()
+
     def test_scheduler_with_custom_batch_size(self):
         self.scheduler.stop()
 
@@ -16,6 +16,8 @@
 
 from mistral import exceptions as exc
 from mistral import expressions as expr
+from mistral.expressions import jinja_expression as jinja_expr
+from mistral.expressions import yaql_expression as yaql_expr
 from mistral.tests.unit import base
 
 DATA = {
@@ -143,6 +145,92 @@ class ExpressionsTest(base.BaseTest):
             applied
         )
 
+    def test_find_expressions(self):
+        yaql_evaluator = yaql_expr.InlineYAQLEvaluator
+        jinja_evaluator = jinja_expr.InlineJinjaEvaluator
+
+        self.assertDictEqual({}, expr.find_expressions('just a string'))
+        self.assertDictEqual({}, expr.find_expressions(42))
+        self.assertDictEqual(
+            {},
+            expr.find_expressions({'a': [1, 'b'], 'c': {}})
+        )
+        self.assertIs(yaql_evaluator, expr.find_expressions('<% $.a %>'))
+        self.assertIs(jinja_evaluator, expr.find_expressions('{{ _.a }}'))
+
+        data = {
+            'static': {'k': 'v'},
+            'token': '<% $.auth_token %>',
+            'urls': ['a', '/servers/{{ _.project_id }}'],
+            'nested': {'k1': 'v1', 'k2': {'k3': '<% $.project_id %>'}}
+        }
+
+        self.assertDictEqual(
+            {
+                'token': yaql_evaluator,
+                'urls': {1: jinja_evaluator},
+                'nested': {'k2': {'k3': yaql_evaluator}}
+            },
+            expr.find_expressions(data)
+        )
+
+    def test_evaluate_recursively_copy_on_write(self):
+        context = {
+            "auth_token": "123",
+            "project_id": "mistral"
+        }
+
+        data = {
+            'static': {'k': ['v1', 'v2']},
+            'token': '<% $.auth_token %>',
+            'urls': ['a', '/servers/{{ _.project_id }}'],
+            'nested': {'k1': {'k': 'v'}, 'k2': {'k3': '<% $.project_id %>'}}
+        }
+
+        res = expr.evaluate_recursively(data, context, copy_on_write=True)
+
+        self.assertDictEqual(
+            {
+                'static': {'k': ['v1', 'v2']},
+                'token': '123',
+                'urls': ['a', '/servers/mistral'],
+                'nested': {'k1': {'k': 'v'}, 'k2': {'k3': 'mistral'}}
+            },
+            res
+        )
+
+        # The original data must stay untouched.
+        self.assertEqual('<% $.auth_token %>', data['token'])
+        self.assertEqual('<% $.project_id %>', data['nested']['k2']['k3'])
+
+        # Only containers with expressions must be copied.
+        self.assertIsNot(data, res)
+        self.assertIsNot(data['urls'], res['urls'])
+        self.assertIsNot(data['nested'], res['nested'])
+        self.assertIs(data['static'], res['static'])
+        self.assertIs(data['nested']['k1'], res['nested']['k1'])
+
+        # Data without expressions is not copied at all.
+        static_data = {'a': {'b': [1, 2, 3]}}
+
+        self.assertIs(
+            static_data,
+            expr.evaluate_recursively(static_data, context, copy_on_write=True)
+        )
+
+    def test_evaluate_recursively_copy_on_write_with_map(self):
+        data = {'a': '<% $.a %>', 'b': '<% $.b %>'}
+
+        # The given map must be used instead of scanning the data.
+        res = expr.evaluate_recursively(
+            data,
+            {'a': 1, 'b': 2},
+            copy_on_write=True,
+            expr_map={'a': yaql_expr.InlineYAQLEvaluator}
+        )
+
+        self.assertDictEqual({'a': 1, 'b': '<% $.b %>'}, res)
+
     def test_evaluate_recursively_environment(self):
         environment = {
             'host': 'vm1234.example.com',
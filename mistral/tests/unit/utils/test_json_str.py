@@ -0,0 +1,94 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+import datetime
+from unittest import mock
+
+from sqlalchemy.ext import mutable
+
+from mistral.tests.unit import base
+from mistral import utils
+from mistral.workflow import data_flow
+
+
+class JsonStrTest(base.BaseTest):
+    def test_native_types_bypass_to_primitive(self):
+        data = {
+            'str': 'value',
+            'int': 1,
+            'float': 1.5,
+            'bool': True,
+            'none': None,
+            'list': [1, {'a': [2, 3]}],
+            'tuple': (1, 2)
+        }
+
+        with mock.patch.object(utils, '_to_primitive_json_str') as m:
+            json_str = utils.to_json_str(data)
+
+        m.assert_not_called()
+
+        self.assertEqual(utils._to_primitive_json_str(data), json_str)
+
+    def test_mutable_dict_bypasses_to_primitive(self):
+        data = mutable.MutableDict({'a': mutable.MutableDict({'b': 1})})
+
+        with mock.patch.object(utils, '_to_primitive_json_str') as m:
+            self.assertEqual('{"a": {"b": 1}}', utils.to_json_str(data))
+
+        m.assert_not_called()
+
+    def test_non_native_types_fall_back_to_primitive(self):
+        def _gen():
+            yield 1
+            yield 2
+
+        data = {
+            'date': datetime.datetime(2020, 1, 1),
+            'gen': _gen()
+        }
+
+        self.assertEqual(
+            '{"date": "2020-01-01T00:00:00.000000", "gen": [1, 2]}',
+            utils.to_json_str(data)
+        )
+
+    def test_context_view_falls_back_to_primitive(self):
+        # The "json" lib would serialize a context view into "{}"
+        # because its own dict storage is empty.
+        data = {'ctx': data_flow.ContextView({'k1': 'v1'}, {'k2': 'v2'})}
+
+        self.assertDictEqual(
+            {'ctx': {'k1': 'v1', 'k2': 'v2'}},
+            utils.from_json_str(utils.to_json_str(data))
+        )
+
+    def test_from_json_str_trivial_values(self):
+        self.assertIsNone(utils.from_json_str(None))
+        self.assertIsNone(utils.from_json_str('null'))
+        self.assertListEqual([], utils.from_json_str('[]'))
+
+        d = utils.from_json_str('{}')
+
+        self.assertDictEqual({}, d)
+
+        # Every call must return a new object.
+        d['k'] = 'v'
+
+        self.assertDictEqual({}, utils.from_json_str('{}'))
+
+        self.assertDictEqual(
+            {'k': [1, 2]},
+            utils.from_json_str('{"k": [1, 2]}')
+        )
@@ -12,6 +12,8 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+from unittest import mock
+
 from mistral.db.v2 import api as db_api
 from mistral.db.v2.sqlalchemy import models
 from mistral import exceptions as exc
@@ -146,3 +148,127 @@ class ReverseWorkflowControllerTest(base.DbTestCase):
             task1_ex.processed = True
 
             self.assertEqual(0, len(cmds))
+
+    def test_task_plan_is_cached(self):
+        wf_spec = self.wb_spec.get_workflows().get('wf')
+
+        plan = wf_spec.get_task_plan('task2')
+
+        self.assertEqual(
+            ['task1', 'task2'],
+            [t_s.get_name() for t_s in plan]
+        )
+        self.assertIs(plan, wf_spec.get_task_plan('task2'))
+        self.assertEqual(
+            ['task1'],
+            [t_s.get_name() for t_s in wf_spec.get_task_plan('task1')]
+        )
+
+
+class LargeReverseWorkflowControllerTest(base.DbTestCase):
+    # Every task requires all the tasks of the previous layer.
+    LAYERS = 5
+    LAYER_SIZE = 10
+
+    def setUp(self):
+        super(LargeReverseWorkflowControllerTest, self).setUp()
+
+        tasks = {}
+
+        for layer in range(self.LAYERS):
+            for i in range(self.LAYER_SIZE):
+                task = {'action': 'std.noop'}
+
+                if layer > 0:
+                    task['requires'] = [
+                        self._task_name(layer - 1, j)
+                        for j in range(self.LAYER_SIZE)
+                    ]
+
+                tasks[self._task_name(layer, i)] = task
+
+        tasks['target'] = {
+            'action': 'std.noop',
+            'requires': [
+                self._task_name(self.LAYERS - 1, j)
+                for j in range(self.LAYER_SIZE)
+            ]
+        }
+
+        self.wf_spec = spec_parser.get_workflow_spec(
+            {'version': '2.0', 'type': 'reverse', 'name': 'wf',
+             'tasks': tasks}
+        )
+
+        with db_api.transaction():
+            self.wf_ex = db_api.create_workflow_execution({
+                'id': '1-2-3-4',
+                'spec': self.wf_spec.to_dict(),
+                'state': states.RUNNING,
+                'params': {'task_name': 'target'}
+            })
+
+    @staticmethod
+    def _task_name(layer, idx):
+        return 'task_%s_%s' % (layer, idx)
+
+    def _complete_layer(self, layer):
+        for i in range(self.LAYER_SIZE):
+            db_api.create_task_execution({
+                'name': self._task_name(layer, i),
+                'spec': {},
+                'state': states.SUCCESS,
+                'workflow_execution_id': self.wf_ex.id
+            })
+
+    def _get_next_task_names(self):
+        wf_ctrl = reverse_wf.ReverseWorkflowController(
+            self.wf_ex,
+            self.wf_spec
+        )
+
+        with mock.patch.object(
+                db_api,
+                'get_task_executions',
+                wraps=db_api.get_task_executions) as get_task_executions:
+            task_specs = wf_ctrl._find_task_specs_with_satisfied_dependencies()
+
+        # One query per continuation regardless of the number of tasks.
+        self.assertEqual(1, get_task_executions.call_count)
+
+        return sorted(t_s.get_name() for t_s in task_specs)
+
+    def test_find_tasks_with_satisfied_dependencies(self):
+        with db_api.transaction():
+            self.assertEqual(
+                sorted(self._task_name(0, i) for i in range(self.LAYER_SIZE)),
+                self._get_next_task_names()
+            )
+
+            for layer in range(self.LAYERS):
+                self._complete_layer(layer)
+
+                expected = (
+                    [
+                        self._task_name(layer + 1, i)
+                        for i in range(self.LAYER_SIZE)
+                    ]
+                    if layer + 1 < self.LAYERS else ['target']
+                )
+
+                self.assertEqual(sorted(expected), self._get_next_task_names())
+
+    def test_task_plan_order(self):
+        plan = [
+            t_s.get_name() for t_s in self.wf_spec.get_task_plan('target')
+        ]
+
+        self.assertEqual(self.LAYERS * self.LAYER_SIZE + 1, len(plan))
+        self.assertEqual('target', plan[-1])
+
+        positions = {t_name: i for i, t_name in enumerate(plan)}
+
+        for t_name in plan:
+            for req in self.wf_spec.get_task_requires(
+                    self.wf_spec.get_tasks()[t_name]):
+                self.assertLess(positions[req], positions[t_name])
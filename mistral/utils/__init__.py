@@ -16,6 +16,7 @@
 
 import contextlib
 import inspect
+import json
 import os
 import shutil
 import tempfile
@@ -33,6 +34,17 @@ from mistral import expressions as expr
 # Thread local storage.
 _th_loc_storage = threading.local()
 
+# Types of values that the "json" lib serializes as is.
+_JSON_SCALAR_TYPES = frozenset((str, int, float, bool, type(None)))
+
+# JSON strings that are stored very often and are cheaper to construct
+# than to parse, e.g. empty "published" or "params" columns.
+_TRIVIAL_JSON_VALUES = {
+    '{}': dict,
+    '[]': list,
+    'null': lambda: None
+}
+
 
 @contextlib.contextmanager
 def tempdir(**kwargs):
@@ -106,6 +118,10 @@ def generate_key_pair(key_length=2048):
 def to_json_str(obj):
     """Serializes an object into a JSON string.
 
+    Object graphs consisting of JSON-native types only are serialized
+    directly by the "json" lib. All others are converted into primitives
+    first, which is much slower because it walks the whole object graph.
+
     :param obj: Object to serialize.
     :return: JSON string.
     """
@@ -113,6 +129,54 @@ def to_json_str(obj):
     if obj is None:
         return None
 
+    try:
+        json_str = json.dumps(obj)
+    except (TypeError, ValueError):
+        # The object graph contains values of types unknown to the
+        # "json" lib, e.g. generators or custom classes.
+        json_str = None
+
+    # NOTE: the "json" lib doesn't respect overridden methods of
+    # subclasses of dict and list, e.g. it serializes an instance
+    # of ContextView into "{}". Such objects have to be converted
+    # into primitives too.
+    if json_str is not None and _has_only_native_containers(obj):
+        return json_str
+
+    return _to_primitive_json_str(obj)
+
+
+def _has_only_native_containers(obj):
+    stack = [obj]
+
+    while stack:
+        val = stack.pop()
+
+        val_type = type(val)
+
+        if val_type in _JSON_SCALAR_TYPES:
+            continue
+
+        if val_type is dict:
+            stack.extend(val.values())
+        elif val_type is list or val_type is tuple:
+            stack.extend(val)
+        elif isinstance(val, dict) and val_type.items is dict.items:
+            # E.g. MutableDict that stores items as a regular dict.
+            stack.extend(val.values())
+        elif isinstance(val, list) and val_type.__iter__ is list.__iter__:
+            stack.extend(val)
+        elif not isinstance(val, (dict, list, tuple)):
+            # Subclasses of scalar types, they have already been
+            # serialized successfully.
+            continue
+        else:
+            return False
+
+    return True
+
+
+def _to_primitive_json_str(obj):
     def _fallback(value):
         if inspect.isgenerator(value):
             result = list(value)
@@ -149,6 +213,11 @@ def from_json_str(json_str):
     if json_str is None:
         return None
 
+    factory = _TRIVIAL_JSON_VALUES.get(json_str)
+
+    if factory:
+        return factory()
+
     return jsonutils.loads(json_str)
 
 
@@ -15,6 +15,7 @@
 
 from mistral.lang import parser as spec_parser
 from mistral.lang.v2 import workflows
+from mistral.workflow import data_flow
 from mistral.workflow import states
 
 
@@ -111,7 +112,7 @@ class RunExistingTask(WorkflowCommand):
             wf_ex,
             wf_spec,
             spec_parser.get_task_spec(task_ex.spec),
-            task_ex.in_context,
+            data_flow.evaluate_task_inbound_context(task_ex),
             triggered_by=triggered_by,
             handles_error=handles_error
         )
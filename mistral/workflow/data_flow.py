@@ -13,14 +13,17 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
+import copy
+
 from oslo_config import cfg
 from oslo_log import log as logging
 from osprofiler import profiler
 
 from mistral import context as auth_ctx
+from mistral.db.v2 import api as db_api
 from mistral.db.v2.sqlalchemy import models
 from mistral import exceptions as exc
-from mistral import expressions as expr
+from mistral.expressions import yaql_expression as yaql_expr
 from mistral.lang import parser as spec_parser
 from mistral.workflow import states
 from mistral_lib import utils
@@ -129,23 +132,364 @@ class ContextView(dict):
         )
 
 
+class LayeredContext(dict):
+    """Materialized task inbound context that knows its layers.
+
+    Task inbound context consists of the outbound contexts of upstream
+    tasks. Every outbound context, in turn, is the inbound context of
+    the task plus the variables published by it. So instead of storing
+    a full copy of the context for every task execution it's enough to
+    store references to the upstream task executions and materialize
+    the context on demand.
+
+    :param data: Materialized context values.
+    :param refs: IDs of the upstream task executions.
+    :param depth: Depth of the layer that will be created for a task
+        receiving the context. It's used as a version of the values
+        published by the task.
+    :param hops: Number of layers that need to be walked through in
+        order to materialize the context from the nearest layer stored
+        in full.
+    :param versions: Versions of the context values,
+        {key: (version, origin)}.
+    """
+
+    def __init__(self, data, refs, depth, hops, versions):
+        super(LayeredContext, self).__init__(data)
+
+        self.refs = refs
+        self.depth = depth
+        self.hops = hops
+        self.versions = versions
+
+
+class _ContextResolver(object):
+    """Materializes task contexts stored as chains of layers.
+
+    Every value of a materialized context is accompanied by its version
+    and origin. Versions grow along the layer chain so that merging
+    contexts of parallel branches takes the most recently published
+    value of a variable instead of a stale value inherited from a common
+    ancestor. A value coming to a join from several branches with the
+    same origin is taken only once.
+    """
+
+    def __init__(self):
+        self._in_progress = set()
+        self._truncated = False
+
+    def _load(self, task_ex_ids):
+        # Task executions are usually already in the session so it's
+        # cheap. Query them in one go if not.
+        t_execs = {
+            t_ex.id: t_ex
+            for t_ex in db_api.get_task_executions(id={'in': task_ex_ids})
+        }
+
+        missing_ids = [t_id for t_id in task_ex_ids if t_id not in t_execs]
+
+        if missing_ids:
+            LOG.warning(
+                "Task executions referenced by context layers are not found,"
+                " the materialized context may be incomplete"
+                " [task_ex_ids=%s]", missing_ids
+            )
+
+            # An incomplete context must not be memoized.
+            self._truncated = True
+
+        return [t_execs[t_id] for t_id in task_ex_ids if t_id in t_execs]
+
+    @staticmethod
+    def _get_memo(task_ex):
+        memo = getattr(task_ex, '_inbound_ctx_memo', None)
+
+        if not memo:
+            return None
+
+        data, val = memo
+
+        # The memo stays valid until the data it's based on is replaced.
+        if any(a is not b for a, b in zip(data, _get_layers_data(task_ex))):
+            return None
+
+        return val
+
+    @staticmethod
+    def _set_memo(task_ex, val):
+        try:
+            task_ex._inbound_ctx_memo = (_get_layers_data(task_ex), val)
+        except AttributeError:
+            pass
+
+    def inbound(self, task_ex):
+        """Returns versioned inbound context of the task execution.
+
+        :return: A tuple (ctx, depth, hops) where 'ctx' is a dictionary
+            {key: (version, origin, value)}.
+        """
+        res = self._get_memo(task_ex)
+
+        if res is not None:
+            return res
+
+        layers = getattr(task_ex, 'context_layers', None) or {}
+        in_ctx = getattr(task_ex, 'in_context', None) or {}
+
+        refs = layers.get('refs', [])
+
+        if any(t_id in self._in_progress for t_id in refs):
+            # It may happen if a task in a loop was rerun and got
+            # a reference to its own downstream task.
+            refs = [t_id for t_id in refs if t_id not in self._in_progress]
+
+            self._truncated = True
+
+        ctx = {}
+        hops = 0
+
+        if refs:
+            self._in_progress.add(task_ex.id)
+
+            try:
+                branches = [self.outbound(t) for t in self._load(refs)]
+            finally:
+                self._in_progress.discard(task_ex.id)
+
+            ctx = _merge_versioned_contexts([b[0] for b in branches])
+            hops = 1 + max([b[2] for b in branches] or [0])
+
+        depth = layers.get('depth', 0)
+        versions = layers.get('versions') or {}
+        local_origin = '%s/in' % task_ex.id
+
+        for k, v in in_ctx.items():
+            ver, origin = versions.get(k) or (2 * depth, local_origin)
+
+            ctx[k] = (ver, origin, v)
+
+        res = (ctx, depth, hops)
+
+        if not self._truncated:
+            self._set_memo(task_ex, res)
+
+        return res
+
+    def outbound(self, task_ex):
+        """Returns versioned outbound context of the task execution.
+
+        :return: The same as inbound().
+        """
+        ctx, depth, hops = self.inbound(task_ex)
+
+        published = getattr(task_ex, 'published', None)
+
+        if published:
+            ctx = dict(ctx)
+
+            for k, v in published.items():
+                ctx[k] = (2 * depth + 1, task_ex.id, v)
+
+        return ctx, depth, hops
+
+
+def _get_layers_data(task_ex):
+    return (
+        getattr(task_ex, 'in_context', None),
+        getattr(task_ex, 'context_layers', None)
+    )
+
+
+def _merge_versioned_contexts(contexts):
+    if len(contexts) == 1:
+        return dict(contexts[0])
+
+    candidates = {}
+
+    for ctx in contexts:
+        for k, entry in ctx.items():
+            entries = candidates.setdefault(k, [])
+
+            # The same value could come through different branches.
+            if all(entry[1] != e[1] for e in entries):
+                entries.append(entry)
+
+    res = {}
+
+    for k, entries in candidates.items():
+        if len(entries) == 1:
+            res[k] = entries[0]
+
+            continue
+
+        # The sort is stable so values of the same version are
+        # applied in the order of the branches.
+        entries.sort(key=lambda e: e[0])
+
+        val = entries[0][2]
+
+        for e in entries[1:]:
+            if isinstance(val, dict) and isinstance(e[2], dict):
+                val = utils.merge_dicts(
+                    copy.deepcopy(val),
+                    copy.deepcopy(e[2])
+                )
+            else:
+                val = e[2]
+
+        res[k] = (
+            entries[-1][0],
+            '+'.join(sorted(e[1] for e in entries)),
+            val
+        )
+
+    return res
+
+
+def _to_layered_context(ctx, refs, depth, hops):
+    return LayeredContext(
+        {k: e[2] for k, e in ctx.items()},
+        refs,
+        depth,
+        hops,
+        {k: (e[0], e[1]) for k, e in ctx.items()}
+    )
+
+
 def evaluate_upstream_context(upstream_task_execs):
-    published_vars = {}
-    ctx = {}
-
-    for t_ex in upstream_task_execs:
-        # TODO(rakhmerov): These two merges look confusing. So it's a
-        # temporary solution. There's still the bug
-        # https://bugs.launchpad.net/mistral/+bug/1424461 that needs to be
-        # fixed using context variable versioning.
-        published_vars = utils.merge_dicts(
-            published_vars,
-            t_ex.published
+    """Evaluates inbound context of a task with the given upstream tasks.
+
+    Outbound contexts of the upstream tasks are merged according to
+    the versions of the values so that a value published later always
+    wins over a stale value inherited from a common ancestor.
+
+    :param upstream_task_execs: Upstream task executions.
+    :return: Inbound task context (an instance of LayeredContext).
+    """
+    resolver = _ContextResolver()
+
+    branches = [resolver.outbound(t_ex) for t_ex in upstream_task_execs]
+
+    return _to_layered_context(
+        _merge_versioned_contexts([b[0] for b in branches])
+        if branches else {},
+        [t_ex.id for t_ex in upstream_task_execs],
+        1 + max([b[1] for b in branches] or [-1]),
+        1 + max([b[2] for b in branches] or [-1])
+    )
+
+
+@profiler.trace(
+    'data-flow-evaluate-task-inbound-context',
+    hide_args=True
+)
+def evaluate_task_inbound_context(task_ex):
+    """Materializes task inbound Data Flow context.
+
+    :param task_ex: DB task.
+    :return: Inbound task Data Flow context.
+    """
+    ctx = _ContextResolver().inbound(task_ex)[0]
+
+    return {k: e[2] for k, e in ctx.items()}
+
+
+def get_inbound_context_values(ctx):
+    """Returns DB values representing the given task inbound context.
+
+    If the context is layered then only references to its layers are
+    stored unless the number of layers to walk through in order to
+    materialize the context exceeds the configured limit. In this case
+    the context is stored in full and serves as a base layer for the
+    downstream tasks.
+
+    :param ctx: Task inbound context.
+    :return: A dictionary with values of the fields 'in_context' and
+        'context_layers' of a task execution.
+    """
+    if not isinstance(ctx, LayeredContext):
+        return {'in_context': ctx, 'context_layers': None}
+
+    if ctx.hops >= CONF.engine.max_task_context_layers:
+        return _get_full_context_values(ctx)
+
+    return {
+        'in_context': {},
+        'context_layers': {'refs': ctx.refs, 'depth': ctx.depth}
+    }
+
+
+def _get_full_context_values(ctx):
+    return {
+        'in_context': dict(ctx),
+        'context_layers': {
+            'refs': [],
+            'depth': ctx.depth,
+            'versions': ctx.versions
+        }
+    }
+
+
+def materialize_downstream_contexts(task_ex):
+    """Stores inbound contexts of the downstream tasks in full.
+
+    Inbound contexts of the downstream tasks that refer to the given task
+    execution are materialized from its current state. So this method
+    must be called before the task execution gets rerun, otherwise the
+    values published by the rerun task would silently appear in the
+    contexts of the tasks that have already run after it.
+
+    :param task_ex: DB task that is going to be rerun.
+    """
+    # NOTE: References to upstream tasks are stored in a JSON field
+    # so all tasks of the workflow have to be scanned. It only happens
+    # on rerun so it's acceptable.
+    t_execs = [
+        t_ex for t_ex in db_api.get_task_executions(
+            workflow_execution_id=task_ex.workflow_execution_id
         )
+        if task_ex.id in (t_ex.context_layers or {}).get('refs', [])
+    ]
+
+    resolver = _ContextResolver()
+
+    for t_ex in t_execs:
+        ctx, depth, hops = resolver.inbound(t_ex)
+
+        values = _get_full_context_values(
+            _to_layered_context(ctx, [], depth, hops)
+        )
+
+        t_ex.in_context = values['in_context']
+        t_ex.context_layers = values['context_layers']
+
+
+def update_task_inbound_context(task_ex, ctx):
+    """Updates inbound context of the existing task execution.
+
+    :param task_ex: DB task.
+    :param ctx: Inbound context to add to the existing one.
+    """
+    layers = task_ex.context_layers
 
-        utils.merge_dicts(ctx, evaluate_task_outbound_context(t_ex))
+    if not isinstance(ctx, LayeredContext) or layers is None:
+        utils.update_dict(task_ex.in_context, ctx)
 
-    return utils.merge_dicts(ctx, published_vars)
+        # The context has been changed in place.
+        task_ex._inbound_ctx_memo = None
+
+        return
+
+    refs = list(layers.get('refs', []))
+
+    refs.extend([t_id for t_id in ctx.refs if t_id not in refs])
+
+    # Assigning a new object makes SQLAlchemy to detect the change.
+    task_ex.context_layers = dict(
+        layers,
+        refs=refs,
+        depth=max(layers.get('depth', 0), ctx.depth)
+    )
 
 
 def _extract_execution_result(ex):
@@ -156,7 +500,52 @@ def _extract_execution_result(ex):
         return ex.output['result']
 
 
+def _get_with_items_action_results(task_ex):
+    # NOTE: Outputs of the action executions are loaded in batches
+    # bypassing the session so that only the results themselves are
+    # held in memory, not action execution objects along with outputs.
+    # The results are still collected into one list because that's what
+    # the callers (the "task()" function, publishing and the REST API)
+    # need, so batching bounds the size of a query and of the rows held
+    # at once but not the size of the result.
+    execs = [ex for ex in task_ex.action_executions if ex.accepted]
+
+    execs.sort(key=lambda x: x.runtime_context.get('index'))
+
+    results = [None] * len(execs)
+
+    # Outputs already loaded into the session don't need to be queried.
+    not_loaded = []
+
+    for i, ex in enumerate(execs):
+        if 'output' in ex.__dict__:
+            results[i] = ex.output['result'] if ex.output else None
+        else:
+            not_loaded.append((i, ex.id))
+
+    batch_size = CONF.engine.with_items_result_batch_size
+
+    for i in range(0, len(not_loaded), batch_size):
+        batch = not_loaded[i:i + batch_size]
+
+        outputs = db_api.get_action_execution_outputs(
+            [ex_id for _, ex_id in batch]
+        )
+
+        for idx, ex_id in batch:
+            output = outputs.get(ex_id)
+
+            results[idx] = output['result'] if output else None
+
+    return results
+
+
 def get_task_execution_result(task_ex):
+    task_spec = spec_parser.get_task_spec(task_ex.spec)
+
+    if task_spec.get_with_items() and not task_ex.spec.get('workflow'):
+        return _get_with_items_action_results(task_ex)
+
     execs = task_ex.executions
 
     execs.sort(key=lambda x: x.runtime_context.get('index'))
@@ -168,7 +557,7 @@ def get_task_execution_result(task_ex):
     ]
 
     # If it's a 'with-items' task we should always return an array.
-    if spec_parser.get_task_spec(task_ex.spec).get_with_items():
+    if task_spec.get_with_items():
         return results
 
     return results[0] if len(results) == 1 else results
@@ -182,10 +571,10 @@ def publish_variables(task_ex, task_spec):
 
     expr_ctx = ContextView(
         get_current_task_dict(task_ex),
-        task_ex.in_context,
+        evaluate_task_inbound_context(task_ex),
         get_workflow_environment_dict(wf_ex),
         wf_ex.context,
-        wf_ex.input
+        get_workflow_input_dict(wf_ex)
     )
 
     if task_ex.name in expr_ctx:
@@ -201,16 +590,12 @@ def publish_variables(task_ex, task_spec):
         return
 
     # Publish branch variables.
-    branch_vars = publish_spec.get_branch()
-
-    task_ex.published = expr.evaluate_recursively(branch_vars, expr_ctx)
+    task_ex.published = publish_spec.get_branch_plan().evaluate(expr_ctx)
 
     # Publish global variables.
-    global_vars = publish_spec.get_global()
-
     utils.merge_dicts(
         task_ex.workflow_execution.context,
-        expr.evaluate_recursively(global_vars, expr_ctx)
+        publish_spec.get_global_plan().evaluate(expr_ctx)
     )
 
     # TODO(rakhmerov):
@@ -232,28 +617,16 @@ def evaluate_task_outbound_context(task_ex):
     :param task_ex: DB task.
     :return: Outbound task Data Flow context.
     """
-    # NOTE(rakhmerov): 'task_ex.in_context' has the SQLAlchemy specific
-    # type MutableDict. So we need to create a shallow copy using dict(...)
-    # initializer and use it. It's enough to be safe in order to manipulate
-    # with entries of the result dictionary, like adding more entries.
-    # However, we must not change values themselves because they are
-    # shared between the original dictionary and the newly created.
-    # It's better to avoid using the method copy.deepcopy() because on
-    # dictionaries with many entries it significantly increases memory
-    # footprint and reduces performance.
-    in_context = (
-        dict(task_ex.in_context)
-        if getattr(task_ex, 'in_context', None) is not None else {}
-    )
+    ctx, depth, hops = _ContextResolver().outbound(task_ex)
 
-    return utils.update_dict(in_context, getattr(task_ex, 'published', {}))
+    return _to_layered_context(ctx, [task_ex.id], depth + 1, hops + 1)
 
 
-def evaluate_workflow_output(wf_ex, wf_output, ctx):
+def evaluate_workflow_output(wf_ex, output_plan, ctx):
     """Evaluates workflow output.
 
     :param wf_ex: Workflow execution.
-    :param wf_output: Workflow output.
+    :param output_plan: Evaluation plan of workflow output.
     :param ctx: Final Data Flow context (cause task's outbound context).
     """
 
@@ -262,10 +635,10 @@ def evaluate_workflow_output(wf_ex, wf_output, ctx):
         ctx,
         get_workflow_environment_dict(wf_ex),
         wf_ex.context,
-        wf_ex.input
+        get_workflow_input_dict(wf_ex)
     )
 
-    output = expr.evaluate_recursively(wf_output, ctx_view)
+    output = output_plan.evaluate(ctx_view)
 
     # TODO(rakhmerov): Many don't like that we return the whole context
     # if 'output' is not explicitly defined.
@@ -305,14 +678,34 @@ def add_workflow_variables_to_context(wf_ex, wf_spec):
     ctx_view = ContextView(
         get_workflow_environment_dict(wf_ex),
         wf_ex.context,
-        wf_ex.input
+        get_workflow_input_dict(wf_ex)
     )
 
-    wf_vars = expr.evaluate_recursively(wf_spec.get_vars(), ctx_view)
+    wf_vars = wf_spec.get_vars_plan().evaluate(ctx_view)
 
     utils.merge_dicts(wf_ex.context, wf_vars)
 
 
+def get_workflow_input_dict(wf_ex):
+    """Returns workflow input as an immutable part of a data context.
+
+    The result is kept in the workflow execution object so that all
+    expressions evaluated against it within the lifetime of the object
+    can share data conversions made by expression evaluators.
+    """
+    if wf_ex.input is None:
+        return None
+
+    input_view = getattr(wf_ex, '_input_view', None)
+
+    if input_view is None or input_view.get_data() is not wf_ex.input:
+        input_view = yaql_expr.ImmutableData(wf_ex.input)
+
+        wf_ex._input_view = input_view
+
+    return input_view
+
+
 def get_workflow_environment_dict(wf_ex):
     if not wf_ex:
         return {}
@@ -322,7 +715,21 @@ def get_workflow_environment_dict(wf_ex):
 
     env_dict = wf_ex.params['env'] if 'env' in wf_ex.params else {}
 
-    return {'__env': env_dict}
+    # Similar to workflow input, the environment doesn't change while
+    # the workflow is running so its view can be reused.
+    env_view = getattr(wf_ex, '_env_view', None)
+
+    if env_view is None or env_view['__env'] is not env_dict:
+        env_view = yaql_expr.ImmutableData({'__env': env_dict})
+
+        wf_ex._env_view = env_view
+
+    return env_view
+
+
+def reset_workflow_environment_dict(wf_ex):
+    """Drops the cached environment view after the environment update."""
+    wf_ex._env_view = None
 
 
 def get_workflow_execution_published_global(wf_ex):
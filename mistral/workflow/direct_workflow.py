@@ -18,7 +18,6 @@ from osprofiler import profiler
 
 from mistral.db.v2 import api as db_api
 from mistral import exceptions as exc
-from mistral import expressions as expr
 from mistral.workflow import base
 from mistral.workflow import commands
 from mistral.workflow import data_flow
@@ -30,6 +29,11 @@ LOG = logging.getLogger(__name__)
 
 MAX_SEARCH_DEPTH = 5
 
+# A key in the runtime context of a 'join' task execution that keeps
+# {inbound task name: [inbound task execution id, event name]} for the
+# inbound tasks that have already completed and triggered the 'join'.
+_JOIN_STATE = 'join_state'
+
 
 class DirectWorkflowController(base.WorkflowController):
     """'Direct workflow' controller.
@@ -180,8 +184,25 @@ class DirectWorkflowController(base.WorkflowController):
         for cmd in cmds:
             self._configure_if_join(cmd)
 
+        # Rerun tasks may trigger 'join' tasks differently so the states
+        # of 'join' tasks collected so far can't be trusted anymore.
+        self._reset_join_states()
+
         return cmds
 
+    def _reset_join_states(self):
+        join_names = [
+            t_s.get_name() for t_s in self.wf_spec.get_tasks()
+            if t_s.get_join()
+        ]
+
+        if not join_names:
+            return
+
+        for t_ex in self._get_task_executions(name={'in': join_names}):
+            if t_ex.runtime_context and _JOIN_STATE in t_ex.runtime_context:
+                del t_ex.runtime_context[_JOIN_STATE]
+
     # TODO(rakhmerov): Need to refactor this method to be able to pass tasks
     # whose contexts need to be merged.
     def evaluate_workflow_final_context(self):
@@ -205,7 +226,7 @@ class DirectWorkflowController(base.WorkflowController):
             # equals to its real state.
             return base.TaskLogicalState(task_ex.state, task_ex.state_info)
 
-        return self._get_join_logical_state(task_spec)
+        return self._get_join_logical_state(task_spec, task_ex)
 
     def find_indirectly_affected_task_executions(self, t_name):
         all_joins = {task_spec.get_name()
@@ -285,32 +306,41 @@ class DirectWorkflowController(base.WorkflowController):
             ctx,
             data_flow.get_workflow_environment_dict(self.wf_ex),
             self.wf_ex.context,
-            self.wf_ex.input
+            data_flow.get_workflow_input_dict(self.wf_ex)
         )
 
         # [(task_name, params, 'on-success'|'on-error'|'on-complete'), ...]
         result = []
 
-        if t_s == states.ERROR:
-            for name, cond, params in self.wf_spec.get_on_error_clause(t_n):
-                if not cond or expr.evaluate(cond, ctx_view):
-                    params = expr.evaluate_recursively(params, ctx_view)
+        def _add_next_tasks(clause_plans, event_name):
+            # Evaluation plans let us avoid scanning conditions and
+            # parameters for expressions on every transition.
+            for name, cond, params in clause_plans:
+                if cond.get_data():
+                    if not cond.evaluate(ctx_view, copy_on_write=True):
+                        continue
 
-                    result.append((name, params, 'on-error'))
+                params = params.evaluate(ctx_view, copy_on_write=True)
 
-        if t_s == states.SUCCESS:
-            for name, cond, params in self.wf_spec.get_on_success_clause(t_n):
-                if not cond or expr.evaluate(cond, ctx_view):
-                    params = expr.evaluate_recursively(params, ctx_view)
+                result.append((name, params, event_name))
 
-                    result.append((name, params, 'on-success'))
+        if t_s == states.ERROR:
+            _add_next_tasks(
+                self.wf_spec.get_on_error_clause_plans(t_n),
+                'on-error'
+            )
 
-        if states.is_completed(t_s) and not states.is_cancelled(t_s):
-            for name, cond, params in self.wf_spec.get_on_complete_clause(t_n):
-                if not cond or expr.evaluate(cond, ctx_view):
-                    params = expr.evaluate_recursively(params, ctx_view)
+        if t_s == states.SUCCESS:
+            _add_next_tasks(
+                self.wf_spec.get_on_success_clause_plans(t_n),
+                'on-success'
+            )
 
-                    result.append((name, params, 'on-complete'))
+        if states.is_completed(t_s) and not states.is_cancelled(t_s):
+            _add_next_tasks(
+                self.wf_spec.get_on_complete_clause_plans(t_n),
+                'on-complete'
+            )
 
         return result
 
@@ -318,10 +348,16 @@ class DirectWorkflowController(base.WorkflowController):
         'direct-wf-controller-get-join-logical-state',
         hide_args=True
     )
-    def _get_join_logical_state(self, task_spec):
+    def _get_join_logical_state(self, task_spec, task_ex=None):
         """Evaluates logical state of 'join' task.
 
+        Inbound tasks that have already triggered the 'join' task are
+        remembered in the runtime context of the 'join' task execution so
+        that only the remaining inbound task executions are loaded and
+        evaluated next time.
+
         :param task_spec: 'join' task specification.
+        :param task_ex: 'join' task execution.
         :return: TaskLogicalState (state, state_info, cardinality,
             triggered_by) where 'state' and 'state_info' describe the logical
             state of the given 'join' task and 'cardinality' gives the
@@ -340,13 +376,37 @@ class DirectWorkflowController(base.WorkflowController):
         if not in_task_specs:
             return base.TaskLogicalState(states.RUNNING)
 
-        t_execs_cache = self._prepare_task_executions_cache(task_spec)
+        join_state = self._get_join_state(task_ex)
 
-        # List of tuples (task_name, task_ex, state, depth, event_name).
+        # Only executions of the inbound tasks that haven't triggered
+        # the 'join' yet are needed. Executions of other ancestors are
+        # loaded by _possible_route() only if some inbound task hasn't
+        # started yet.
+        t_execs_cache = self._get_task_executions_cache(
+            [
+                t_s.get_name() for t_s in in_task_specs
+                if t_s.get_name() not in join_state
+            ]
+        )
+
+        # List of tuples (task_name, task_ex_id, state, depth, event_name).
         induced_states = []
 
+        join_state_changed = False
+
         for t_s in in_task_specs:
-            t_ex = t_execs_cache[t_s.get_name()]
+            t_name = t_s.get_name()
+
+            if t_name in join_state:
+                t_ex_id, event = join_state[t_name]
+
+                induced_states.append(
+                    (t_name, t_ex_id, states.RUNNING, 1, event)
+                )
+
+                continue
+
+            t_ex = t_execs_cache[t_name]
 
             tup = self._get_induced_join_state(
                 t_s,
@@ -355,16 +415,24 @@ class DirectWorkflowController(base.WorkflowController):
                 t_execs_cache
             )
 
+            if tup[0] == states.RUNNING:
+                join_state[t_name] = [t_ex.id, tup[2]]
+
+                join_state_changed = True
+
             induced_states.append(
                 (
-                    t_s.get_name(),
-                    t_ex,
+                    t_name,
+                    t_ex.id if t_ex else None,
                     tup[0],
                     tup[1],
                     tup[2]
                 )
             )
 
+        if join_state_changed and task_ex is not None:
+            task_ex.runtime_context[_JOIN_STATE] = join_state
+
         def count(state):
             cnt = 0
             total_depth = 0
@@ -394,7 +462,7 @@ class DirectWorkflowController(base.WorkflowController):
 
         def _triggered_by(state):
             return [
-                {'task_id': s[1].id, 'event': s[4]}
+                {'task_id': s[1], 'event': s[4]}
                 for s in induced_states
                 if s[2] == state and s[1] is not None
             ]
@@ -518,27 +586,29 @@ class DirectWorkflowController(base.WorkflowController):
 
         return False, depth
 
-    def _find_all_parent_task_names(self, task_spec, depth=1):
-        if depth == MAX_SEARCH_DEPTH:
-            return {task_spec.get_name()}
-
-        in_task_specs = self.wf_spec.find_inbound_task_specs(task_spec)
-
-        if not in_task_specs:
-            return {task_spec.get_name()}
+    def _find_all_parent_task_names(self, task_spec):
+        return self.wf_spec.find_ancestor_task_names(
+            task_spec,
+            MAX_SEARCH_DEPTH
+        )
 
-        names = set()
-        for t_s in in_task_specs:
-            names.update(self._find_all_parent_task_names(t_s, depth + 1))
+    @staticmethod
+    def _get_join_state(task_ex):
+        if task_ex is None:
+            # Nowhere to keep the state, it won't be saved.
+            return {}
 
-        if depth > 1:
-            names.add(task_spec.get_name())
+        if not task_ex.runtime_context:
+            task_ex.runtime_context = {}
 
-        return names
+        return dict(task_ex.runtime_context.get(_JOIN_STATE) or {})
 
     def _prepare_task_executions_cache(self, task_spec):
-        names = self._find_all_parent_task_names(task_spec)
+        return self._get_task_executions_cache(
+            self._find_all_parent_task_names(task_spec)
+        )
 
+    def _get_task_executions_cache(self, names):
         t_execs_cache = {
             t_ex.name: t_ex for t_ex in self._get_task_executions(
                 fields=('id', 'name', 'state', 'next_tasks'),
@@ -12,9 +12,6 @@
 #    See the License for the specific language governing permissions and
 #    limitations under the License.
 
-import networkx as nx
-from networkx.algorithms import traversal
-
 from mistral import exceptions as exc
 from mistral.workflow import base
 from mistral.workflow import commands
@@ -118,63 +115,27 @@ class ReverseWorkflowController(base.WorkflowController):
 
         :return: Task specifications with no dependencies.
         """
-        tasks_spec = self.wf_spec.get_tasks()
-
-        graph = self._build_graph(tasks_spec)
-
-        # Unwind tasks from the target task
-        # and filter out tasks with dependencies.
-        return [
-            t_s for t_s in
-            traversal.dfs_postorder_nodes(
-                graph.reverse(),
-                self._get_target_task_specification()
-            )
-            if self._is_satisfied_task(t_s)
-        ]
-
-    def _is_satisfied_task(self, task_spec):
-        if self._get_task_executions(name=task_spec.get_name()):
-            return False
-
-        if not self.wf_spec.get_task_requires(task_spec):
-            return True
-
-        success_t_names = set()
-
-        for t_ex in self.wf_ex.task_executions:
-            if t_ex.state == states.SUCCESS:
-                success_t_names.add(t_ex.name)
-
-        return not (
-            set(self.wf_spec.get_task_requires(task_spec)) - success_t_names
+        plan = self.wf_spec.get_task_plan(
+            self._get_target_task_specification().get_name()
         )
 
-    def _build_graph(self, tasks_spec):
-        graph = nx.DiGraph()
-
-        # Add graph nodes.
-        for t in tasks_spec:
-            graph.add_node(t)
-
-        # Add graph edges.
-        for t_spec in tasks_spec:
-            for dep_t_spec in self._get_dependency_tasks(tasks_spec, t_spec):
-                graph.add_edge(dep_t_spec, t_spec)
-
-        return graph
-
-    def _get_dependency_tasks(self, tasks_spec, task_spec):
-        dep_task_names = self.wf_spec.get_task_requires(task_spec)
-
-        if len(dep_task_names) == 0:
-            return []
+        # Names and states of all task executions are fetched with one
+        # query rather than one query per task of the plan.
+        t_names = set()
+        success_t_names = set()
 
-        dep_t_specs = set()
+        for t_name, t_state in self._get_task_executions(
+                fields=('name', 'state')):
+            t_names.add(t_name)
 
-        for t_spec in tasks_spec:
-            for t_name in dep_task_names:
-                if t_name == t_spec.get_name():
-                    dep_t_specs.add(t_spec)
+            if t_state == states.SUCCESS:
+                success_t_names.add(t_name)
 
-        return dep_t_specs
+        # Filter out tasks that have already started and tasks
+        # with unsatisfied dependencies.
+        return [
+            t_s for t_s in plan
+            if t_s.get_name() not in t_names and not (
+                set(self.wf_spec.get_task_requires(t_s)) - success_t_names
+            )
+        ]
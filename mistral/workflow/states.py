@@ -109,6 +109,11 @@ def is_paused_or_idle(state):
     return is_paused(state) or is_idle(state)
 
 
+def is_incomplete(state):
+    """Checks if a task in the given state keeps its workflow running."""
+    return is_valid(state) and not is_completed(state)
+
+
 def is_valid_transition(from_state, to_state):
     if is_invalid(from_state) or is_invalid(to_state):
         return False
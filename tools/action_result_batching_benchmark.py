@@ -0,0 +1,101 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Microbenchmark of sending action results to the engine in batches.
+
+Compares sending results one by one with sending them in batches via
+the action result batcher. The engine is replaced with a stub that
+spends the given time on every RPC call to emulate the messaging
+round trip.
+
+Usage: python tools/action_result_batching_benchmark.py
+           [<number_of_results> [<rpc_latency_in_seconds>]]
+"""
+
+import sys
+import time
+from unittest import mock
+
+from oslo_config import cfg
+
+from mistral import config
+from mistral.rpc import clients as rpc
+from mistral.services import action_result_batcher
+
+
+class _EngineClientStub(object):
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+
+    def on_action_complete(self, action_ex_id, result, async_=False):
+        self.calls += 1
+
+        time.sleep(self.latency)
+
+    def on_actions_complete(self, results, async_=False):
+        self.calls += 1
+
+        time.sleep(self.latency)
+
+
+def _send_one_by_one(client, results):
+    for action_ex_id, result in results:
+        client.on_action_complete(action_ex_id, result, async_=True)
+
+
+def _send_in_batches(client, results):
+    with mock.patch.object(action_result_batcher, '_stopped', False):
+        for action_ex_id, result in results:
+            action_result_batcher.add_result(action_ex_id, result)
+
+    action_result_batcher.send_action_results()
+
+
+def main():
+    results_cnt = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    latency = float(sys.argv[2]) if len(sys.argv) > 2 else 0.001
+
+    config.parse_args(args=[])
+
+    results = [('action-%s' % i, {'result': i}) for i in range(results_cnt)]
+
+    print(
+        '%-14s %10s %10s %12s' %
+        ('Mode', 'RPC calls', 'Time, s', 'Results/s')
+    )
+
+    for mode, func in (('one by one', _send_one_by_one),
+                       ('batched', _send_in_batches)):
+        client = _EngineClientStub(latency)
+
+        with mock.patch.object(rpc, 'get_engine_client', return_value=client):
+            started = time.time()
+
+            func(client, results)
+
+            elapsed = time.time() - started
+
+        print(
+            '%-14s %10s %10.3f %12.1f' %
+            (mode, client.calls, elapsed, results_cnt / elapsed)
+        )
+
+    print(
+        'Batch size: %s' % cfg.CONF.executor.result_batch_size
+    )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,117 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Microbenchmark of the JSON codec used by JsonEncoded DB columns.
+
+Compares serialization via "to_primitive" (the generic path) with the
+direct serialization of JSON-native data, as well as deserialization,
+on payloads similar to the ones stored in execution columns.
+
+Usage: python tools/json_codec_benchmark.py [<number_of_iterations>]
+"""
+
+import sys
+import timeit
+import uuid
+
+from oslo_serialization import jsonutils
+
+from mistral import utils
+
+
+def _execution_header():
+    return {
+        'id': str(uuid.uuid4()),
+        'spec': {'name': 'wf', 'version': '2.0'},
+        'params': {'namespace': '', 'env': {}},
+        'input': {'vm_count': 100, 'flavor': 'm1.small'}
+    }
+
+
+def _vm(i):
+    return {
+        'id': str(uuid.uuid4()),
+        'name': 'vm-%s' % i,
+        'status': 'ACTIVE',
+        'created': '2020-01-01T00:00:00.000000',
+        'addresses': {
+            'private': [{'addr': '10.0.0.%s' % (i % 250), 'version': 4}]
+        },
+        'metadata': {'owner': 'tenant-1', 'index': i},
+        'locked': False,
+        'progress': 100.0
+    }
+
+
+def get_payloads():
+    vms = [_vm(i) for i in range(100)]
+
+    return {
+        'empty published': {},
+        'runtime_context': {
+            'index': 3,
+            'triggered_by': [
+                {'task_id': str(uuid.uuid4()), 'event': 'on-success'}
+            ],
+            'retry_task_policy': {'retry_no': 2}
+        },
+        'action input': {
+            'url': 'http://example.com/servers',
+            'method': 'GET',
+            'headers': {'X-Auth-Token': 'a' * 64},
+            'timeout': 30
+        },
+        'action output (100 VMs)': {'result': vms},
+        'in_context (100 VMs)': {
+            '__execution': _execution_header(),
+            'vms': vms,
+            'vm_names': [vm['name'] for vm in vms],
+            'flavor': 'm1.small'
+        }
+    }
+
+
+def _measure(func, arg, number):
+    return min(timeit.repeat(lambda: func(arg), number=number, repeat=5))
+
+
+def main():
+    number = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+    print(
+        '%-26s %8s %14s %14s %14s %14s' %
+        ('Payload', 'Size', 'Encode old,us', 'Encode new,us',
+         'Decode old,us', 'Decode new,us')
+    )
+
+    for name, payload in get_payloads().items():
+        json_str = utils.to_json_str(payload)
+
+        assert json_str == utils._to_primitive_json_str(payload)
+
+        results = [
+            _measure(utils._to_primitive_json_str, payload, number),
+            _measure(utils.to_json_str, payload, number),
+            _measure(jsonutils.loads, json_str, number),
+            _measure(utils.from_json_str, json_str, number)
+        ]
+
+        print(
+            '%-26s %8s %14.1f %14.1f %14.1f %14.1f' %
+            tuple([name, len(json_str)] + [r / number * 1e6 for r in results])
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,131 @@
+# Copyright 2020 Nokia Software.
+#
+#    Licensed under the Apache License, Version 2.0 (the "License");
+#    you may not use this file except in compliance with the License.
+#    You may obtain a copy of the License at
+#
+#        http://www.apache.org/licenses/LICENSE-2.0
+#
+#    Unless required by applicable law or agreed to in writing, software
+#    distributed under the License is distributed on an "AS IS" BASIS,
+#    WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#    See the License for the specific language governing permissions and
+#    limitations under the License.
+
+"""Benchmark of the per-iteration cost of "with-items" tasks.
+
+Runs a workflow with a "with-items" task over a growing number of items
+with the legacy and the compact iteration state (see the
+"[engine]/with_items_compact_state" option) and prints how long one
+iteration takes on average. The engine runs in-process on top of the
+unit test infrastructure (SQLite database, fake RPC transport).
+
+Usage: python tools/with_items_benchmark.py [<number_of_items> ...]
+"""
+
+import sys
+import time
+import unittest
+
+from mistral.db.v2 import api as db_api
+from mistral.services import workflows as wf_service
+from mistral.tests.unit.engine import base
+
+WF = """---
+version: '2.0'
+
+wf:
+  input:
+    - items
+
+  tasks:
+    task1:
+      with-items: i in <% $.items %>
+      action: std.noop
+
+wf_concurrency:
+  input:
+    - items
+
+  tasks:
+    task1:
+      with-items: i in <% $.items %>
+      action: std.noop
+      concurrency: 10
+"""
+
+
+class WithItemsBenchmark(base.EngineTestCase):
+    def __init__(self, wf_name, items_counts):
+        super(WithItemsBenchmark, self).__init__('run_benchmark')
+
+        self.wf_name = wf_name
+        self.items_counts = items_counts
+
+        # A list of tuples (compact state, number of items, seconds).
+        self.results = []
+
+    def run_benchmark(self):
+        wf_service.create_workflows(WF)
+
+        for compact in (False, True):
+            self.override_config(
+                'with_items_compact_state',
+                compact,
+                'engine'
+            )
+
+            for items_cnt in self.items_counts:
+                started = time.time()
+
+                wf_ex = self.engine.start_workflow(
+                    self.wf_name,
+                    wf_input={'items': list(range(items_cnt))}
+                )
+
+                self.await_workflow_success(
+                    wf_ex.id,
+                    delay=0.01,
+                    timeout=3600
+                )
+
+                self.results.append(
+                    (compact, items_cnt, time.time() - started)
+                )
+
+                with db_api.transaction():
+                    task_ex = db_api.get_workflow_execution(
+                        wf_ex.id
+                    ).task_executions[0]
+
+                    self.assertEqual(items_cnt, len(task_ex.executions))
+
+
+def main():
+    items_counts = [int(arg) for arg in sys.argv[1:]] or [10, 100, 1000]
+
+    results = []
+
+    for wf_name in ('wf', 'wf_concurrency'):
+        benchmark = WithItemsBenchmark(wf_name, items_counts)
+
+        if not unittest.TextTestRunner().run(benchmark).wasSuccessful():
+            return 1
+
+        results.extend((wf_name,) + r for r in benchmark.results)
+
+    print(
+        '%-16s %-8s %8s %10s %18s' %
+        ('Workflow', 'State', 'Items', 'Time,s', 'Per iteration,ms')
+    )
+
+    for wf_name, compact, items_cnt, seconds in results:
+        print(
+            '%-16s %-8s %8s %10.2f %18.2f' %
+            (wf_name, 'compact' if compact else 'legacy', items_cnt,
+             seconds, seconds / items_cnt * 1e3)
+        )
+
+
+if __name__ == '__main__':
+    sys.exit(main())